@@ -0,0 +1,69 @@
+"""Time of the output backends (backends.py) compared to the parse they share
+
+Generates a synthetic tree (see corpus.py), parses and links it once without the parse cache, then writes the
+outputs of the TypeScript, LuaLS and Markdown backends from that Api: each backend alone, all of them one after
+the other and all of them concurrently (the LuaLS and Markdown ones in forked processes). Reports the best of
+`--repeat` runs and the size of each output.
+
+Usage: python benchmarks/bench_backends.py [--scale 1] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARKS)
+sys.path.insert(0, os.path.join(BENCHMARKS, ".."))
+
+from corpus import generate_corpus
+from spel2gen.backends import run_backends
+from spel2gen.config import Config
+from spel2gen.generator import TypeScriptBackend, build_api
+from spel2gen.luals_backend import LuaLSBackend
+from spel2gen.markdown_backend import MarkdownBackend
+from spel2gen.parse_cache import ParseCache
+
+
+def best_time(fun, repeat):
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fun()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        generate_corpus(root, args.scale)
+        os.chdir(os.path.join(root, "docs"))
+        sys.stderr = open(os.devnull, "w")  # the report of the merged duplicates
+
+        api = None
+
+        def parse():
+            global api
+            api, _ = build_api(Config(root=".."), ParseCache(None), None, {})
+
+        parse_time = best_time(parse, args.repeat)
+        backends = [
+            TypeScriptBackend("declarations.d.ts"),
+            LuaLSBackend("annotations.lua"),
+            MarkdownBackend("reference.md"),
+        ]
+        print(f"{'parse and link':<24} {parse_time * 1000:>8.1f} ms")
+        for backend in backends:
+            elapsed = best_time(lambda: backend.write(api), args.repeat)
+            size = os.path.getsize(backend.path)
+            print(f"{backend.name:<24} {elapsed * 1000:>8.1f} ms {size / 1024:>8.0f} KB")
+        for label, concurrent in (("all, sequential", False), ("all, concurrent", True)):
+            elapsed = best_time(lambda: run_backends(backends, api, concurrent), args.repeat)
+            print(f"{label:<24} {elapsed * 1000:>8.1f} ms")
+        print(f"{'cpus':<24} {os.cpu_count():>8}")
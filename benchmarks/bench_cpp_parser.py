@@ -0,0 +1,181 @@
+"""Header classes from the old brace counting line loop vs the C++ declaration parser
+
+Reports the best of 5 times to scan all the headers and how many of the members found have a name that isn't a C++ identifier
+(e.g. `x = 0` from an initialized member), a member with such a name can't be linked to its binding.
+
+Usage: python benchmarks/bench_cpp_parser.py [path to overlunky/src]
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from spel2gen.patterns import (
+    reClass,
+    reDocComment,
+    reMemberFunction,
+    reMemberVar,
+    reMoveCtor,
+    reMultiVarName,
+    reMultiVarNames,
+    reSkipMemberLine,
+)
+from spel2gen.source_parser import header_classes
+from spel2gen.type_translation import replace_all
+
+reValidName = re.compile(r"~?\w+(?:\[[^\]]*\])*|operator\W.*|operator \w+")
+
+
+def line_scan_classes(data):
+    """The class loop of scan_header_file before header_classes"""
+    lines = data.split("\n")
+    file_classes = []
+    brackets_depth = 0
+    in_union = False
+    in_anonymous_struct = False
+    class_name = None
+    comment = []
+    member_funs = {}
+    member_vars = []
+    for line in lines:
+        line = replace_all(line)
+        line = line.replace("*", "")
+        if not class_name and ("struct" in line or "class" in line):
+            m = reClass.match(line)
+            if m:
+                class_name = m[2]
+        elif class_name:
+            prev_brackets_depth = brackets_depth
+            brackets_depth += line.count("{") - line.count("}")
+
+            if brackets_depth == 1:
+                if line.strip() == "union":
+                    in_union = True
+            if brackets_depth == 2 and in_union:
+                if line.strip() == "struct":
+                    in_anonymous_struct = True
+
+            if brackets_depth < prev_brackets_depth:
+                if brackets_depth == 2:
+                    in_anonymous_struct = False
+                if brackets_depth == 1:
+                    in_union = False
+
+            if (
+                brackets_depth == 1
+                or (brackets_depth == 2 and in_union)
+                or (brackets_depth == 3 and in_anonymous_struct)
+            ):
+                m = "///" in line and reDocComment.search(line)
+                if m:
+                    comment.append(m[1])
+                else:
+                    m = reSkipMemberLine.search(
+                        line
+                    )  # skip lines that start with a colon (constructor parameter initialization) or are comments
+                    if m:
+                        continue
+
+                    m = "(" in line and reMemberFunction.search(line)
+                    if m:
+                        name = m[3]
+                        # move ctor is useless for Lua
+                        is_move_ctr = not m[2] and "&&" in m[4] and reMoveCtor(name).fullmatch(m[4])
+                        if not is_move_ctr:
+                            if name not in member_funs:
+                                member_funs[name] = []
+                            member_funs[name].append(
+                                {
+                                    "return": m[2],
+                                    "name": m[3],
+                                    "param": m[4],
+                                    "comment": comment,
+                                }
+                            )
+                        comment = []
+
+                    m = ";" in line and reMemberVar.search(line)
+                    if m:
+                        if m[1].endswith(",") and not (m[2].endswith(">") or m[2].endswith(")")): #Allows things like imgui ImVec2 'float x, y' and ImVec4 if used, 'float x, y, w, h'. Match will be '[1] = "float x," [2] = "y"'. Some other not exposed variables will be wrongly matched (as already happens).
+                            types_and_vars = m[1]
+                            vars_match = reMultiVarNames.search(types_and_vars)
+                            vars_except_last = vars_match.group() #Last var is m[2]
+                            start, end = vars_match.span()
+                            vars_type = types_and_vars[:start]
+                            for m_var in reMultiVarName.findall(vars_except_last):
+                                member_vars.append(
+                                    {"type": vars_type, "name": m_var, "comment": comment}
+                                )
+                            member_vars.append(
+                                {"type": vars_type, "name": m[2], "comment": comment}
+                            )
+                        else:
+                            member_vars.append(
+                                {"type": m[1], "name": m[2], "comment": comment}
+                            )
+                        comment = []
+            elif brackets_depth == 0:
+                file_classes.append(
+                    {
+                        "name": class_name,
+                        "member_funs": member_funs,
+                        "member_vars": member_vars,
+                    }
+                )
+                class_name = None
+                comment = []
+                member_funs = {}
+                member_vars = []
+
+    return file_classes
+
+
+def members(classes):
+    for cpp_class in classes:
+        if isinstance(cpp_class, dict):  # line loop
+            yield from cpp_class["member_funs"]
+            yield from (var["name"] for var in cpp_class["member_vars"])
+        else:
+            yield from cpp_class.member_funs
+            yield from (var.name for var in cpp_class.member_vars)
+
+
+def run(fun, sources, repeat=5):
+    elapsed = float("inf")
+    for _ in range(repeat):
+        replace_all.clear()
+        start = time.perf_counter()
+        classes = [cpp_class for data in sources for cpp_class in fun(data)]
+        elapsed = min(elapsed, time.perf_counter() - start)
+    names = list(members(classes))
+    invalid = [name for name in names if not reValidName.fullmatch(name)]
+    return elapsed, len(classes), len(names), invalid
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Header classes from the old line loop vs the C++ declaration parser")
+    parser.add_argument("src", nargs="?", default="../src", help="the src directory of an Overlunky checkout (default: %(default)s)")
+    src = parser.parse_args().src
+    files = [
+        file
+        for pattern in ("game_api/**/*.hpp", "imgui/imgui.h")
+        for file in glob.glob(os.path.join(src, pattern), recursive=True)
+        if not file.endswith("script.hpp")
+    ]
+    if not files:
+        sys.exit(f"No header files found in {src}")
+    sources = []
+    for file in files:
+        with open(file, "r", encoding="utf-8", errors="replace") as fp:
+            sources.append(fp.read())
+    print(f"{len(files)} header files")
+    for label, fun in (("line loop", line_scan_classes), ("cpp_parser", header_classes)):
+        elapsed, n_classes, n_members, invalid = run(fun, sources)
+        print(
+            f"{label:<11} {elapsed * 1000:>8.1f} ms, {n_classes} classes, {n_members} members, "
+            f"{len(invalid)} not identifiers {invalid[:3]}"
+        )
@@ -0,0 +1,120 @@
+"""End to end benchmark of generate_ts.py on synthetic Overlunky trees of increasing size
+
+For every scale a tree is written to a temporary directory (see corpus.py) and generated from `docs/` in a fresh
+process without the parse cache, `--repeat` times. Reports the wall time of the whole process (best run), the peak
+RSS and the time of each phase returned by generate(). Results can be saved as JSON and compared against a saved
+baseline: the benchmark fails (exit code 1) when a scale got slower than the baseline by more than `--threshold`.
+
+Usage: python benchmarks/bench_generate.py [--scales 1,5,20] [--repeat 3] [--output results.json]
+                                           [--baseline results.json] [--threshold 0.2]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(BENCHMARKS, "..")
+
+sys.path.insert(0, BENCHMARKS)
+
+from corpus import generate_corpus
+
+
+def run_generator(docs):
+    """Runs in the child process: generates the declarations in `docs` and prints the measurements as JSON"""
+    sys.path.insert(0, ROOT)
+    import spel2gen
+
+    result = spel2gen.generate(spel2gen.Config(root=os.path.dirname(docs), cache=None))
+    timings = result.timings
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if platform.system() != "Darwin":
+        peak_rss *= 1024  # kilobytes on Linux, bytes on macOS
+    print(json.dumps({"phases": timings, "peak_rss": peak_rss}))
+
+
+def measure(docs):
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run", docs],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        check=True,
+        text=True,
+    )
+    result = json.loads(process.stdout)
+    result["wall"] = time.perf_counter() - start
+    return result
+
+
+def benchmark(scale, repeat):
+    with tempfile.TemporaryDirectory() as root:
+        files = generate_corpus(root, scale)
+        runs = [measure(os.path.join(root, "docs")) for _ in range(repeat)]
+        output = os.path.getsize(os.path.join(root, "docs", "spel2_declarations_unmodified.d.ts"))
+    best = min(runs, key=lambda run: run["wall"])
+    return {
+        "scale": scale,
+        "files": files,
+        "output_bytes": output,
+        "wall": best["wall"],
+        "peak_rss": max(run["peak_rss"] for run in runs),
+        "phases": best["phases"],
+    }
+
+
+def regressions(results, baseline, threshold):
+    """Scales slower than in the baseline by more than `threshold` (a fraction of the baseline wall time)"""
+    baseline_by_scale = {result["scale"]: result for result in baseline["results"]}
+    slower = []
+    for result in results:
+        previous = baseline_by_scale.get(result["scale"])
+        if previous and result["wall"] > previous["wall"] * (1 + threshold):
+            slower.append((result["scale"], previous["wall"], result["wall"]))
+    return slower
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", default="1,5,20", help="comma separated corpus scales (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="save the results to this JSON file")
+    parser.add_argument("--baseline", help="results JSON of a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown vs the baseline (default: %(default)s)")
+    parser.add_argument("--run", metavar="DOCS", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_generator(args.run)
+        sys.exit()
+
+    results = []
+    print(f"{'scale':>5} {'files':>5} {'output':>9} {'wall':>8} {'peak RSS':>9}  phases")
+    for scale in (float(scale) for scale in args.scales.split(",")):
+        result = benchmark(scale, args.repeat)
+        results.append(result)
+        phases = ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in result["phases"].items())
+        print(
+            f"{scale:>5g} {result['files']:>5} {result['output_bytes'] / 1024:>7.0f}KB {result['wall']:>7.3f}s "
+            f"{result['peak_rss'] / 2**20:>7.1f}MB  {phases}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump({"python": platform.python_version(), "results": results}, fp, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
+        slower = regressions(results, baseline, args.threshold)
+        for scale, before, after in slower:
+            print(f"Regression at scale {scale:g}: {before:.3f}s -> {after:.3f}s (+{after / before - 1:.0%})")
+        if slower:
+            sys.exit(1)
+        print(f"No scale slower than the baseline by more than {args.threshold:.0%}")
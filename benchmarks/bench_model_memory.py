@@ -0,0 +1,126 @@
+"""Memory of the parsed and linked API, slotted model records (model.py) vs the nested dicts they replaced
+
+Parses and links the sources of an Overlunky checkout like generate_ts.py does (from its `docs` directory, without
+the parse cache) and measures the deep size of the result: every distinct object reachable from the model and the
+linked types, counted once. The dict layout is rebuilt from the same records with the keys the generator used
+before (`{"name": ..., "return": ..., "comment": [...]}`...), a comment list per record, and goes through a pickle
+round trip like the cached records do, which keeps equal strings shared within the whole layout.
+
+Usage: python benchmarks/bench_model_memory.py [DOCS]   (default: the current directory)
+"""
+import argparse
+import dataclasses
+import os
+import pickle
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+sys.path.insert(0, ROOT)
+
+from spel2gen.config import Config
+from spel2gen.generator import link_usertypes, parse_sources
+from spel2gen.model import Binding, CppClass, Field, Member, Rpc, Usertype
+from spel2gen.parse_cache import ParseCache
+from spel2gen.symbol_table import SymbolTable
+
+
+def deep_size(root):
+    """Bytes of every distinct object reachable from `root` (containers, records and their values)"""
+    seen = set()
+    size = 0
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set)):
+            stack.extend(obj)
+        elif dataclasses.is_dataclass(obj):
+            stack.extend(getattr(obj, f.name) for f in dataclasses.fields(obj))
+        elif hasattr(obj, "__dict__"):
+            stack.append(vars(obj))
+    return size
+
+
+def as_dict(record):
+    """A record in the dict layout of the generator before model.py"""
+    if isinstance(record, Rpc):
+        return {"return": record.returns, "name": record.name, "param": record.param, "comment": list(record.comment)}
+    if isinstance(record, Member):
+        if record.param is None:
+            return {"type": record.type, "name": record.name, "comment": list(record.comment)}
+        return {"return": record.type, "name": record.name, "param": record.param, "comment": list(record.comment)}
+    if isinstance(record, CppClass):
+        return {
+            "name": record.name,
+            "member_funs": {name: [as_dict(fun) for fun in funs] for name, funs in record.member_funs.items()},
+            "member_vars": as_table(record.member_vars),
+            "file": record.file,
+        }
+    if isinstance(record, Binding):
+        if record.cpp:
+            return {"name": record.name, "cpp": record.cpp, "comment": list(record.comment)}
+        return {"name": record.name, "comment": list(record.comment)}
+    if isinstance(record, Field):
+        var = {"name": record.name, "type": record.type}
+        if record.signature is not None:
+            var["signature"] = record.signature
+        if record.comment is not None:
+            var["comment"] = list(record.comment)
+        return var
+    if isinstance(record, Usertype):
+        return {
+            "name": record.name,
+            "vars": [as_dict(var) for var in record.fields],
+            "base": record.base,
+            "file": record.file,
+            "cpp_file": record.cpp_file,
+        }
+    raise TypeError(record)
+
+
+def as_table(table):
+    """SymbolTable of dicts with the same names, extra names (array members) included"""
+    converted = {id(record): as_dict(record) for record in table}
+    dict_table = SymbolTable()
+    dict_table.records = [converted[id(record)] for record in table]
+    dict_table.index = {name: [converted[id(record)] for record in records] for name, records in table.index.items()}
+    return dict_table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory of the parsed and linked API, model records vs dicts")
+    parser.add_argument("docs", nargs="?", default=".", help="the docs directory of an Overlunky checkout (default: %(default)s)")
+    args = parser.parse_args()
+    os.chdir(args.docs)
+    model = parse_sources(Config(root=".."), ParseCache(None))
+    types = link_usertypes(model)
+
+    records = (model, types)
+    layout = {
+        "rpc": as_table(model.rpc),
+        "classes": as_table(model.classes),
+        "events": [as_dict(event) for event in model.events],
+        "funcs": as_table(model.funcs),
+        "usertypes": [(usertype.file, usertype.cpp_type, usertype.name, usertype.attrs) for usertype in model.usertypes],
+        "known_casts": model.known_casts,
+        "type_comments": [(name, list(comment)) for name, comment in model.type_comments],
+        "lualibs": model.lualibs,
+        "types": as_table(types),
+    }
+    dicts = pickle.loads(pickle.dumps(layout, pickle.HIGHEST_PROTOCOL))
+
+    count = len(model.rpc) + len(model.events) + len(model.funcs) + len(types)
+    count += sum(1 + len(cls.member_vars) + sum(map(len, cls.member_funs.values())) for cls in model.classes)
+    count += sum(len(usertype.fields) for usertype in types)
+    new = deep_size(records)
+    old = deep_size(dicts)
+    print(f"{count} records")
+    print(f"dicts   {old / 2**20:>7.2f} MB")
+    print(f"model   {new / 2**20:>7.2f} MB  ({1 - new / old:.0%} less)")
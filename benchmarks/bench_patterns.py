@@ -0,0 +1,73 @@
+"""Per-line cost of the regexes of the header/api loops, inline pattern strings vs the precompiled, prechecked ones
+
+Usage: python benchmarks/bench_patterns.py [path to overlunky/src]
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from spel2gen.patterns import (
+    reDocComment,
+    reEvent,
+    reFunction,
+    reLuaFunction,
+    reMemberFunction,
+    reMemberVar,
+    reUsertypeName,
+)
+
+
+def inline(line):
+    re.search(r"/// ?(.*)$", line)
+    re.search(r"\s*(.*)\s+([^\(]*)\(([^\)]*)", line)
+    re.search(r"\s*(virtual\s)?(.*)\s+([^\(]*)\(([^\)]*)", line)
+    re.search(r"\s*([^\;\{]*)\s+([^\;^\{}]*)\s*(\{[^\}]*\})?\;", line)
+    re.search(r'lua\[[\'"]([^\'"]*)[\'"]\];', line)
+    re.search(r'lua\[[\'"]([^\'"]*)[\'"]\]\s+=\s+(.*?)(?:;|$)', line)
+    re.findall(r"new_usertype\<(.*?)\>", line)
+
+
+def precompiled(line):
+    "///" in line and reDocComment.search(line)
+    if "(" in line:
+        reFunction.search(line)
+        reMemberFunction.search(line)
+    ";" in line and reMemberVar.search(line)
+    if "lua[" in line:
+        reEvent.search(line)
+        reLuaFunction.search(line)
+    "new_usertype<" in line and reUsertypeName.findall(line)
+
+
+def per_line(fun, lines):
+    start = time.perf_counter()
+    for line in lines:
+        fun(line)
+    return (time.perf_counter() - start) / len(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-line cost of inline vs precompiled regexes")
+    parser.add_argument("src", nargs="?", default="../src", help="the src directory of an Overlunky checkout (default: %(default)s)")
+    src = parser.parse_args().src
+    files = [
+        file
+        for pattern in ("game_api/**/*.hpp", "game_api/**/*_lua.cpp", "imgui/imgui.h")
+        for file in glob.glob(os.path.join(src, pattern), recursive=True)
+    ]
+    if not files:
+        sys.exit(f"No source files found in {src}")
+    lines = []
+    for file in files:
+        with open(file, "r", encoding="utf-8", errors="replace") as fp:
+            lines += fp.read().split("\n")
+    t_inline = per_line(inline, lines)
+    t_precompiled = per_line(precompiled, lines)
+    print(f"{len(lines)} lines from {len(files)} files")
+    print(f"inline:      {t_inline * 1e9:>8.0f} ns/line")
+    print(f"precompiled: {t_precompiled * 1e9:>8.0f} ns/line ({t_inline / t_precompiled:.1f}x)")
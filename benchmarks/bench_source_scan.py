@@ -0,0 +1,184 @@
+"""Time and peak memory of the source scans, files read as text vs memory-mapped (source_file.py)
+
+Runs on the header and api files the generator reads, from an Overlunky `docs` directory:
+
+- hash: what a cached file costs, reading it as text and hashing its encoding vs hashing the mapped bytes
+- headers: scan_header_file (rpc lines and cpp_parser classes), both decode the whole file, cpp_parser needs it
+- api: scan_api_file, the text version splits the file into lines and joins a copy without newlines and spaces
+
+The text versions are the scanners before source_file.py. Reports the best of `--repeat` times and the largest
+peak of the Python allocations while scanning one file (tracemalloc, the copies of the file and its records),
+the mapped pages aren't allocations: they are the page cache of the files, shared and dropped by the kernel.
+
+Usage: python benchmarks/bench_source_scan.py [DOCS] [--repeat 5]
+"""
+import argparse
+import hashlib
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from spel2gen.config import Config
+from spel2gen.model import Binding, Cast, Rpc, Usertype, intern, shared_comment
+from spel2gen.patterns import reCast, reDocComment, reEvent, reFunction, reLuaFunction, reUsertype, reUsertypeName
+from spel2gen.source_file import SourceFile
+from spel2gen.source_parser import header_classes, scan_api_file, scan_header_file
+
+reTextOpenLibraries = re.compile(r"open_libraries\s*\(([^\)]*)\)")
+
+
+def read_text(file):
+    with open(file, "r") as fp:
+        return fp.read()
+
+
+def text_hash(file):
+    return hashlib.blake2b(read_text(file).encode("utf-8"), digest_size=16).digest()
+
+
+def mapped_hash(file):
+    with SourceFile(file) as source:
+        return source.content_hash()
+
+
+def text_scan_header_file(file):
+    data = read_text(file)
+    file_rpc = []
+    comment = []
+    skip = 0
+    for line in data.split("\n"):
+        line = line.replace("*", "")
+        skip += line.count("{") - line.count("}")
+        c = "///" in line and reDocComment.search(line)
+        if c:
+            comment.append(c.group(1))
+        m = "(" in line and reFunction.search(line)
+        if m:
+            if skip == 0 or file.endswith("script.hpp"):
+                file_rpc.append(Rpc(intern(m.group(2)), m.group(1), m.group(3), comment))
+        else:
+            comment = []
+    for rpc in file_rpc:
+        rpc.comment = shared_comment(rpc.comment)
+    if file.endswith("script.hpp"):
+        return {"rpc": file_rpc, "classes": []}
+    return {"rpc": file_rpc, "classes": header_classes(data)}
+
+
+def text_scan_api_file(file):
+    data = read_text(file)
+    file_events = []
+    file_funcs = []
+    file_casts = []
+    file_type_comments = []
+    events_comment = []
+    funcs_comment = []
+    types_comment = []
+    for raw_line in data.split("\n"):
+        if 'lua["Entity"]["as_' in raw_line:
+            m = reCast.search(raw_line)
+            if m != None:
+                file_casts.append(Cast(intern(m.group(1)), m.group(2)))
+        line = raw_line.replace("*", "")
+        c = "///" in line and reDocComment.search(line)
+        has_lua = "lua[" in line
+        m = has_lua and reEvent.search(line)
+        if m:
+            file_events.append(Binding(intern(m.group(1)), "", events_comment))
+        else:
+            events_comment = []
+        if c:
+            events_comment.append(c.group(1))
+        else:
+            events_comment = []
+        m = has_lua and reLuaFunction.search(line)
+        if m and not m.group(1).startswith("__"):
+            file_funcs.append(Binding(intern(m.group(1)), m.group(2), shared_comment(funcs_comment)))
+            funcs_comment = []
+        if c:
+            funcs_comment.append(c.group(1))
+        m = "new_usertype<" in line and reUsertypeName.findall(line)
+        if m:
+            file_type_comments.append((intern(m[0]), shared_comment(types_comment)))
+            types_comment = []
+        if line == "":
+            types_comment = []
+        if c:
+            types_comment.append(c.group(1))
+    for event in file_events:
+        event.comment = shared_comment(event.comment)
+    data = data.replace("\n", "")
+    data = data.replace(" ", "")
+    file_usertypes = [
+        Usertype(intern(name), intern(cpp_type), attrs, file) for cpp_type, name, attrs in reUsertype.findall(data)
+    ]
+    file_lualibs = []
+    m = reTextOpenLibraries.search(data)
+    if m:
+        file_lualibs = [lib.replace("sol::lib::", "") for lib in m.group(1).split(",")]
+    return {
+        "events": file_events,
+        "funcs": file_funcs,
+        "usertypes": file_usertypes,
+        "casts": file_casts,
+        "type_comments": file_type_comments,
+        "lualibs": file_lualibs,
+    }
+
+
+def mapped(scanner):
+    def scan(file):
+        with SourceFile(file) as source:
+            return scanner(file, source)
+
+    return scan
+
+
+def measure(fun, files, repeat):
+    """Best time of `repeat` runs over all the files, largest peak of the Python allocations while scanning a file"""
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for file in files:
+            fun(file)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    results = []
+    peak = 0
+    tracemalloc.start()
+    for file in files:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        results.append(fun(file))
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    return elapsed, peak, results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("docs", nargs="?", default=".")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    os.chdir(args.docs)
+
+    config = Config(root="..")
+    header_files = [config.source(file) for file in config.header_files]
+    api_files = [config.source(file) for file in config.api_files]
+    size = sum(os.path.getsize(file) for file in header_files + api_files)
+    print(f"{len(header_files)} header files, {len(api_files)} api files, {size / 2**20:.2f} MB")
+    for label, files, text_fun, mapped_fun in (
+        ("hash", header_files + api_files, text_hash, mapped_hash),
+        ("headers", header_files, text_scan_header_file, mapped(scan_header_file)),
+        ("api", api_files, text_scan_api_file, mapped(scan_api_file)),
+    ):
+        text_time, text_peak, text_results = measure(text_fun, files, args.repeat)
+        mapped_time, mapped_peak, mapped_results = measure(mapped_fun, files, args.repeat)
+        same = "" if repr(text_results) == repr(mapped_results) else "  (results differ!)"
+        print(
+            f"{label:<8} text {text_time * 1000:>8.1f} ms {text_peak / 2**20:>7.2f} MB   "
+            f"mapped {mapped_time * 1000:>8.1f} ms {mapped_peak / 2**20:>7.2f} MB{same}"
+        )
@@ -0,0 +1,124 @@
+"""Prefix lookups in the symbol index (symbol_index.py) compared to re-scanning the declarations file
+
+Parses a synthetic tree (see corpus.py) whose ENT_TYPE is replaced by the real one of spel2_declarations.d.ts
+(about 1200 members, the synthetic one has a few dozen), writes its declarations and its symbol index, then
+reports the best of `--repeat` times of:
+
+- writing the index, and scanning the declarations file for its names and members the way a tool without the
+  index does (read it, then a regex over every line)
+- opening the index (a memory map and its header)
+- the keys of a prefix (names, for a completion list) and its entries with signature and doc (find), the first
+  find of a freshly opened index decodes the strings it needs, the next ones reuse them
+
+for the prefixes `ENT_TYPE.` (every member), `ENT_TYPE.MONS_`, the members of the class with the most of them
+(inherited ones included) and 100 random two letter prefixes (the average of a lookup).
+
+Usage: python benchmarks/bench_symbol_index.py [--scale 1] [--repeat 20]
+"""
+import argparse
+import dataclasses
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(BENCHMARKS, "..")
+sys.path.insert(0, BENCHMARKS)
+sys.path.insert(0, ROOT)
+
+from corpus import generate_corpus
+from spel2gen.config import Config
+from spel2gen.generator import TypeScriptBackend, parse
+from spel2gen.model import EnumDef
+from spel2gen.symbol_index import SymbolIndex, write_index
+
+reEnumBody = re.compile(r"declare enum ENT_TYPE \{(.*?)\}", re.S)
+reEnumMember = re.compile(r"(\w+) = (\d+)")
+reDeclaredName = re.compile(r"^(?:declare \w+(?: enum)? (\w+)|    (?:static )?(\w+)[(:?])", re.M)
+
+
+def best_time(fun, repeat):
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fun()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return elapsed
+
+
+def real_ent_type(api, declarations):
+    """`api` with the ENT_TYPE of the declarations file"""
+    with open(declarations) as fp:
+        members = tuple(reEnumMember.findall(reEnumBody.search(fp.read())[1]))
+    enums = [EnumDef("ENT_TYPE", members) if enum.name == "ENT_TYPE" else enum for enum in api.enums]
+    return dataclasses.replace(api, enums=enums)
+
+
+def scan_declarations(path):
+    with open(path) as fp:
+        return reDeclaredName.findall(fp.read())
+
+
+def report(label, seconds, extra=""):
+    print(f"{label:<36} {seconds * 1000:>9.3f} ms{extra}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--declarations", default=os.path.join(ROOT, "spel2_declarations.d.ts"))
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work:
+        sys.stderr = open(os.devnull, "w")  # the report of the merged duplicates
+        root = os.path.join(work, "tree")
+        generate_corpus(root, args.scale)
+        api = real_ent_type(parse(Config(root=root)), args.declarations)
+        declarations = os.path.join(work, "declarations.d.ts")
+        TypeScriptBackend(declarations).write(api)
+        path = os.path.join(work, "symbols.idx")
+
+        def write():
+            os.remove(path) if os.path.exists(path) else None
+            write_index(api, path)
+
+        report("write index", best_time(write, args.repeat))
+        with SymbolIndex(path) as index:
+            entries = len(index)
+        print(f"{'entries':<36} {entries:>9}")
+        print(f"{'index':<36} {os.path.getsize(path) / 1024:>9.0f} KB")
+        print(f"{'declarations':<36} {os.path.getsize(declarations) / 1024:>9.0f} KB")
+        report("scan declarations", best_time(lambda: scan_declarations(declarations), args.repeat))
+        report("open index", best_time(lambda: SymbolIndex(path).close(), args.repeat))
+
+        with SymbolIndex(path) as index:
+            largest = max((type.name for type in api.types), key=lambda name: len(index.names(f"{name}.")))
+        rng = random.Random(1)
+        letters = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_"
+        random_prefixes = ["".join(rng.choice(letters) for _ in range(2)) for _ in range(100)]
+        with SymbolIndex(path) as index:
+            for label, prefixes in (
+                ("ENT_TYPE.", ["ENT_TYPE."]),
+                ("ENT_TYPE.MONS_", ["ENT_TYPE.MONS_"]),
+                (f"{largest}.", [f"{largest}."]),
+                ("100 random 2 letters", random_prefixes),
+            ):
+                found = sum(len(index.names(prefix)) for prefix in prefixes)
+
+                def first_find():
+                    with SymbolIndex(path) as fresh:
+                        for prefix in prefixes:
+                            fresh.find(prefix)
+
+                count = len(prefixes)
+                names_time = best_time(lambda: [index.names(prefix) for prefix in prefixes], args.repeat) / count
+                first_time = best_time(first_find, args.repeat) / count
+                find_time = best_time(lambda: [index.find(prefix) for prefix in prefixes], args.repeat) / count
+                print(f"{label} ({found / count:.0f} entries)")
+                report("  names", names_time)
+                report("  first find, open included", first_time)
+                report("  find", find_time)
@@ -0,0 +1,78 @@
+"""Compares the old linear lookups of generate_ts.py against the SymbolTable indexes
+
+Builds a synthetic API the size of the current one (1x) and a 10x larger one and runs the
+lookups the generator does: every binding against the rpc functions, every usertype against
+the classes and every usertype attribute against the member variables of its class.
+
+Usage: python benchmarks/bench_symbol_table.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from spel2gen.model import CppClass, Member, Rpc
+from spel2gen.symbol_table import SymbolTable, member_var_table
+
+# rough size of the current api
+FUNCS = 230
+RPC = 700
+CLASSES = 450
+VARS_PER_CLASS = 20
+
+
+def make_api(scale):
+    rpc = [{"name": f"func_{i % int(RPC * scale * 0.9)}", "param": ""} for i in range(int(RPC * scale))]
+    funcs = [{"name": f"lua_func_{i}", "cpp": f"func_{i * 3}"} for i in range(int(FUNCS * scale))]
+    classes = []
+    for i in range(int(CLASSES * scale)):
+        member_vars = [{"name": f"var_{j}" if j % 5 else f"arr_{j}[4]"} for j in range(VARS_PER_CLASS)]
+        classes.append({"name": f"Class{i}", "member_vars": member_vars})
+    return rpc, funcs, classes
+
+
+def linear(rpc, funcs, classes):
+    for func in funcs:
+        [item for item in rpc if item["name"] == func["cpp"]]
+    for cls in classes:
+        found = next(item for item in classes if item["name"] == cls["name"])
+        for j in range(VARS_PER_CLASS):
+            cpp_name = f"var_{j}" if j % 5 else f"arr_{j}"
+            next(
+                (
+                    item
+                    for item in found["member_vars"]
+                    if item["name"] == cpp_name or (item["name"].endswith("]") and f"{cpp_name}[" in item["name"])
+                ),
+                dict(),
+            )
+
+
+def indexed(rpc, funcs, classes):
+    rpc = SymbolTable(Rpc(item["name"], "", item["param"]) for item in rpc)
+    classes = SymbolTable(
+        CppClass(cls["name"], {}, member_var_table([Member(var["name"], "") for var in cls["member_vars"]]))
+        for cls in classes
+    )
+    for func in funcs:
+        rpc.get_all(func["cpp"])
+    for cls in classes:
+        found = classes.get(cls.name)
+        for j in range(VARS_PER_CLASS):
+            found.member_vars.get(f"var_{j}" if j % 5 else f"arr_{j}")
+
+
+def timed(fun, *args):
+    start = time.perf_counter()
+    fun(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(f"{'scale':>6} {'linear':>10} {'indexed':>10} {'speedup':>8}")
+    for scale in (1, 10):
+        api = make_api(scale)
+        t_linear = timed(linear, *api)
+        t_indexed = timed(indexed, *api)
+        print(f"{scale:>5}x {t_linear * 1000:>8.1f}ms {t_indexed * 1000:>8.1f}ms {t_linear / t_indexed:>7.0f}x")
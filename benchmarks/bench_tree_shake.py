@@ -0,0 +1,123 @@
+"""Time of the tree shaking (tree_shaking.py) and tsc --noEmit on a script, whole declarations vs shaken ones
+
+Parses a synthetic tree (see corpus.py) and writes a script that calls `--functions` of its functions and
+accesses a member of `--classes` of its classes, or with `--docs` parses the Overlunky checkout of that `docs`
+directory and uses `--script` (test_script.ts by default). Reports the best of `--repeat` times of building the
+DeclarationGraph (once per generation), scanning the script and computing the closure (once per build of a
+project), writing the shaken file, and writing the whole declarations for comparison, then the size of both files.
+
+When tsc is installed (npm install) both files are also type-checked with the script, with the compiler options
+of ./tsconfig.json (see bench_tsc_layout.py). The synthetic declarations have type errors of their own, the
+times still compare.
+
+Usage: python benchmarks/bench_tree_shake.py [--scale 1] [--functions 20] [--classes 10] [--repeat 5]
+       python benchmarks/bench_tree_shake.py --docs DOCS [--script test_script.ts]
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(BENCHMARKS, "..")
+sys.path.insert(0, BENCHMARKS)
+sys.path.insert(0, ROOT)
+
+from bench_tsc_layout import run_tsc, write_config
+from corpus import generate_corpus
+from spel2gen.config import Config
+from spel2gen.generator import TypeScriptBackend, parse
+from spel2gen.signatures import declared_functions
+from spel2gen.tree_shaking import DeclarationGraph, script_identifiers, write_shaken
+
+reDeclaration = re.compile(r"^declare (?:const enum|enum|class|interface|function|const|let|type) (\w+)", re.M)
+
+
+def best_time(fun, repeat):
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fun()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return elapsed
+
+
+def write_script(api, path, functions, classes, seed=1):
+    """A script using some functions and a member of some classes of `api`, like a mod touching a few symbols"""
+    rng = random.Random(seed)
+    names = sorted({name for name, _, _, _ in declared_functions(api)})
+    types = [type for type in api.types if type.fields]
+    lines = [f"{name}()" for name in rng.sample(names, min(functions, len(names)))]
+    for n, type in enumerate(rng.sample(types, min(classes, len(types)))):
+        member = rng.choice(type.fields).name.partition("[")[0]
+        lines.append(f"declare let value{n}: {type.name}")
+        lines.append(f"value{n}.{member}")
+    with open(path, "w") as fp:
+        fp.write("\n".join(lines) + "\n")
+
+
+def declared_names(path):
+    with open(path) as fp:
+        text = fp.read()
+    return len(set(reDeclaration.findall(text))), len(text)
+
+
+def benchmark(api, script, work, repeat, tsc):
+    full = os.path.join(work, "full.d.ts")
+    shaken = os.path.join(work, "shaken.d.ts")
+    graph = DeclarationGraph(api)
+    identifiers = script_identifiers([script])
+    for label, fun in (
+        ("declaration graph", lambda: DeclarationGraph(api)),
+        ("scan and closure", lambda: graph.closure(script_identifiers([script]))),
+        ("write shaken", lambda: write_shaken(api, [script], shaken, graph=graph)),
+        ("write whole", lambda: TypeScriptBackend(full).write(api)),
+    ):
+        print(f"{label:<24} {best_time(fun, repeat) * 1000:>9.2f} ms")
+    print(f"{'identifiers':<24} {len(identifiers):>9}")
+    for label, path in (("whole", full), ("shaken", shaken)):
+        names, size = declared_names(path)
+        print(f"{label:<24} {names:>9} names {size / 1024:>8.0f} KB")
+
+    if not os.path.exists(tsc):
+        print(f"tsc not found at {tsc}, run npm install to compare the type-checking times")
+        return
+    with open(os.path.join(ROOT, "tsconfig.json")) as fp:
+        compiler_options = json.load(fp)["compilerOptions"]
+    for n, (label, path) in enumerate((("tsc, whole", full), ("tsc, shaken", shaken))):
+        config = write_config(f"shake{n}", compiler_options, [script, path])
+        try:
+            runs = [run_tsc(tsc, config) for _ in range(repeat)]
+        finally:
+            os.remove(config)
+        errors = "" if runs[0][2] == 0 else " (type errors)"
+        print(f"{label:<24} {min(run[0] for run in runs):>9.3f} s {max(run[1] for run in runs):>8.1f} MB{errors}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--functions", type=int, default=20)
+    parser.add_argument("--classes", type=int, default=10)
+    parser.add_argument("--docs", help="docs directory of an Overlunky checkout instead of a synthetic tree")
+    parser.add_argument("--script", default=os.path.join(ROOT, "test_script.ts"))
+    parser.add_argument("--tsc", default=os.path.join(ROOT, "node_modules", ".bin", "tsc"))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work:
+        sys.stderr = open(os.devnull, "w")  # the report of the merged duplicates
+        if args.docs:
+            api = parse(Config(root=os.path.join(args.docs, "..")))
+            script = os.path.abspath(args.script)
+        else:
+            root = os.path.join(work, "tree")
+            generate_corpus(root, args.scale)
+            api = parse(Config(root=root))
+            script = os.path.join(work, "script.ts")
+            write_script(api, script, args.functions, args.classes)
+        benchmark(api, script, work, args.repeat, args.tsc)
@@ -0,0 +1,67 @@
+"""tsc --noEmit time and peak RSS on a script, single declarations file vs the split layout (generate_ts.py --split)
+
+Every layout is checked with a temporary tsconfig next to ./tsconfig.json, with its compiler options, the script
+and the declarations of the layout: the single file, the split index or only some of the split parts.
+
+Usage: python benchmarks/bench_tsc_layout.py [--declarations FILE] [--split DIR] [--parts core,enums,...]
+                                             [--script test_script.ts] [--tsc node_modules/.bin/tsc] [--repeat N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def run_tsc(tsc, config):
+    """Wall time in seconds, peak RSS in MB and exit code of one `tsc --noEmit -p config`"""
+    start = time.perf_counter()
+    process = subprocess.Popen([tsc, "--noEmit", "-p", config], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    return elapsed, usage.ru_maxrss / 1024, os.waitstatus_to_exitcode(status)
+
+
+def write_config(name, compiler_options, files):
+    # next to tsconfig.json so "types" resolves from the same node_modules
+    path = os.path.join(ROOT, f".tsconfig.bench{name}.json")
+    with open(path, "w") as fp:
+        json.dump({"compilerOptions": {**compiler_options, "noEmit": True}, "files": [os.path.abspath(file) for file in files]}, fp)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--declarations", default=os.path.join(ROOT, "spel2_declarations.d.ts"))
+    parser.add_argument("--split", help="directory written by generate_ts.py --split")
+    parser.add_argument("--parts", help="comma separated parts of the split layout to also check on their own")
+    parser.add_argument("--script", default=os.path.join(ROOT, "test_script.ts"))
+    parser.add_argument("--tsc", default=os.path.join(ROOT, "node_modules", ".bin", "tsc"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.tsc):
+        sys.exit(f"tsc not found at {args.tsc}, run npm install first")
+    with open(os.path.join(ROOT, "tsconfig.json")) as fp:
+        compiler_options = json.load(fp)["compilerOptions"]
+
+    layouts = [("single file", [args.declarations])]
+    if args.split:
+        layouts.append(("split, index", [os.path.join(args.split, "index.d.ts")]))
+        if args.parts:
+            parts = args.parts.split(",")
+            layouts.append((f"split, {'+'.join(parts)}", [os.path.join(args.split, f"{part}.d.ts") for part in parts]))
+
+    for n, (label, declarations) in enumerate(layouts):
+        config = write_config(n, compiler_options, [args.script, *declarations])
+        try:
+            runs = [run_tsc(args.tsc, config) for _ in range(args.repeat)]
+        finally:
+            os.remove(config)
+        elapsed = min(run[0] for run in runs)
+        rss = max(run[1] for run in runs)
+        errors = "" if runs[0][2] == 0 else " (type errors)"
+        print(f"{label:<30} {elapsed:>7.3f} s  {rss:>7.1f} MB{errors}")
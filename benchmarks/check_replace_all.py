@@ -0,0 +1,78 @@
+"""Differential check of the TypeTranslator against the original replace_all
+
+Runs a full generation of the Overlunky checkout `--root` (by default the one this docs directory is in), or
+of a synthetic tree with `--scale` (see corpus.py), records every string that goes through replace_all, then
+translates each of them with the original implementation and reports any difference. Runs from any directory,
+the declarations are written to a temporary one.
+
+Usage: python benchmarks/check_replace_all.py [--root ROOT | --scale 1]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+generator_dir = os.path.join(BENCHMARKS, "..")
+sys.path.insert(0, BENCHMARKS)
+sys.path.insert(0, generator_dir)
+
+from spel2gen import type_translation
+from spel2gen.patterns import reArr, reBool, reMap, reNumber, reOptional, reTuple
+
+
+def original_replace_all(text, dic):
+    for i, j in dic.items():
+        pos = text.find(i)
+        br2 = text.find('`', pos + len(i))
+        br1 = text.rfind('`', 0, pos)
+        if pos > 0 and br1 >= 0 and br2 > 0:
+            continue
+        text = text.replace(i, j)
+    text = reNumber.sub("number", text)
+    text = reMap.sub("LuaTable<", text)
+    if "Array<" in text:
+        newText = text
+        while True:
+            newText = reArr.sub(r"FixedSizeArray\1", text)
+            if newText == text:
+                break
+            text = newText
+    text = reTuple.sub(r"LuaMultiReturn<[\1]>", text)
+    text = reBool.sub("boolean", text)
+    text = reOptional.sub(r"\1 | undefined", text)
+    return text
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--root", default=os.path.join(generator_dir, ".."))
+    parser.add_argument("--scale", type=float, help="generate a synthetic tree of this scale instead")
+    args = parser.parse_args()
+
+    seen = set()
+    translate = type_translation.replace_all
+
+    def recording_replace_all(text):
+        seen.add(text)
+        return translate(text)
+
+    # must be patched before the generator modules import it
+    type_translation.replace_all = recording_replace_all
+    from spel2gen import Config, generate
+
+    with tempfile.TemporaryDirectory() as work:
+        root = args.root
+        if args.scale:
+            from corpus import generate_corpus
+
+            root = os.path.join(work, "tree")
+            generate_corpus(root, args.scale)
+        generate(Config(root=root, output=os.path.join(work, "declarations.d.ts")))
+
+    fresh = type_translation.TypeTranslator(type_translation.replace)
+    mismatches = [text for text in seen if fresh(text) != original_replace_all(text, type_translation.replace)]
+    for text in mismatches:
+        print(f"{text!r}\n  original: {original_replace_all(text, type_translation.replace)!r}\n  new:      {fresh(text)!r}")
+    print(f"{len(seen)} strings checked, {len(mismatches)} differences")
+    sys.exit(1 if mismatches else 0)
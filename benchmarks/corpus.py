@@ -0,0 +1,304 @@
+"""Synthetic Overlunky source tree for benchmarking generate_ts.py
+
+Writes `<root>/src/...` with every header and api file generate_ts.py reads and `<root>/docs/game_data/spel2.lua`,
+so the generator can run from `<root>/docs`. The files have the shapes the generator handles: structs with `///`
+doc comments, initialized members, arrays, multi-variable declarations, unions with anonymous structs, overloads,
+constructors, `new_usertype<...>` blocks with readonly members, properties and base classes, `lua["..."] = ...`
+bindings of free functions and lambdas, events, entity casts, aliases and enum tables.
+
+`scale` multiplies the number of structs, functions, aliases and enums (1 is roughly the size of the real API),
+the same scale and seed always give the same tree.
+
+Usage: python benchmarks/corpus.py ROOT [SCALE] [SEED]
+"""
+import os
+import random
+import sys
+
+HEADERS = [
+    "math.hpp", "rpc.hpp", "spawn_api.hpp", "script.hpp", "color.hpp", "entity.hpp", "movable.hpp",
+    "game_manager.hpp", "state.hpp", "state_structs.hpp", "prng.hpp", "entities_floors.hpp",
+    "entities_activefloors.hpp", "entities_mounts.hpp", "entities_monsters.hpp", "entities_chars.hpp",
+    "entities_items.hpp", "entities_fx.hpp", "entities_liquids.hpp", "entities_backgrounds.hpp",
+    "entities_decorations.hpp", "entities_logical.hpp", "sound_manager.hpp", "render_api.hpp", "particles.hpp",
+    "savedata.hpp", "level_api.hpp", "level_api_types.hpp", "items.hpp", "screen.hpp", "screen_arena.hpp",
+    "online.hpp", "strings.hpp",
+]
+USERTYPE_HEADERS = [
+    "level_lua.hpp", "gui_lua.hpp", "vanilla_render_lua.hpp", "save_context.hpp", "hitbox_lua.hpp", "socket_lua.hpp",
+]
+USERTYPE_FILES = [
+    "save_context.cpp", "state_lua.cpp", "prng_lua.cpp", "entity_lua.cpp", "entities_chars_lua.cpp",
+    "entities_floors_lua.cpp", "entities_activefloors_lua.cpp", "entities_mounts_lua.cpp", "entities_monsters_lua.cpp",
+    "entities_items_lua.cpp", "entities_fx_lua.cpp", "entities_liquids_lua.cpp", "entities_backgrounds_lua.cpp",
+    "entities_decorations_lua.cpp", "entities_logical_lua.cpp", "particles_lua.cpp", "level_lua.cpp", "sound_lua.cpp",
+    "player_lua.cpp", "gui_lua.cpp", "gui_lua.hpp", "vanilla_render_lua.cpp", "vanilla_render_lua.hpp",
+    "drops_lua.cpp", "texture_lua.cpp", "flags_lua.cpp", "char_state_lua.cpp", "hitbox_lua.cpp", "screen_lua.cpp",
+    "screen_arena_lua.cpp", "socket_lua.cpp",
+]
+SCRIPT_FILES = ["script_impl.cpp", "script_impl.hpp", "lua_vm.cpp", "lua_vm.hpp", "lua_backend.cpp", "lua_backend.hpp"]
+
+TYPES = [
+    "float", "int", "uint8_t", "uint16_t", "uint32_t", "int32_t", "int64_t", "bool", "std::string",
+    "std::vector<uint32_t>", "std::array<float, 4>", "std::optional<int>", "std::pair<float, float>", "Color",
+    "ENT_TYPE", "std::unordered_map<int, std::string>", "std::map<uint8_t, bool>",
+]
+SIMPLE_TYPES = TYPES[:9]
+WORDS = [
+    "alpha", "beta", "gamma", "delta", "speed", "state", "flags", "timer", "health", "count", "target", "owner",
+    "layer", "angle", "offset", "color", "frame", "price", "value", "chance", "kind", "level", "depth", "width",
+    "height", "index",
+]
+
+
+class Corpus:
+    def __init__(self, root, scale=1, seed=1):
+        self.root = root
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self.game_api = os.path.join(root, "src", "game_api")
+        self.usertypes_dir = os.path.join(self.game_api, "script", "usertypes")
+        self.files = {}
+        self.structs = {file: [] for file in USERTYPE_FILES}  # api file -> (name, base, members)
+        self.free_functions = []
+
+    def count(self, n):
+        return int(n * self.scale)
+
+    def words(self, n=2):
+        return "_".join(self.rng.choice(WORDS) for _ in range(n))
+
+    def doc(self, indent=""):
+        return [
+            f"{indent}/// {self.words(3).replace('_', ' ').capitalize()} `{self.rng.choice(TYPES)}`"
+            for _ in range(self.rng.choice([0, 0, 1, 1, 2]))
+        ]
+
+    def params(self, types, most):
+        rng = self.rng
+        return ", ".join(f"{rng.choice(types)} {self.words(1)}{i}" for i in range(rng.randint(0, most)))
+
+    def struct(self, name, base, api_file, fields=6, methods=3, constructors=False):
+        rng = self.rng
+        lines = self.doc()
+        lines.append(f"struct {name}" + (f" : public {base}" if base else ""))
+        lines.append("{")
+        members = []  # (name, "var" / "fun"), None for the constructors
+        if constructors:
+            lines += [
+                f"    {name}() = default;",
+                f"    {name}(const {name}&) = default;",
+                f"    {name}({name}&&) = default;",
+                f"    {name}(float x_, float y_)",
+                "        : x(x_), y(y_){};",
+            ]
+            members.append((None, None))
+        for i in range(fields):
+            member_type = rng.choice(TYPES)
+            member = f"{self.words()}_{i}"
+            lines += self.doc("    ")
+            if rng.random() < 0.1:
+                lines.append(f"    {member_type} {member}[{rng.choice([4, 8, 'MAX_PLAYERS'])}];")
+            elif rng.random() < 0.1:
+                lines.append(f"    char {member}[32];")
+            elif rng.random() < 0.05:
+                lines.append(f"    float {member}, {member}_b;")
+                members.append((member + "_b", "var"))
+            else:
+                lines.append(f"    {member_type} {member}" + (" = 0;" if rng.random() < 0.2 else ";"))
+            members.append((member, "var"))
+        if rng.random() < 0.3:
+            suffix = name.lower()
+            lines += [
+                "    union",
+                "    {",
+                "        /// Union member",
+                f"        uint32_t u_{suffix};",
+                "        struct",
+                "        {",
+                f"            uint16_t lo_{suffix};",
+                f"            uint16_t hi_{suffix};",
+                "        };",
+                "    };",
+            ]
+            members += [(f"u_{suffix}", "var"), (f"lo_{suffix}", "var")]
+        for i in range(methods):
+            method = f"{self.words()}_fn{i}"
+            lines += self.doc("    ")
+            params = self.params(SIMPLE_TYPES, 3)
+            if rng.random() < 0.3:
+                lines.append(f"    virtual {rng.choice(SIMPLE_TYPES)} {method}({params}) = 0;")
+            else:
+                lines.append(f"    {rng.choice(SIMPLE_TYPES + ['void'])} {method}({params});")
+                if rng.random() < 0.2:
+                    lines.append(f"    void {method}({params}, bool extra = false);")
+            members.append((method, "fun"))
+        lines += ["};", ""]
+        self.structs[api_file].append((name, base, members))
+        return lines
+
+    def headers(self):
+        rng = self.rng
+        for header in HEADERS + USERTYPE_HEADERS:
+            path = os.path.join(self.usertypes_dir if header in USERTYPE_HEADERS else self.game_api, header)
+            family = header.replace(".hpp", "")
+            api_file = family + "_lua.cpp" if family + "_lua.cpp" in USERTYPE_FILES else rng.choice(USERTYPE_FILES)
+            lines = ["#pragma once", "", '#include "entity.hpp"', ""]
+            if header in ("rpc.hpp", "spawn_api.hpp", "script.hpp"):
+                in_class = header == "script.hpp"
+                if in_class:
+                    lines += ["class SpelunkyScript", "{", "  public:"]
+                for i in range(5 if in_class else self.count(60)):
+                    function = f"{self.words()}_{header[0]}{i}"
+                    lines += self.doc("    " if in_class else "")
+                    params = self.params(TYPES, 4)
+                    lines.append(f"{rng.choice(TYPES + ['void'])} {function}({params});")
+                    if rng.random() < 0.1:
+                        lines.append(f"void {function}({params}, std::optional<float> z);")
+                    self.free_functions.append(function)
+                if in_class:
+                    lines.append("};")
+
+            structs = self.count(12 if family.startswith("entities_") else 4)
+            base = "Movable" if family.startswith("entities_") else None
+            if header == "script.hpp":
+                structs = 0
+            elif header == "entity.hpp":
+                lines += self.struct("Entity", None, "entity_lua.cpp", 10, 6)
+                structs = 0
+            elif header == "movable.hpp":
+                lines += self.struct("Movable", "Entity", "entity_lua.cpp", 12, 6)
+                structs = 0
+            elif header == "math.hpp":
+                lines += self.struct("AABB", None, "level_lua.cpp", 0, 2, constructors=True)
+            elif header == "color.hpp":
+                lines += self.struct("Color", None, "texture_lua.cpp", 2, 3, constructors=True)
+            for i in range(structs):
+                name = "".join(word.capitalize() for word in self.words().split("_"))
+                name += f"{family.title().replace('_', '')}{i}"
+                struct_base = base if base and rng.random() < 0.7 else None
+                lines += self.struct(name, struct_base, api_file, rng.randint(2, 12), rng.randint(0, 5))
+                if family.startswith("entities_"):
+                    base = name
+            self.files[path] = "\n".join(lines) + "\n"
+
+        imgui = ["struct ImVec2", "{", "    float x, y;", "    ImVec2() { x = y = 0.0f; }", "};", ""]
+        imgui += [f"IMGUI_API void ImFunc{i}(const char* label, int flags = 0);" for i in range(self.count(200))]
+        self.files[os.path.join(self.root, "src", "imgui", "imgui.h")] = "\n".join(imgui) + "\n"
+
+    def api_files(self):
+        rng = self.rng
+        entries = {file: [] for file in USERTYPE_FILES + SCRIPT_FILES}
+        for function in self.free_functions:
+            entry = self.doc("    ")
+            if rng.random() < 0.05:
+                entry = ["    /// Deprecated", "    /// Use something else"]
+            if rng.random() < 0.05:
+                entry = ["    /// NoDoc"]
+            entry.append(f'    lua["{function}"] = {function};')
+            entries[rng.choice(SCRIPT_FILES)].append(entry)
+        for i in range(self.count(40)):
+            file = rng.choice(SCRIPT_FILES)
+            function = f"lambda_{self.words()}_{i}"
+            entry = self.doc("    ")
+            params = self.params(TYPES, 3)
+            if rng.random() < 0.5:
+                entry.append(f'    lua["{function}"] = []({params}) -> {rng.choice(SIMPLE_TYPES)}')
+            else:
+                entry.append(f'    lua["{function}"] = []({params})')
+            entry += ["    {", "        return {};", "    };"]
+            entries[file].append(entry)
+        for i in range(self.count(10)):
+            entries[rng.choice(SCRIPT_FILES)].append(self.doc("    ") + [f'    lua["on_{self.words()}{i}"];'])
+        entries["lua_backend.cpp"].append(['    lua["__index"] = nullptr;', '    lua["players"] = std::vector<Player*>{};'])
+        entries["lua_vm.cpp"].append(
+            ["    lua.open_libraries(sol::lib::math, sol::lib::base, sol::lib::string, sol::lib::table);"]
+        )
+
+        for api_file, structs in self.structs.items():
+            for name, base, members in structs:
+                entry = [f"    /// Usertype {name}"] if rng.random() < 0.5 else []
+                entry += [f"    lua.new_usertype<{name}>(", f'        "{name}",']
+                for member, kind in members:
+                    if kind is None:
+                        entry.append(f"        sol::constructors<{name}(), {name}(const {name}&), {name}(float, float)>(),")
+                        continue
+                    r = rng.random()
+                    if kind == "var" and r < 0.1:
+                        entry += [f'        "{member}",', f"        sol::readonly(&{name}::{member}),"]
+                    elif kind == "var" and r < 0.2:
+                        entry += [f'        "{member}_prop",', f"        sol::property([]({name}& e) {{ return e.{member}; }}),"]
+                    elif kind == "var" and r < 0.25:
+                        entry += [f'        "{member}_calc",', f"        sol::property([]({name}& e) -> float {{ return 1.0f; }}),"]
+                    elif kind == "var" and r < 0.3:
+                        entry += [f'        "{member}_any",', f"        &{name}::{member}_missing,"]
+                    else:
+                        entry += [f'        "{member}",', f"        &{name}::{member},"]
+                if base:
+                    entry += ["        sol::base_classes,", f"        sol::bases<Entity, {base}>());"]
+                else:
+                    entry[-1] = entry[-1][:-1] + ");"
+                    if len(entry) <= 3:
+                        entry.append("        sol::no_constructor);")
+                entry.append("")
+                entries[api_file].append(entry)
+        entries["entity_lua.cpp"] += [
+            [f'    lua["Entity"]["as_{self.words(1)}{i}"] = &Entity::as<Movable>;'] for i in range(self.count(30))
+        ]
+
+        for file, file_entries in entries.items():
+            directory = os.path.join(self.game_api, "script") if file in SCRIPT_FILES else self.usertypes_dir
+            body = ["#include <sol/sol.hpp>", "", "namespace NS", "{", "void register_usertypes(sol::state& lua)", "{"]
+            for entry in file_entries:
+                body += entry + [""]
+            body += ["}", "}; // namespace NS"]
+            path = os.path.join(directory, file)
+            # a few files are both header and api files, their contents add up
+            self.files[path] = self.files.get(path, "") + "\n".join(body) + "\n"
+
+    def aliases(self):
+        rng = self.rng
+        lines = ["#pragma once", "", "#include <cstdint>", ""]
+        targets = ["uint32_t", "int32_t", "std::function<bool()>", "uint8_t"]
+        lines += [f"using {self.words().upper()}_{i} = {rng.choice(targets)};" for i in range(self.count(30))]
+        lines += ["using NOPE = int32_t; // NoAlias", "using ENT_TYPE = uint32_t;", "using LAYER = int32_t;", "using CallbackId = int;"]
+        self.files[os.path.join(self.game_api, "aliases.hpp")] = "\n".join(lines) + "\n"
+
+    def enums(self):
+        rng = self.rng
+        lines = ["meta = {", '  name = "",', "}", ""]
+        for i in range(self.count(50)):
+            # the enum regex only takes upper case letters and underscores in names
+            name = "ENT_TYPE" if i == 0 else f"{self.words().upper()}_" + "".join(chr(65 + int(c)) for c in str(i))
+            lines.append(f"{name} = {{")
+            if i % 17 == 3:
+                lines.append("  __index = 1,")
+            for j in range(self.count(40) if i == 0 else rng.randint(2, 20)):
+                lines.append(f"  {self.words().upper()}_{j} = {j},")
+            lines.append("}")
+        lines.append("function foo() end")
+        self.files[os.path.join(self.root, "docs", "game_data", "spel2.lua")] = "\n".join(lines) + "\n"
+
+    def write(self):
+        self.headers()
+        self.api_files()
+        self.aliases()
+        self.enums()
+        for path, content in self.files.items():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as fp:
+                fp.write(content)
+        return len(self.files)
+
+
+def generate_corpus(root, scale=1, seed=1):
+    """Writes the tree under `root`, returns the number of files"""
+    return Corpus(root, scale, seed).write()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    root = sys.argv[1]
+    files = generate_corpus(root, float(sys.argv[2]) if len(sys.argv) > 2 else 1, int(sys.argv[3]) if len(sys.argv) > 3 else 1)
+    print(f"Wrote {files} files to {root}")
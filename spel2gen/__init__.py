@@ -0,0 +1,28 @@
+"""Generates the TypeScript declarations (and the other outputs) of the Spelunky 2 Lua API from the Overlunky sources
+
+    import spel2gen
+
+    result = spel2gen.generate(spel2gen.Config(root="overlunky", luals="spel2.lua"))
+    api = spel2gen.parse(spel2gen.Config(root="overlunky"))
+
+Importing the package doesn't load the generator, the first generate() or parse() does. Later calls in the same
+process reuse what the earlier ones loaded and parsed (see generator.py), shutdown() stops the parse workers.
+"""
+
+__all__ = ["Config", "Result", "generate", "generate_versions", "parse", "shutdown"]
+
+
+def __getattr__(name):
+    if name in ("Config", "Result"):
+        from . import config
+
+        return getattr(config, name)
+    if name in __all__:
+        from . import generator
+
+        return getattr(generator, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,86 @@
+"""Outputs written from the linked Api, each by a backend, all from the same parse
+
+generator.py parses and links the sources once, then hands the Api to every backend it was asked for:
+the TypeScript declarations (generator.TypeScriptBackend), LuaLS annotations (luals_backend.py), Markdown
+docs (markdown_backend.py), the declarations some scripts use (tree_shaking.py) and the symbol index of the
+editor tooling (symbol_index.py).
+"""
+import traceback
+
+from .instrumentation import stats
+
+
+class BackendError(RuntimeError):
+    pass
+
+
+class Backend:
+    """Writes one kind of output from the linked Api (model.Api)
+
+    `write` is called with the Api of each generation and returns {path: changed section titles} of the files it
+    rewrote, like Emitter.changes(). The backends share the Api and may run in forked processes, so they read it
+    but never modify it.
+    """
+
+    name = ""
+
+    def write(self, api):
+        raise NotImplementedError
+
+
+def run_backends(backends, api, concurrent=False):
+    """Writes the output of each backend, returns their changes merged
+
+    With `concurrent` every backend but the first runs in a forked process while the first runs in this one.
+    Nothing is pickled on the way in, a forked process sees the Api as it was when it was forked, only the
+    changes come back. Without fork (Windows) or when profiling the backends run one after the other.
+    """
+    changes = {}
+    if not concurrent or len(backends) < 2:
+        for backend in backends:
+            with stats.phase(f"{backend.name}_emission"):
+                changes.update(backend.write(api))
+        return changes
+
+    import multiprocessing  # only loaded when there is something to fork
+
+    context = multiprocessing.get_context("fork")
+    forked = []
+    try:
+        for backend in backends[1:]:
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=write_forked, args=(backend, api, sender), daemon=True)
+            process.start()
+            sender.close()
+            forked.append((backend, process, receiver))
+        changes.update(backends[0].write(api))
+    finally:
+        results = [(backend, *receive(process, receiver)) for backend, process, receiver in forked]
+    for backend, ok, result in results:
+        if not ok:
+            raise BackendError(f"{backend.name} backend failed:\n{result}")
+        changes.update(result)
+    return changes
+
+
+def write_forked(backend, api, sender):
+    try:
+        sender.send((True, backend.write(api)))
+    except BaseException:
+        sender.send((False, traceback.format_exc()))
+    finally:
+        sender.close()
+
+
+def receive(process, receiver):
+    """(ok, changes or the traceback) sent by a forked backend, once its process is done"""
+    try:
+        result = receiver.recv()
+    except EOFError:
+        result = (False, "")
+    finally:
+        receiver.close()
+    process.join()
+    if not result[0] and not result[1]:
+        result = (False, f"exited with {process.exitcode}")
+    return result
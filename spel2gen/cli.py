@@ -0,0 +1,265 @@
+"""Command line of the generator (generate_ts.py), everything it does goes through generate() and parse()
+
+Only argparse is imported before the arguments are parsed, --help and the usage errors don't load the generator.
+"""
+import argparse
+import os
+import sys
+import time
+
+report_counters = [
+    "lines_scanned",
+    "regex_evaluations",
+    "symbol_lookups",
+    "any_fallbacks",
+    "merged_declarations",
+]
+
+
+def print_changes(changes):
+    if not changes:
+        print("Declarations unchanged, no file was touched", file=sys.stderr)
+    for path, sections in changes.items():
+        titles = ", ".join(title or "(header)" for title in sections)
+        print(f"Updated {path}: {titles}", file=sys.stderr)
+
+
+def print_merges(merges):
+    if merges:
+        print(f"Merged {len(merges)} duplicate declarations:", file=sys.stderr)
+        for merge in merges:
+            print(f"  {merge}", file=sys.stderr)
+
+
+def print_result(result):
+    print_merges(result.merges)
+    print(
+        f"Parsed {result.parsed} files, {result.reused} reused from cache, in {result.timings['parse']:.3f}s",
+        file=sys.stderr,
+    )
+    print_changes(result.changes)
+
+
+def print_versions(roots, versions):
+    for root, (result, summary) in zip(roots, versions):
+        print_merges(result.merges)
+        print(
+            f"{root}: parsed {result.parsed} files, {result.reused} reused, {summary['symbols']} symbols, "
+            f"+{len(summary['added'])} -{len(summary['removed'])} ~{len(summary['changed'])}, "
+            f"{sum(result.timings.values()):.3f}s",
+            file=sys.stderr,
+        )
+        for sign, key in (("+", "added"), ("-", "removed"), ("~", "changed")):
+            for name in summary[key]:
+                print(f"  {sign} {name}", file=sys.stderr)
+        for path in result.changes:
+            print(f"  updated {path}", file=sys.stderr)
+
+
+def type_check(checker, scripts_dir, declarations):
+    """Type-checks the scripts of `scripts_dir` against the declarations just written, returns the failed scripts"""
+    from .typecheck import find_scripts, print_results
+
+    return print_results(checker.check([declarations], find_scripts(scripts_dir)), sys.stderr, os.getcwd())
+
+
+def profile_report(timings, parsed, reused):
+    """JSON report of the last generate() run: its phases, the finer phases and counters of `stats`, cache usage"""
+    from .instrumentation import stats
+
+    report = stats.report()
+    # counters that were never hit are reported as 0 rather than left out
+    report["counters"] = {**dict.fromkeys(report_counters, 0), **report["counters"]}
+    return {
+        "generate": timings,
+        "files": {"parsed": parsed, "reused": reused},
+        **report,
+    }
+
+
+def print_stats(report):
+    files = report["files"]
+    print(f"{'files parsed':<24} {files['parsed']:>9}, {files['reused']} reused from cache", file=sys.stderr)
+    for phase, seconds in report["generate"].items():
+        print(f"{phase:<24} {seconds:>8.3f}s", file=sys.stderr)
+    for phase, seconds in report["phases"].items():
+        print(f"  {phase:<22} {seconds:>8.3f}s", file=sys.stderr)
+    for counter, value in report["counters"].items():
+        print(f"{counter:<24} {value:>9}", file=sys.stderr)
+
+
+def enable_profiling():
+    """Counts the regex evaluations and the lookups of the generator modules from now on (see instrumentation.py)"""
+    from . import cpp_parser, generator, signatures, source_parser, type_translation
+    from .instrumentation import stats
+    from .symbol_table import SymbolTable
+
+    stats.enable(generator, signatures, source_parser, cpp_parser, type_translation, type_translation.replace_all)
+    stats.count_calls(SymbolTable, "symbol_lookups", "get", "get_all", "__contains__")
+
+
+def output_config(args, docs=None, root=None):
+    """Config of the command line, with the relative output paths in `docs` for a checkout of --versions"""
+    from .config import Config
+
+    def output(path):
+        return os.path.join(docs, path) if docs and path else path
+
+    profiling = args.profile or args.stats or args.pstats
+    return Config(
+        root=root or args.root,
+        output=output(args.output),
+        split_dir=output(args.split),
+        const_enums=args.const_enums,
+        stable=args.stable,
+        luals=output(args.luals),
+        markdown=output(args.markdown),
+        symbol_index=output(args.symbol_index),
+        shake=args.shake,
+        shake_output=args.shake_output,
+        model_path=args.dump_model,
+        # absolute, the same cache for every checkout of --versions. A profile measures the parsing of every
+        # file, with the records of the cache it would only show the linking and the outputs
+        cache=None if args.no_cache or profiling else os.path.abspath(args.cache),
+        # the counters and timers of a worker or a forked backend would be lost with it
+        jobs=1 if profiling else args.jobs,
+        concurrent=not profiling,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generates spel2_declarations_unmodified.d.ts from the Overlunky sources")
+    parser.add_argument("--root", default="..", help="the Overlunky checkout the sources are read from (default: %(default)s, the script runs from its docs directory)")
+    parser.add_argument("--output", "-o", default="spel2_declarations_unmodified.d.ts", metavar="FILE", help="declarations file (default: %(default)s)")
+    parser.add_argument("--cache", default=".generate_ts_cache", help="parse cache file, only changed files are parsed again (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true", help="parse every file and don't read or write the cache")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N", help="parse the source files in N processes")
+    parser.add_argument("--split", metavar="DIR", help="write the declarations split in parts (core, types per entity family, enums, aliases, imgui) to DIR, with an index.d.ts referencing them, instead of a single file")
+    parser.add_argument("--const-enums", action="store_true", help="declare the enums as const enums so their members compile to numbers in the Lua instead of table lookups")
+    parser.add_argument("--stable", action="store_true", help="sort the declarations by name and canonicalize their whitespace, so the output doesn't move around when the sources are reordered or reformatted")
+    parser.add_argument("--luals", metavar="FILE", help="also write LuaLS (lua-language-server) annotations to FILE, for the mods written in plain Lua")
+    parser.add_argument("--markdown", metavar="FILE", help="also write a Markdown reference of the API to FILE")
+    parser.add_argument("--symbol-index", metavar="FILE", help="also write an index of the functions, classes with their inherited members, enum members and aliases to FILE, with their signature and doc, for completions (see symbol_index.py)")
+    parser.add_argument("--shake", metavar="DIR", help="also write the declarations the .ts scripts in DIR and its subdirectories use, with the classes they reference and only the members they mention, for faster type-checking")
+    parser.add_argument("--shake-output", metavar="FILE", help="where --shake writes (default: DIR/spel2_declarations_shaken.d.ts)")
+    parser.add_argument("--versions", nargs="+", metavar="ROOT", help="generate the declarations of each of these Overlunky checkouts or git worktrees (into ROOT/docs) and summarize what each version added, removed and changed")
+    parser.add_argument("--dump-model", metavar="FILE", help="also save the linked API to FILE, as JSON if it ends with .json else in the binary format with a name index (see model_io.py)")
+    parser.add_argument("--from-model", metavar="FILE", help="write the declarations from a model saved with --dump-model instead of parsing the sources")
+    parser.add_argument("--check", metavar="DIR", help="type-check the .ts scripts in DIR and its subdirectories against the declarations (the shaken ones with --shake), with a TypeScript process that stays alive between regenerations of --watch (needs Node.js and npm install)")
+    parser.add_argument("--watch", action="store_true", help="keep running and regenerate the declarations whenever a source file changes")
+    parser.add_argument("--debounce", type=float, default=0.2, metavar="SECONDS", help="with --watch, wait for SECONDS without changes before regenerating (default: %(default)s)")
+    parser.add_argument("--profile", metavar="FILE", help="write the time of each phase and the counters (lines scanned, regex evaluations, lookups, members declared as any) to FILE as JSON, parses every file in this process without the cache")
+    parser.add_argument("--stats", action="store_true", help="print the phases and counters of --profile to stderr")
+    parser.add_argument("--pstats", metavar="FILE", help="also run under cProfile and dump the stats to FILE (python -m pstats FILE)")
+    args = parser.parse_args(argv)
+    if args.from_model and args.watch:
+        parser.error("--from-model doesn't read the sources, there is nothing to --watch")
+    if args.versions and (args.watch or args.from_model or args.dump_model or args.check or args.shake):
+        parser.error("--versions can't be combined with --watch, --from-model, --dump-model, --check or --shake")
+    if args.shake_output and not args.shake:
+        parser.error("--shake-output needs --shake")
+
+    from .backends import BackendError
+    from .generator import generate, generate_versions, shutdown
+    from .typecheck import TypeChecker, TypeCheckError
+
+    config = output_config(args)
+    checked = config.shaken_path() if args.shake else config.declarations()
+    checker = None
+    if args.check:
+        try:
+            checker = TypeChecker()
+        except TypeCheckError as error:
+            sys.exit(f"--check: {error}")
+
+    if args.from_model:
+        from .model_io import load_model
+
+        start = time.perf_counter()
+        try:
+            result = generate(config, load_model(args.from_model))
+        except BackendError as error:
+            sys.exit(str(error))
+        print(f"Wrote {args.split or args.output} from {args.from_model} in {time.perf_counter() - start:.3f}s", file=sys.stderr)
+        print_changes(result.changes)
+        if checker:
+            with checker:
+                sys.exit(1 if type_check(checker, args.check, checked) else 0)
+        sys.exit()
+
+    if args.profile or args.stats or args.pstats:
+        enable_profiling()
+
+    def run():
+        profiler = None
+        if args.pstats:
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+        if args.versions:
+            configs = [output_config(args, os.path.join(root, "docs"), root) for root in args.versions]
+            versions = generate_versions(configs)
+            print_versions(args.versions, versions)
+            timings = {f"{root} {phase}": seconds for root, (result, _) in zip(args.versions, versions) for phase, seconds in result.timings.items()}
+            result = versions[-1][0]
+        else:
+            result = generate(config)
+            print_result(result)
+            timings = result.timings
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.pstats)
+        if args.profile or args.stats:
+            report = profile_report(timings, result.parsed, result.reused)
+            if args.profile:
+                import json
+
+                with open(args.profile, "w") as fp:
+                    json.dump(report, fp, indent=2)
+            if args.stats:
+                print_stats(report)
+        if checker:
+            return type_check(checker, args.check, checked)
+        return 0
+
+    try:
+        failed = run()
+    except TypeCheckError as error:
+        sys.exit(f"--check: {error}")
+    except BackendError as error:
+        sys.exit(str(error))
+    if args.watch:
+        import traceback
+
+        from .watcher import open_watcher, wait_for_changes
+
+        # the parse cache stays in memory, each change only parses the files whose content changed
+        watched = config.sources()
+        if args.shake:
+            from .typecheck import find_scripts
+
+            # a script that uses other declarations changes the shaken ones
+            watched += find_scripts(args.shake)
+        watcher = open_watcher(watched)
+        print(f"Watching {len(watcher.paths)} files for changes ({watcher.kind})", file=sys.stderr)
+        try:
+            while True:
+                changed = wait_for_changes(watcher, args.debounce)
+                print(f"Changed: {', '.join(sorted(changed))}", file=sys.stderr)
+                start = time.perf_counter()
+                try:
+                    run()
+                    print(f"Regenerated {args.split or args.output} in {time.perf_counter() - start:.3f}s", file=sys.stderr)
+                except Exception:
+                    # keep watching, the next save probably fixes it
+                    traceback.print_exc()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
+    shutdown()
+    if checker:
+        checker.close()
+    if failed and not args.watch:
+        sys.exit(1)
@@ -0,0 +1,162 @@
+"""What generate() and parse() work on, and what generate() returns
+
+Only dataclasses and the file lists, importing this module doesn't load any of the generator.
+"""
+import os
+from dataclasses import dataclass, field
+
+# the sources, relative to the root of an Overlunky checkout
+HEADER_FILES = [
+    "src/game_api/math.hpp",
+    "src/game_api/rpc.hpp",
+    "src/game_api/spawn_api.hpp",
+    "src/game_api/script.hpp",
+    "src/game_api/color.hpp",
+    "src/game_api/entity.hpp",
+    "src/game_api/movable.hpp",
+    "src/game_api/game_manager.hpp",
+    "src/game_api/state.hpp",
+    "src/game_api/state_structs.hpp",
+    "src/game_api/prng.hpp",
+    "src/game_api/entities_floors.hpp",
+    "src/game_api/entities_activefloors.hpp",
+    "src/game_api/entities_mounts.hpp",
+    "src/game_api/entities_monsters.hpp",
+    "src/game_api/entities_chars.hpp",
+    "src/game_api/entities_items.hpp",
+    "src/game_api/entities_fx.hpp",
+    "src/game_api/entities_liquids.hpp",
+    "src/game_api/entities_backgrounds.hpp",
+    "src/game_api/entities_decorations.hpp",
+    "src/game_api/entities_logical.hpp",
+    "src/game_api/sound_manager.hpp",
+    "src/game_api/render_api.hpp",
+    "src/game_api/particles.hpp",
+    "src/game_api/savedata.hpp",
+    "src/game_api/level_api.hpp",
+    "src/game_api/level_api_types.hpp",
+    "src/game_api/items.hpp",
+    "src/game_api/screen.hpp",
+    "src/game_api/screen_arena.hpp",
+    "src/game_api/online.hpp",
+    "src/game_api/strings.hpp",
+    "src/game_api/script/usertypes/level_lua.hpp",
+    "src/game_api/script/usertypes/gui_lua.hpp",
+    "src/game_api/script/usertypes/vanilla_render_lua.hpp",
+    "src/game_api/script/usertypes/save_context.hpp",
+    "src/game_api/script/usertypes/hitbox_lua.hpp",
+    "src/game_api/script/usertypes/socket_lua.hpp",
+    "src/imgui/imgui.h",
+    "src/game_api/script/usertypes/level_lua.cpp",
+    "src/game_api/script/usertypes/gui_lua.cpp",
+]
+API_FILES = [
+    "src/game_api/script/script_impl.cpp",
+    "src/game_api/script/script_impl.hpp",
+    "src/game_api/script/lua_vm.cpp",
+    "src/game_api/script/lua_vm.hpp",
+    "src/game_api/script/lua_backend.cpp",
+    "src/game_api/script/lua_backend.hpp",
+    "src/game_api/script/usertypes/save_context.cpp",
+    "src/game_api/script/usertypes/state_lua.cpp",
+    "src/game_api/script/usertypes/prng_lua.cpp",
+    "src/game_api/script/usertypes/entity_lua.cpp",
+    "src/game_api/script/usertypes/entities_chars_lua.cpp",
+    "src/game_api/script/usertypes/entities_floors_lua.cpp",
+    "src/game_api/script/usertypes/entities_activefloors_lua.cpp",
+    "src/game_api/script/usertypes/entities_mounts_lua.cpp",
+    "src/game_api/script/usertypes/entities_monsters_lua.cpp",
+    "src/game_api/script/usertypes/entities_items_lua.cpp",
+    "src/game_api/script/usertypes/entities_fx_lua.cpp",
+    "src/game_api/script/usertypes/entities_liquids_lua.cpp",
+    "src/game_api/script/usertypes/entities_backgrounds_lua.cpp",
+    "src/game_api/script/usertypes/entities_decorations_lua.cpp",
+    "src/game_api/script/usertypes/entities_logical_lua.cpp",
+    "src/game_api/script/usertypes/particles_lua.cpp",
+    "src/game_api/script/usertypes/level_lua.cpp",
+    "src/game_api/script/usertypes/sound_lua.cpp",
+    "src/game_api/script/usertypes/player_lua.cpp",
+    "src/game_api/script/usertypes/gui_lua.cpp",
+    "src/game_api/script/usertypes/gui_lua.hpp",
+    "src/game_api/script/usertypes/vanilla_render_lua.cpp",
+    "src/game_api/script/usertypes/vanilla_render_lua.hpp",
+    "src/game_api/script/usertypes/drops_lua.cpp",
+    "src/game_api/script/usertypes/texture_lua.cpp",
+    "src/game_api/script/usertypes/flags_lua.cpp",
+    "src/game_api/script/usertypes/char_state_lua.cpp",
+    "src/game_api/script/usertypes/hitbox_lua.cpp",
+    "src/game_api/script/usertypes/screen_lua.cpp",
+    "src/game_api/script/usertypes/screen_arena_lua.cpp",
+    "src/game_api/script/usertypes/socket_lua.cpp",
+]
+ALIASES_FILE = "src/game_api/aliases.hpp"
+ENUMS_FILE = "docs/game_data/spel2.lua"
+OUTPUT_FILE = "spel2_declarations_unmodified.d.ts"
+SHAKEN_FILE = "spel2_declarations_shaken.d.ts"
+
+
+@dataclass
+class Config:
+    """Where the sources are and what to write
+
+    `root` is an Overlunky checkout, the file lists are relative to it. The other paths are relative to the current
+    directory (or absolute), `output` is `root/docs/spel2_declarations_unmodified.d.ts` when not given.
+
+    `cache` is the file the parsed records are saved to between runs, without one they are only kept in memory.
+    Either way, the later generations of the same process only parse the files that changed. `jobs` > 1 parses the
+    files in a pool of processes that is kept for the next generations. `concurrent` writes the outputs at the
+    same time when there are several, in forked processes (see backends.run_backends), where it can.
+
+    `symbol_index` is a file the prefix index of the symbols is written to, for editor tooling (see
+    symbol_index.py). `shake` is a directory of .ts scripts, the declarations they need are also written to
+    `shake_output`, by default spel2_declarations_shaken.d.ts in that directory (see tree_shaking.py).
+    """
+
+    root: str = "."
+    output: str = None
+    split_dir: str = None
+    const_enums: bool = False
+    stable: bool = False
+    luals: str = None
+    markdown: str = None
+    symbol_index: str = None
+    shake: str = None
+    shake_output: str = None
+    model_path: str = None
+    cache: str = None
+    jobs: int = 1
+    concurrent: bool = True
+    header_files: list = field(default_factory=lambda: list(HEADER_FILES))
+    api_files: list = field(default_factory=lambda: list(API_FILES))
+    aliases_file: str = ALIASES_FILE
+    enums_file: str = ENUMS_FILE
+
+    def source(self, file):
+        """Path of a file of the checkout"""
+        return os.path.join(self.root, file)
+
+    def output_path(self):
+        return self.output or os.path.join(self.root, "docs", OUTPUT_FILE)
+
+    def shaken_path(self):
+        return self.shake_output or os.path.join(self.shake, SHAKEN_FILE)
+
+    def declarations(self):
+        """The file the scripts reference, the index of the split layout or the single file"""
+        return os.path.join(self.split_dir, "index.d.ts") if self.split_dir else self.output_path()
+
+    def sources(self):
+        """Every file a generation reads, e.g. to watch them"""
+        return [self.source(file) for file in self.header_files + self.api_files + [self.aliases_file, self.enums_file]]
+
+
+@dataclass
+class Result:
+    """What a generate() did"""
+
+    api: object  # the linked model.Api the outputs were written from
+    changes: dict  # {path: changed section titles} of the files that were rewritten
+    merges: list  # a line per duplicate declaration that was merged (see generator.merge_duplicates)
+    timings: dict  # seconds of each phase
+    parsed: int = 0  # files parsed
+    reused: int = 0  # files whose records came from the parse cache
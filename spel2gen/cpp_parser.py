@@ -0,0 +1,504 @@
+"""Tokenizer and recursive descent parser for the C++ subset used in the Overlunky headers
+
+Only declarations are parsed: namespaces, classes/structs/unions (with anonymous unions and structs),
+member functions and variables, free functions. Function bodies, initializers, enums, typedefs and
+anything else are skipped as balanced token groups, so the whole parse is a single pass over the tokens.
+Types, parameters and names are kept as C++ text, translating them is up to the caller.
+"""
+from bisect import bisect_right
+from dataclasses import dataclass, field
+
+from .patterns import reCppToken
+
+OPENING = {"(": ")", "[": "]", "{": "}"}
+CLOSING = {")", "]", "}"}
+ACCESS_SPECIFIERS = {"public", "protected", "private"}
+SKIPPED_DECLARATIONS = {"using", "typedef", "friend", "static_assert", "enum"}
+STORAGE_SPECIFIERS = {"static", "inline", "mutable", "extern", "thread_local", "constexpr"}
+NOT_FUNCTION_NAMES = {"alignas", "decltype", "sizeof", "alignof", "noexcept", "__declspec", "__attribute__"}
+
+
+@dataclass
+class FunctionDecl:
+    name: str
+    return_type: str
+    params: str
+    comment: list
+    span: tuple
+    is_virtual: bool = False
+    is_move_ctor: bool = False
+
+
+@dataclass
+class VarDecl:
+    name: str  # includes the array size, e.g. `slots[4]`
+    type: str
+    comment: list
+    span: tuple
+
+
+@dataclass
+class ClassDecl:
+    name: str
+    kind: str
+    bases: list
+    comment: list
+    span: tuple
+    members: list = field(default_factory=list)
+    nested: list = field(default_factory=list)
+
+
+@dataclass
+class TranslationUnit:
+    source: str
+    classes: list = field(default_factory=list)
+    functions: list = field(default_factory=list)
+    line_starts: list = None
+
+    def line_of(self, offset):
+        """1-based line number of an offset in the source, the line table is only built when needed"""
+        if self.line_starts is None:
+            self.line_starts = [0]
+            position = self.source.find("\n")
+            while position >= 0:
+                self.line_starts.append(position + 1)
+                position = self.source.find("\n", position + 1)
+        return bisect_right(self.line_starts, offset)
+
+
+class Parser:
+    """Parses a source file into a TranslationUnit
+
+    Doc comments (`///`) are attached as the full source lines they are on: to the next declaration,
+    or to the previous one when they are on the same line as its end.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.tokens = [(m.lastgroup, m[m.lastindex], *m.span(m.lastindex)) for m in reCppToken.finditer(source)]
+        self.docs = []
+        self.last_decl = None
+        self.last_decl_next = None
+
+    def parse(self):
+        unit = TranslationUnit(self.source)
+        self.parse_scope(0, unit, None)
+        return unit
+
+    # token helpers
+
+    def kind(self, i):
+        return self.tokens[i][0] if 0 <= i < len(self.tokens) else ""
+
+    def text(self, i):
+        return self.tokens[i][1] if 0 <= i < len(self.tokens) else ""
+
+    def skip_group(self, i):
+        """`i` is on an opening bracket, returns the index after the matching closing one"""
+        depth = 0
+        tokens = self.tokens
+        while i < len(tokens):
+            text = tokens[i][1]
+            if text in OPENING:
+                depth += 1
+            elif text in CLOSING:
+                depth -= 1
+                if depth <= 0:
+                    return i + 1
+            i += 1
+        return i
+
+    def skip_angles(self, i):
+        """`i` is on the `<` of a template argument list, returns the index after the matching `>`"""
+        depth = 0
+        while i < len(self.tokens):
+            text = self.tokens[i][1]
+            if text == "<":
+                depth += 1
+            elif text == ">":
+                depth -= 1
+                if depth == 0:
+                    return i + 1
+            elif text in OPENING:
+                i = self.skip_group(i)
+                continue
+            elif text in (";", "}"):
+                return i
+            i += 1
+        return i
+
+    def skip_statement(self, i):
+        """Skips to after the next `;` outside brackets, or to the closing brace of the current scope"""
+        while i < len(self.tokens):
+            text = self.tokens[i][1]
+            if text == ";":
+                return i + 1
+            if text == "}":
+                return i
+            if text in OPENING:
+                i = self.skip_group(i)
+            else:
+                i += 1
+        return i
+
+    def render(self, lo, hi):
+        """Source text of the tokens in [lo, hi), any whitespace or comment between tokens becomes one space"""
+        if lo >= hi:
+            return ""
+        text = self.source[self.tokens[lo][2] : self.tokens[hi - 1][3]]
+        if "  " not in text and "\n" not in text and "\t" not in text and "/" not in text:
+            return text
+        parts = []
+        prev_end = None
+        for kind, text, start, end in self.tokens[lo:hi]:
+            if kind == "doc":
+                continue
+            if prev_end is not None and start > prev_end:
+                parts.append(" ")
+            parts.append(text)
+            prev_end = end
+        return "".join(parts)
+
+    def take_docs(self):
+        docs = self.docs
+        self.docs = []
+        return docs
+
+    def doc_line(self, start):
+        line_start = self.source.rfind("\n", 0, start) + 1
+        line_end = self.source.find("\n", start)
+        return self.source[line_start : line_end if line_end >= 0 else len(self.source)]
+
+    def add_doc(self, i):
+        start = self.tokens[i][2]
+        if self.last_decl is not None and self.last_decl_next == i and "\n" not in self.source[self.tokens[i - 1][3] : start]:
+            self.last_decl.comment.append(self.doc_line(start))
+        else:
+            self.docs.append(self.doc_line(start))
+
+    def declared(self, decl, next_i):
+        self.last_decl = decl
+        self.last_decl_next = next_i
+
+    # declarations
+
+    def parse_scope(self, i, scope, owner):
+        """Parses declarations until the `}` closing the scope, returns the index after it
+
+        `scope` is the TranslationUnit or the ClassDecl declarations are added to, `owner` the class
+        whose body is being parsed (None in namespaces).
+        """
+        tokens = self.tokens
+        while i < len(tokens):
+            kind, text = tokens[i][0], tokens[i][1]
+            if kind == "doc":
+                self.add_doc(i)
+                i += 1
+            elif text == "}":
+                self.docs = []
+                return i + 1
+            elif text == ";":
+                i += 1
+            elif text in ACCESS_SPECIFIERS and self.text(i + 1) == ":":
+                i += 2
+            elif text == "template":
+                i += 1
+                if self.text(i) == "<":
+                    i = self.skip_angles(i)
+            elif text == "namespace" or (text == "inline" and self.text(i + 1) == "namespace"):
+                while i < len(tokens) and tokens[i][1] not in ("{", ";"):
+                    i += 1
+                if self.text(i) == "{":
+                    self.docs = []
+                    i = self.parse_scope(i + 1, scope, None)
+                else:
+                    i += 1
+            elif text == "extern" and self.kind(i + 1) == "string" and self.text(i + 2) == "{":
+                i = self.parse_scope(i + 3, scope, owner)
+            elif text in SKIPPED_DECLARATIONS:
+                self.take_docs()
+                i = self.skip_declaration(i)
+            elif text in ("struct", "class", "union"):
+                i = self.parse_class(i, scope, owner)
+            else:
+                i = self.parse_declaration(i, scope, owner)
+        return i
+
+    def skip_declaration(self, i):
+        """Skips a declaration that could end with a body instead of a `;` (e.g. a friend function)"""
+        return self.declaration_extent(i)[1]
+
+    def parse_class(self, i, scope, owner):
+        start = i
+        kind = self.text(i)
+        i += 1
+        name = ""
+        while i < len(self.tokens):
+            text = self.text(i)
+            if self.kind(i) == "name" and text != "final":
+                # `alignas(8)`, `__declspec(...)` and API macros come before the name
+                if self.text(i + 1) == "(":
+                    i = self.skip_group(i + 1)
+                    continue
+                name = text
+                i += 1
+                while self.text(i) == "::" and self.kind(i + 1) == "name":
+                    name = self.text(i + 1)
+                    i += 2
+            elif text == "<":
+                i = self.skip_angles(i)
+            elif text == "[":
+                i = self.skip_group(i)
+            elif text == "final":
+                i += 1
+            else:
+                break
+        text = self.text(i)
+        if text not in ("{", ":", ";"):
+            # elaborated type specifier, e.g. `struct Entity* overlay;`
+            return self.parse_declaration(start, scope, owner)
+        if text == ";":
+            self.take_docs()
+            return i + 1
+
+        bases = []
+        if text == ":":
+            i += 1
+            base_start = i
+            while i < len(self.tokens) and self.text(i) not in ("{", ";"):
+                if self.text(i) == "<":
+                    i = self.skip_angles(i)
+                elif self.text(i) == ",":
+                    bases.append(self.render_base(base_start, i))
+                    i += 1
+                    base_start = i
+                else:
+                    i += 1
+            if i > base_start:
+                bases.append(self.render_base(base_start, i))
+            if self.text(i) != "{":
+                self.take_docs()
+                return i + 1
+
+        cpp_class = ClassDecl(name, kind, bases, self.take_docs(), (self.tokens[start][2], 0))
+        i = self.parse_scope(i + 1, cpp_class, cpp_class)
+        cpp_class.span = (cpp_class.span[0], self.tokens[i - 1][3])
+
+        # declarators after the body, e.g. `} flags;`
+        declarators = []
+        while i < len(self.tokens) and self.text(i) not in (";", "}"):
+            if self.kind(i) == "name":
+                declarators.append(i)
+            if self.text(i) in OPENING:
+                i = self.skip_group(i)
+            else:
+                i += 1
+        end = self.tokens[i][3] if i < len(self.tokens) else len(self.source)
+        if self.text(i) == ";":
+            i += 1
+
+        if not name and not declarators and owner is not None:
+            # anonymous union/struct, its members belong to the enclosing class
+            owner.members.extend(cpp_class.members)
+            owner.nested.extend(cpp_class.nested)
+            return i
+        if name:
+            (owner.nested if owner is not None else scope.classes).append(cpp_class)
+        if owner is not None and name:
+            for d in declarators:
+                var = VarDecl(self.text(d), name, cpp_class.comment, (cpp_class.span[0], end))
+                owner.members.append(var)
+                self.declared(var, i)
+        return i
+
+    def render_base(self, lo, hi):
+        while lo < hi and self.text(lo) in ACCESS_SPECIFIERS | {"virtual"}:
+            lo += 1
+        return self.render(lo, hi)
+
+    def declaration_extent(self, i):
+        """Finds where the declaration starting at `i` ends
+
+        Returns (end, next, func): `end` is the index after the last token of the declaration itself
+        (without the terminating `;` or a function body), `next` where parsing continues and `func` the
+        index of the `(` starting the parameters if it declares a function, else None.
+        """
+        tokens = self.tokens
+        func = None
+        seen_eq = False
+        while i < len(tokens):
+            text = tokens[i][1]
+            if text == ";":
+                return i, i + 1, func
+            if text == "}":
+                return i, i, func
+            if text == "{":
+                if func is not None and not seen_eq:
+                    return i, self.skip_group(i), func
+                i = self.skip_group(i)
+            elif text == "operator" and func is None and not seen_eq:
+                i += 1
+                if self.text(i) == "(" and self.text(i + 1) == ")":
+                    i += 2
+                while i < len(tokens) and tokens[i][1] not in ("(", ";", "{", "}"):
+                    i += 1
+                if self.text(i) == "(":
+                    func = i
+                    i = self.skip_group(i)
+                    i = self.skip_initializers(i)
+            elif text == "(":
+                if func is None and not seen_eq and self.is_parameter_list(i):
+                    func = i
+                    i = self.skip_group(i)
+                    i = self.skip_initializers(i)
+                else:
+                    i = self.skip_group(i)
+            elif text == "[":
+                i = self.skip_group(i)
+            elif text == "<" and not seen_eq and self.kind(i - 1) == "name":
+                i = self.skip_angles(i)
+            else:
+                if text == "=":
+                    seen_eq = True
+                i += 1
+        return i, i, func
+
+    def is_parameter_list(self, i):
+        """Whether the `(` at `i` starts the parameters of a function declarator"""
+        if self.kind(i - 1) != "name" or self.text(i - 1) in NOT_FUNCTION_NAMES:
+            return False
+        # function pointer declarator, e.g. `void (*callback)(int)`
+        return self.text(i + 1) not in ("*", "&", "^")
+
+    def skip_initializers(self, i):
+        """Skips a constructor's member initializer list (`: x(0), y{1}`), `i` is after the parameters"""
+        while i < len(self.tokens) and self.text(i) not in (":", "{", ";", "=", "}"):
+            i = self.skip_group(i) if self.text(i) in OPENING else i + 1
+        if self.text(i) != ":":
+            return i
+        i += 1
+        while i < len(self.tokens):
+            text = self.text(i)
+            if text in ("(", "{"):
+                i = self.skip_group(i)
+                if self.text(i) == ",":
+                    i += 1
+                    continue
+                return i
+            if text == "<":
+                i = self.skip_angles(i)
+            elif text in (";", "}"):
+                return i
+            else:
+                i += 1
+        return i
+
+    def parse_declaration(self, i, scope, owner):
+        start = i
+        end, next_i, func = self.declaration_extent(i)
+        if end == start:
+            # stray closing token, let the scope handle it
+            return next_i if next_i > start else start + 1
+        comment = self.take_docs()
+        span = (self.tokens[start][2], self.tokens[end - 1][3])
+        if func is not None:
+            decl = self.function(start, func, comment, span, owner)
+            (owner.members if owner is not None else scope.functions).append(decl)
+            self.declared(decl, next_i)
+        elif owner is not None:
+            for decl in self.variables(start, end, comment, span):
+                owner.members.append(decl)
+                self.declared(decl, next_i)
+        return next_i
+
+    def function(self, start, func, comment, span, owner):
+        tokens = self.tokens
+        lo = start
+        is_virtual = False
+        while lo < func and tokens[lo][1] in ("virtual", "["):
+            if tokens[lo][1] == "[":
+                lo = self.skip_group(lo)
+            else:
+                is_virtual = True
+                lo += 1
+        # the name is the identifier before `(`, or `operator...`, with a `~` for destructors
+        name_start = func - 1
+        for j in range(lo, func):
+            if tokens[j][1] == "operator":
+                name_start = j
+                break
+        else:
+            if name_start > lo and tokens[name_start - 1][1] == "~":
+                name_start -= 1
+        while name_start - 2 >= lo and tokens[name_start - 1][1] == "::" and tokens[name_start - 2][0] == "name":
+            name_start -= 2
+        name = self.render(name_start, func)
+        params_end = self.skip_group(func) - 1
+        params = self.render(func + 1, params_end)
+        return_type = self.render(lo, name_start)
+        param_texts = [t[1] for t in tokens[func + 1 : params_end]]
+        is_move_ctor = (
+            not return_type
+            and owner is not None
+            and name == owner.name
+            and len(param_texts) in (2, 3)
+            and param_texts[0] == owner.name
+            and param_texts[1] == "&&"
+        )
+        return FunctionDecl(name, return_type, params, comment, span, is_virtual, is_move_ctor)
+
+    def variables(self, start, end, comment, span):
+        """Splits `type a, *b[4] = x;` into one VarDecl per declarator, all sharing the comment"""
+        tokens = self.tokens
+        lo = start
+        while lo < end and (tokens[lo][1] in STORAGE_SPECIFIERS or tokens[lo][1] == "["):
+            lo = self.skip_group(lo) if tokens[lo][1] == "[" else lo + 1
+        declarators = []
+        i = lo
+        decl_start = lo
+        while i < end:
+            text = tokens[i][1]
+            if text == ",":
+                declarators.append((decl_start, i))
+                decl_start = i + 1
+                i += 1
+            elif text in OPENING:
+                i = self.skip_group(i)
+            elif text == "<" and self.kind(i - 1) == "name":
+                i = self.skip_angles(i)
+            else:
+                i += 1
+        declarators.append((decl_start, end))
+
+        decls = []
+        base_type = None
+        for n, (d_lo, d_hi) in enumerate(declarators):
+            # the name is the last identifier before the array size, bit-field width or initializer
+            name_at = None
+            i = d_lo
+            while i < d_hi:
+                kind, text = tokens[i][0], tokens[i][1]
+                if text in ("[", "=", "{", ":"):
+                    break
+                if text == "<" and self.kind(i - 1) == "name":
+                    i = self.skip_angles(i)
+                    continue
+                if text in OPENING:
+                    i = self.skip_group(i)
+                    continue
+                if kind == "name":
+                    name_at = i
+                i += 1
+            if name_at is None or (n == 0 and name_at == d_lo) or (n > 0 and base_type is None):
+                continue
+            name_end = name_at + 1
+            while name_end < d_hi and tokens[name_end][1] == "[":
+                name_end = self.skip_group(name_end)
+            if n == 0:
+                base_type = self.render(d_lo, name_at)
+            decls.append(VarDecl(self.render(name_at, name_end), base_type, comment, span))
+        return decls
+
+
+def parse(source):
+    return Parser(source).parse()
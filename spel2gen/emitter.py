@@ -0,0 +1,235 @@
+import hashlib
+import json
+import os
+
+from .patterns import reInnerSpaces, reSectionTitle
+
+NO_SELF_IN_FILE = "/** @noSelfInFile */"
+
+
+def section_hash(text=""):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16)
+
+
+def unique_title(title, hashes):
+    """The title of a section, a `'` is appended to the ones already in `hashes`"""
+    while title in hashes:
+        title += "'"
+    return title
+
+
+def section_hashes(text, reTitle=reSectionTitle):
+    """Content hash of each `//## title` section of a declarations file, what comes before the first one is "" """
+    hashes = {}
+    start = 0
+    title = ""
+    for m in reTitle.finditer(text):
+        hashes[title] = section_hash(text[start : m.start()]).hexdigest()
+        start = m.start()
+        title = unique_title(m[1], hashes)
+    hashes[title] = section_hash(text[start:]).hexdigest()
+    return hashes
+
+
+def hashes_path(path):
+    """Where the section hashes of the file at `path` are kept, a hidden file next to it"""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.sections")
+
+
+def read_section_hashes(path, reTitle=reSectionTitle):
+    """The section hashes of the file at `path`, {} when there's no such file
+
+    They are read from the hashes file written with it, the file itself is only hashed again when the hashes
+    file is missing or doesn't match its size and mtime (e.g. it was edited).
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return {}
+    try:
+        with open(hashes_path(path), "r") as fp:
+            stored = json.load(fp)
+        if stored["size"] == stat.st_size and stored["mtime_ns"] == stat.st_mtime_ns:
+            return stored["sections"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    try:
+        with open(path, "r") as fp:
+            return section_hashes(fp.read(), reTitle)
+    except (OSError, UnicodeDecodeError):
+        return {}
+
+
+def write_section_hashes(path, hashes):
+    stat = os.stat(path)
+    with open(hashes_path(path), "w") as fp:
+        json.dump({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sections": hashes}, fp)
+
+
+class Emitter:
+    """Streams the declarations into a buffered file that replaces the output only once it's complete
+
+    Everything is written to `path + ".tmp"` and renamed over `path` when the emitter is closed without an
+    error, so a watcher (e.g. `tstl --watch`) never sees a half-written file and a failed run leaves the
+    previous output in place. When the hash of every section is the same as in the previous output the file
+    isn't touched at all, so its mtime (and the incremental build caches of tsc and the editors) stay valid.
+    `changed_sections` lists the titles of the sections that changed ("" is the text before the first one).
+    The sections are hashed as they are written, the hashes of the previous output are kept next to it (see
+    read_section_hashes).
+
+    `member_overrides` maps the text of a class member to the text written in its place.
+    `header` is written as the first line (e.g. NO_SELF_IN_FILE).
+    `canonical` strips trailing whitespace and collapses runs of spaces between words, so changes in how the
+    sources are formatted don't show up in the declarations.
+
+    Emitters of other languages (see backends.py) override the write_* methods, `reTitle`, the pattern of the
+    section titles they write, and `section_title`, the line of a title.
+    """
+
+    reTitle = reSectionTitle
+    section_title = "//## {}"
+
+    def __init__(self, path, member_overrides=None, header=None, canonical=False):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.member_overrides = member_overrides or {}
+        self.canonical = canonical
+        self.changed_sections = []
+        self.hashes = {}
+        self.title = ""
+        self.hash = section_hash()
+        self.fp = open(self.tmp_path, "w", buffering=1 << 16)
+        if header is not None:
+            self.write(header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close(commit=exc_type is None)
+
+    def close(self, commit=True):
+        self.fp.close()
+        if not commit:
+            os.remove(self.tmp_path)
+            return
+        self.hashes[self.title] = self.hash.hexdigest()
+        new_hashes = self.hashes
+        old_hashes = read_section_hashes(self.path, self.reTitle)
+        self.changed_sections = [title for title, digest in new_hashes.items() if old_hashes.get(title) != digest]
+        self.changed_sections += [title for title in old_hashes if title not in new_hashes]
+        if self.changed_sections or list(old_hashes) != list(new_hashes):
+            os.replace(self.tmp_path, self.path)
+            write_section_hashes(self.path, new_hashes)
+        else:
+            os.remove(self.tmp_path)
+            if not os.path.exists(hashes_path(self.path)):
+                write_section_hashes(self.path, new_hashes)
+
+    def changes(self):
+        """{path: changed section titles} of the files this emitter rewrote"""
+        return {self.path: self.changed_sections} if self.changed_sections else {}
+
+    def part(self, name):
+        """Single file layout, every part of the declarations goes to this file"""
+        return self
+
+    def write(self, text=""):
+        if self.canonical:
+            text = "\n".join(reInnerSpaces.sub(" ", line.rstrip()) for line in text.split("\n"))
+        text += "\n"
+        self.fp.write(text)
+        self.hash.update(text.encode("utf-8"))
+
+    def write_section(self, title):
+        # the blank line before the title ends the previous section, like in section_hashes
+        self.write()
+        self.hashes[self.title] = self.hash.hexdigest()
+        self.title = unique_title(title, self.hashes)
+        self.hash = section_hash()
+        self.write(self.section_title.format(title) + "\n")
+
+    def write_comment(self, comment):
+        if comment:
+            self.write("/** ")
+            for line in comment:
+                self.write(line)
+            self.write(" */")
+
+    def write_function(self, name, param, ret, comment=()):
+        self.write_comment(comment)
+        self.write(f"declare function {name}({param}) : {ret}".strip())
+
+    def write_class(self, name, base, members):
+        """`members` are (comment, text) pairs, the text is the member without indentation"""
+        self.write(f"declare class {name}" + (f" extends {base}" if base else "") + " {")
+        for comment, text in members:
+            self.write_comment(comment)
+            self.write("    " + self.member_overrides.get(text, text))
+        self.write("}")
+
+    def write_interface(self, name, members):
+        """`members` are the texts of the members without indentation, an interface merges into a class of the same name"""
+        self.write(f"declare interface {name} {{")
+        for text in members:
+            self.write("    " + text)
+        self.write("}")
+
+    def write_enum(self, name, members, const=False):
+        """`members` are (name, value) pairs, a const enum has its members inlined as values by the compiler"""
+        self.write(f"declare {'const ' if const else ''}enum {name} {{")
+        # like spel2.lua, no comma after the last member
+        self.write(",\n".join(f"  {member} = {value}" for member, value in members))
+        self.write("}")
+
+    def write_alias(self, name, type):
+        self.write(f"declare type {name} = {type}")
+
+
+class SplitEmitter:
+    """Writes each part of the declarations to its own `<name>.d.ts` in `directory`, plus an index
+
+    A part's file is created the first time the part is asked for, every file starts with `header`.
+    The index (`index.d.ts`) has a `/// <reference>` to each part in that order, it's written last so it
+    never references a file that isn't complete yet. Like a single file, a part (or the index) whose content
+    didn't change isn't rewritten.
+    """
+
+    def __init__(self, directory, member_overrides=None, header=None, index="index", canonical=False):
+        self.directory = directory
+        self.member_overrides = member_overrides
+        self.header = header
+        self.index = index
+        self.canonical = canonical
+        self.parts = {}
+        self.index_emitter = None
+        os.makedirs(directory, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close(commit=exc_type is None)
+
+    def part(self, name):
+        if name not in self.parts:
+            path = os.path.join(self.directory, name + ".d.ts")
+            self.parts[name] = Emitter(path, self.member_overrides, self.header, self.canonical)
+        return self.parts[name]
+
+    def close(self, commit=True):
+        for part in self.parts.values():
+            part.close(commit)
+        if commit:
+            with Emitter(os.path.join(self.directory, self.index + ".d.ts")) as index:
+                for name in self.parts:
+                    index.write(f'/// <reference path="{name}.d.ts" />')
+            self.index_emitter = index
+
+    def changes(self):
+        changes = {}
+        for emitter in [*self.parts.values(), self.index_emitter]:
+            if emitter is not None:
+                changes.update(emitter.changes())
+        return changes
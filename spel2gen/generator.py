@@ -0,0 +1,895 @@
+"""Parses the Overlunky sources, links them into the Api and writes the outputs of the backends
+
+generate() and parse() are what the package exports (see __init__.py). The parse caches and the process pools
+they use are kept between the calls, so generating again in the same process only parses the files that changed.
+"""
+import contextlib
+import dataclasses
+import hashlib
+import os
+import time
+
+from .config import OUTPUT_FILE, Config, Result
+from .parse_cache import ParseCache
+from . import patterns
+from .patterns import (
+    reAlias,
+    reBases,
+    reEntityFamily,
+    reEntTypeCategory,
+    reFunction,
+    reLambdaReturnType,
+    reMemberVariable,
+    reProperty,
+    rePropertyReturn,
+)
+from . import cpp_parser
+from .backends import Backend, run_backends
+from .emitter import NO_SELF_IN_FILE, Emitter, SplitEmitter
+from .instrumentation import stats
+from . import model
+from .model import Alias, Api, CppClass, Field, Model, intern
+from .signatures import (
+    cpp_params_to_typescript,
+    declared_functions,
+    fix_constructor_param,
+    global_variables,
+    member_text,
+    split_top_level,
+)
+from . import source_parser
+from .source_parser import scan_api_file, scan_enum_tables, scan_header_file
+from .symbol_table import SymbolTable, member_var_table
+from . import type_translation
+from .type_translation import replace_all
+
+cpp_type_exceptions = []
+
+
+def write_entity_overload(out, name, param, ret):
+    """`get_entity<ENT_TYPE.MONS_SNAKE>(uid)` returns a Snake, for the functions that return an Entity
+
+    It comes after the plain overload, which the calls without a type argument keep resolving to.
+    """
+    if ret.rstrip(" *") == "Entity":
+        out.write_function(f"{name}<T extends ENT_TYPE>", param, "EntityOfType<T>")
+
+
+# patches for what the sources can't express, applied to the class members as they are written
+member_overrides = {
+    "is_poisoned(): boolean": "is_poisoned: (() => {}) | boolean",
+    "drop(entity_to_drop: Entity): void": "drop: ((entity_to_drop: Entity) => {}) | boolean",
+    "keysdown: any //unknown": """/**
+    * array size: 512 
+    * Note: lua starts indexing at 1, you need `keysdown[string.byte('A') + 1]` to find the A key.
+    */
+    keysdown: Array<boolean>""",
+    "keydown: any //unknown": "keydown(key: number | string): boolean",
+    "keypressed: any //unknown": "keypressed(key: number | string, repeat?: boolean ): boolean",
+    "keyreleased: any //unknown": "keyreleased(key: number | string): boolean",
+    "gamepad: any // sol::property([](){g_WantUpdateHasGamepad=true;returnget_gamepad()/**/;})": "gamepad: Gamepad",
+}
+
+
+def parse_sources(config, parse_cache, executor=None):
+    """Scans the header and api files, a file is only parsed again if it changed since it was cached"""
+    header_files = config.header_files
+    api_files = config.api_files
+    rpc = SymbolTable()
+    classes = SymbolTable()
+    events = []
+    funcs = SymbolTable()
+    known_casts = []
+    lualibs = []
+    usertypes = []
+    type_comments = []
+    scanned_files = parse_cache.parse_many(
+        [(scan_header_file, file) for file in header_files] + [(scan_api_file, file) for file in api_files],
+        executor,
+        config.root,
+    )
+
+    for file, scanned in zip(header_files, scanned_files[: len(header_files)]):
+        for func in scanned["rpc"]:
+            rpc.add(func)
+        for cpp_class in scanned["classes"]:
+            cpp_class.file = file
+            cpp_class.member_vars = member_var_table(cpp_class.member_vars)
+            classes.add(cpp_class)
+
+    for file, scanned in zip(api_files, scanned_files[len(header_files) :]):
+        events.extend(scanned["events"])
+        for func in scanned["funcs"]:
+            if func.name not in funcs:
+                funcs.add(func)
+        usertypes.extend(scanned["usertypes"])
+        known_casts.extend(scanned["casts"])
+        type_comments.extend(scanned["type_comments"])
+        lualibs.extend(scanned["lualibs"])
+    known_casts.sort(key=lambda cast: cast.name)
+    parse_cache.save()
+    return Model(rpc, classes, events, funcs, usertypes, known_casts, type_comments, lualibs)
+
+
+def link_usertypes(model):
+    """Matches each bound usertype with its C++ class, returns the types to declare"""
+    classes = model.classes
+    types = SymbolTable()
+    for usertype in model.usertypes:
+        file = usertype.file
+        cpp_type = usertype.cpp_type
+        attr = usertype.attrs
+        base = ""
+        bm = reBases.search(attr)
+        if bm:
+            base = bm.group(1)
+        attr = attr.replace('",', ",")
+        attr = attr.split('"')
+        vars = []
+
+        underlying_cpp_type = classes.get(cpp_type)
+        if underlying_cpp_type is None:
+            if cpp_type in cpp_type_exceptions:
+                underlying_cpp_type = CppClass(cpp_type, {}, SymbolTable())
+            else:
+                raise RuntimeError(
+                        f"No member_funs found in \"{cpp_type}\" while looking for usertypes in file \"{file}\". Did you forget to include a header file at the top of the generate script? (if it isn't the problem then add it to cpp_type_exceptions list)"
+                )
+
+        for var in attr:
+            if not var:
+                continue
+            var = var.split(",")
+            if var[0] == "sol::base_classes" or var[0] == "sol::no_constructor":
+                continue
+            if "table_of" in var[1]:
+                var[1] = var[1].replace("table_of(", "") + "[]"
+            if var[1].startswith("sol::readonly"):
+                var[1] = var[1].replace("sol::readonly(", "")
+                var[1] = var[1][:-1]
+            if var[1].startswith("std::move"):
+                var[1] = var[1].replace("std::move(", "")
+                var[1] = var[1][:-1]
+
+            var_name = intern(var[0])
+            cpp = var[1]
+
+            if var[1].startswith("sol::property"):
+                cpp_name = cpp
+                param_match = reProperty(underlying_cpp_type.name).match(cpp)
+                if param_match:
+                    type_var_name = param_match[1]
+                    m_var_return = rePropertyReturn(type_var_name).search(cpp)
+                    if m_var_return:
+                        cpp_name = m_var_return[1]
+                        cpp_name = cpp_name.replace(".", "::")
+                        cpp = f"&{underlying_cpp_type.name}::{cpp_name}"
+            else:
+                cpp_name = cpp[cpp.find("::") + 2 :] if cpp.find("::") >= 0 else cpp
+
+            if var[0].startswith("sol::constructors"):
+                for fun in underlying_cpp_type.member_funs[cpp_type]:
+                    param = fun.param
+                    if "const" in param:
+                        param = fix_constructor_param(param)
+                    elif param == fun.name:
+                        continue
+                    else:
+                        param = cpp_params_to_typescript(param)
+                    #sig = f"{cpp_type}({param})"
+                    #Will be changed to ts later
+                    sig = f"static {cpp_type} new({param})"
+                    vars.append(Field(cpp_type, "", sig, fun.comment))
+            elif cpp_name in underlying_cpp_type.member_funs:
+                for fun in underlying_cpp_type.member_funs[cpp_name]:
+                    ret = fun.type
+                    param = fun.param
+                    param = cpp_params_to_typescript(param)
+                    sig = f"{ret} {var_name}({param})"
+                    vars.append(Field(var_name, cpp, sig, fun.comment))
+            else:
+                underlying_cpp_var = underlying_cpp_type.member_vars.get(cpp_name)
+                if underlying_cpp_var is not None:
+                    type = underlying_cpp_var.type
+                    sig = ""
+                    if underlying_cpp_var.name.endswith("]"):
+                        if type == "char":
+                            sig = f"{var_name}: string"
+                        else:
+                            arr_size = underlying_cpp_var.name[underlying_cpp_var.name.find("[")+1:-1]
+                            sig = f"{var_name}: FixedSizeArray<{type}, {arr_size}>"
+                    else:
+                        sig = f"{var_name}: {type}"
+                    vars.append(Field(var_name, cpp, sig, underlying_cpp_var.comment))
+                else:
+                    m_return_type = reLambdaReturnType.search(var[1]) #Use var[1] instead of cpp because it could be replaced on the sol::property stuff
+                    if m_return_type:
+                        type = replace_all(m_return_type[1])
+                        sig = f"{var_name}: {type}"
+                        vars.append(Field(var_name, cpp, sig))
+                    else:
+                        vars.append(Field(var_name, cpp))
+        usertype.base = base
+        usertype.fields = vars
+        usertype.cpp_file = underlying_cpp_type.file
+        types.add(usertype)
+
+    for type, comment in model.type_comments:
+        type_to_mod = types.get(type)
+        if type_to_mod is not None:
+            type_to_mod.comment = comment
+    return types
+
+
+#DELETED ENUM STUFF, we will get enums with spel2.lua
+#TODO: get some enums that have comments, like ON or SPAWN_TYPE
+def read_aliases(aliases_file):
+    aliases = []
+    with open(aliases_file, "r") as fp:
+        data = fp.read().split("\n")
+    for line in data:
+        if not line.endswith("NoAlias"):
+            m = reAlias.search(line)
+            if m:
+                name = m.group(1)
+                type = replace_all(m.group(2))
+                aliases.append(Alias(name, type))
+    return aliases
+
+
+def read_enums(enums_file):
+    with open(enums_file, "r", encoding="latin-1") as fp:
+        return list(scan_enum_tables(fp))
+
+
+def merged_comment(kept, other):
+    return kept.comment or other.comment
+
+
+# the types a union of different ones can be made of, two classes or a class and a number aren't merged
+primitive_types = {"number", "boolean", "string", "undefined"}
+
+
+def union_type(a, b):
+    """Union of two TypeScript types, or None when they aren't compatible: neither has every option of the
+    other, and they aren't both made of primitive_types (a C++ int, bool or uint8_t overload)"""
+    options = split_top_level(a, "|")
+    other = split_top_level(b, "|")
+    if set(other) <= set(options):
+        return a
+    if set(options) <= set(other):
+        return b
+    if primitive_types.issuperset(options) and primitive_types.issuperset(other):
+        return " | ".join(options + [option for option in other if option not in options])
+    return None
+
+
+def merge_types(what, first_type, other_type):
+    """(merged type, line for the report) of two declarations of the same member or overload, (None, None) when
+    they aren't compatible (see union_type)"""
+    if other_type == first_type:
+        return first_type, f"{what}: identical overload"
+    merged = union_type(first_type, other_type)
+    if merged is None:
+        return None, None
+    if merged == first_type:
+        return first_type, f"{what}: {other_type} is already part of {first_type}"
+    return merged, f"{what}: merged into {merged}"
+
+
+def merge_rpc_overloads(rpc):
+    """Drops the overloads that translate to the same declaration, merges the ones that differ only by compatible
+    return types, the ones whose return types aren't compatible are all declared
+
+    The return types are compared and merged once translated, `returns` of a merged overload is the translated
+    union (the translation leaves it as it is). The records are the ones of the parse cache, a merged one is a copy.
+    Returns the kept records and a line per merge for the report.
+    """
+    kept = []
+    by_signature = {}  # (name, param) -> positions in `kept` of the overloads with these parameters
+    merges = []
+    for func in rpc:
+        param = replace_all(cpp_params_to_typescript(func.param))
+        returns = replace_all(func.returns) or "void"
+        positions = by_signature.setdefault((func.name, param), [])
+        for i in positions:
+            first = kept[i]
+            first_returns = replace_all(first.returns) or "void"
+            merged, merge = merge_types(f"{func.name}({param})", first_returns, returns)
+            if merged is not None:
+                if merged != first_returns:
+                    first = dataclasses.replace(first, returns=merged)
+                kept[i] = dataclasses.replace(first, comment=merged_comment(first, func))
+                merges.append(merge)
+                break
+        else:
+            positions.append(len(kept))
+            kept.append(func)
+    return kept, merges
+
+
+def member_key(field):
+    """(key, type) of a usertype field, the fields with the same key are declared once with the union of the types"""
+    signature = field.signature
+    if signature is None:
+        # declared as any, only the exact same one is a duplicate
+        return ("any", field.name, field.type), None
+    m = reMemberVariable.match(signature)
+    if m:
+        return ("variable", m[1]), m[2]
+    m = reFunction.search(signature)
+    if m and not m[1].startswith("static"):
+        return ("function", m[2], m[3]), m[1]
+    return ("other", signature), None
+
+
+def merge_members(type):
+    """Collapses the duplicate members of a usertype, returns a line per merge for the report
+
+    The types of the members are translated when the headers are parsed, a type or return type is merged like the
+    return type of an rpc overload (see merge_types). The overloads of a method whose return types aren't
+    compatible are all declared, a variable can only be declared once: the first is kept, the report says so.
+    """
+    kept = []
+    by_key = {}  # key -> positions in `kept` of the members with this key
+    merges = []
+    for field in type.fields:
+        key, member_type = member_key(field)
+        positions = by_key.setdefault(key, [])
+        for i in positions:
+            first = kept[i]
+            first_type = member_key(first)[1]
+            if member_type == first_type:
+                merges.append(f"{type.name}.{field.name}: duplicate member")
+            else:
+                merged, merge = merge_types(f"{type.name}.{field.name}", first_type, member_type)
+                if merged is None:
+                    if key[0] != "variable":
+                        continue
+                    merged = first_type
+                    merge = f"{type.name}.{field.name}: {member_type} isn't compatible with {first_type}, kept the first declaration"
+                if key[0] == "variable":
+                    first = dataclasses.replace(first, signature=f"{key[1]}: {merged}")
+                else:
+                    first = dataclasses.replace(first, signature=f"{merged} {key[1]}({key[2]})")
+                merges.append(merge)
+            kept[i] = dataclasses.replace(first, comment=merged_comment(first, field))
+            break
+        else:
+            positions.append(len(kept))
+            kept.append(field)
+    type.fields = kept
+    return merges
+
+
+def merge_duplicates(api):
+    """Normalizes the linked api in place so each declaration is written once, returns what was merged"""
+    api.rpc, merges = merge_rpc_overloads(api.rpc)
+    for type in api.types:
+        merges.extend(merge_members(type))
+    stats.count("merged_declarations", len(merges))
+    return merges
+
+
+def link_api(config, model):
+    """Links the parsed sources into the Api the declarations are written from, returns it and the merged duplicates"""
+    with stats.phase("usertype_linking"):
+        types = link_usertypes(model)
+    with stats.phase("alias_parsing"):
+        aliases = read_aliases(config.source(config.aliases_file))
+    with stats.phase("enum_extraction"):
+        enums = read_enums(config.source(config.enums_file))
+    api = Api(
+        list(model.rpc),
+        list(model.funcs),
+        model.events,
+        list(types),
+        model.known_casts,
+        enums,
+        aliases,
+        model.lualibs,
+    )
+    with stats.phase("duplicate_merging"):
+        merges = merge_duplicates(api)
+    return api, merges
+
+
+def type_part(type):
+    """Part of the split layout a usertype goes to: imgui, its entities_*_lua.cpp family or the other types"""
+    if type.cpp_file and type.cpp_file.endswith("imgui.h"):
+        return "imgui"
+    m = reEntityFamily.search(type.file)
+    return m[1] if m else "types"
+
+
+# entities_*_lua.cpp family whose usertypes the ENT_TYPE members of a category can be, e.g. MONS_SNAKE a monster
+ent_type_category_families = {
+    "ACTIVEFLOOR": "entities_activefloors",
+    "BG": "entities_backgrounds",
+    "MIDBG": "entities_backgrounds",
+    "CHAR": "entities_chars",
+    "DECORATION": "entities_decorations",
+    "FLOOR": "entities_floors",
+    "FLOORSTYLED": "entities_floors",
+    "FX": "entities_fx",
+    "ITEM": "entities_items",
+    "LIQUID": "entities_liquids",
+    "LOGICAL": "entities_logical",
+    "MONS": "entities_monsters",
+    "MOUNT": "entities_mounts",
+}
+
+
+def entity_families(api):
+    """Usertype that is an Entity -> its entities_*_lua.cpp family, the one of its nearest base with one when it's
+    registered elsewhere, None when neither is"""
+    types = {type.name: type for type in api.types}
+    families = {}
+
+    def family(name, visiting=()):
+        if name not in families:
+            type = types[name]
+            m = reEntityFamily.search(type.file or "")
+            families[name] = m[1] if m else None
+            if not m:
+                # sol::bases lists the farthest base first
+                for base in reversed([base.strip() for base in type.base.split(",")] if type.base else []):
+                    if base in types and base != name and base not in visiting:
+                        families[name] = family(base, visiting + (name,))
+                        if families[name]:
+                            break
+        return families[name]
+
+    return {
+        type.name: family(type.name)
+        for type in api.types
+        if type.name == "Entity" or "Entity" in (base.strip() for base in type.base.split(","))
+    }
+
+
+def entity_class_by_type(api):
+    """ENT_TYPE member -> class of the entities of that type, e.g. {"MONS_SNAKE": "Snake"}
+
+    The sources have no such table, the member without its category prefix, in CamelCase, is matched with the
+    usertypes that are an Entity. The member is only mapped when its category is the family of the class
+    (see ent_type_category_families), and no class name claimed by more than one category is: DECORATION_VLAD
+    isn't a Vlad and BG_DOOR, LOGICAL_DOOR aren't a Door, they stay an Entity.
+    """
+    families = entity_families(api)
+    candidates = {}
+    categories = {}
+    for enum in api.enums:
+        if enum.name != "ENT_TYPE":
+            continue
+        for member, _ in enum.members:
+            m = reEntTypeCategory.match(member)
+            category = m[0][:-1] if m else ""
+            name = "".join(word.capitalize() for word in member[m.end() if m else 0 :].split("_"))
+            categories.setdefault(name, set()).add(category)
+            if name in families and families[name] == ent_type_category_families.get(category):
+                candidates[member] = name
+    return {member: name for member, name in candidates.items() if len(categories[name]) == 1}
+
+
+def write_entity_casts(out, api, typed_entities):
+    """`Entity.as_*` casts with the class they return, and with ENT_TYPE the class of each entity type
+
+    Nothing is written when Entity isn't declared (a shaken api whose script never gets to one).
+    """
+    declared = {type.name for type in api.types}
+    if "Entity" not in declared:
+        return
+    out.write_section("Entity casts")
+    out.write_interface(
+        "Entity",
+        (f"{cast.name}(): {cast.type if cast.type in declared else 'Entity'}" for cast in api.known_casts),
+    )
+    if not typed_entities:
+        return
+    out.write_interface(
+        "EntityClassByType",
+        (f"[ENT_TYPE.{member}]: {name}" for member, name in entity_class_by_type(api).items()),
+    )
+    out.write_alias(
+        "EntityOfType<T extends ENT_TYPE>",
+        "T extends keyof EntityClassByType ? EntityClassByType[T] : Entity",
+    )
+
+
+def write_declarations(out, api, const_enums=False, variables=None):
+    """Writes the parts core, types (plus one per type_part), enums and aliases, in that order for a single file
+
+    With `const_enums` the enums are declared `const enum`, TypeScriptToLua then compiles `ENT_TYPE.ITEM_WHIP`
+    to its number instead of indexing the global ENT_TYPE table at runtime. `variables` are the (name, type) of
+    the global variables to declare, all of `global_variables` by default.
+    """
+    # get_entity<ENT_TYPE.MONS_SNAKE>(uid) and the like return the class of that entity type
+    typed_entities = any(enum.name == "ENT_TYPE" for enum in api.enums)
+    #print("## Global variables")
+    #print("""These variables are always there to use.""")
+    #for lf in funcs:
+    #    
+    #    if lf["name"] in not_functions:
+    #        print(
+    #            "### [`"
+    #            + lf["name"]
+    #            + "`](https://github.com/spelunky-fyi/overlunky/search?l=Lua&q="
+    #            + lf["name"]
+    #            + ")"
+    #        )
+    #        for com in lf["comment"]:
+    #            print(com)
+
+    core = out.part("core")
+    core.write(
+        """// Does nothing but fixes docs and showns size
+type FixedSizeArray<T, N extends number> = Array<T>;
+
+declare interface Meta {
+    name: string;
+    version: string;
+    description: string;
+    author: string;
+}
+declare let meta: Meta;
+"""
+    )
+    for name, type in global_variables if variables is None else variables:
+        core.write(f"declare const {name}: {type};")
+    core.write(
+        """declare interface Callback {
+    (...args: any[]): any;
+}
+declare interface SoundCallbackFunction extends Callback {}""" #make class with extends or type = Callback?
+    )
+
+    #deprecated_funcs = [
+    #    func for func in funcs if func["comment"] and func["comment"][0] == "Deprecated"
+    #]
+
+    core.write_section("Functions")
+
+    with stats.phase("function_emission"):
+        for name, param, ret, comment in declared_functions(api):
+            core.write_function(name, param, ret, comment)
+            if typed_entities:
+                write_entity_overload(core, name, param, ret)
+
+
+    #print("//## Deprecated Functions")
+    #print(
+    #    "//#### These functions still exist but their usage is discouraged, they all have alternatives mentioned here so please use those!"
+    #)
+    #
+    #for lf in events:
+    #    if lf["name"].startswith("on_"):
+    #        print(
+    #            "### [`"
+    #            + lf["name"]
+    #            + "`](https://github.com/spelunky-fyi/overlunky/search?l=Lua&q="
+    #            + lf["name"]
+    #            + ")"
+    #        )
+    #        for com in lf["comment"]:
+    #            print(com)
+    #
+    #for lf in deprecated_funcs:
+    #    lf["comment"].pop(0)
+    #    if len(rpc.get_all(lf["cpp"])):
+    #        for af in rpc.get_all(lf["cpp"]):
+    #            print_af(lf, af)
+    #    elif not (lf["name"].startswith("on_") or lf["name"] in not_functions):
+    #        if lf["comment"] and lf["comment"][0] == "NoDoc":
+    #            continue
+    #        m = re.search(r"\(([^\{]*)\)\s*->\s*([^\{]*)", lf["cpp"])
+    #        m2 = re.search(r"\(([^\{]*)\)", lf["cpp"])
+    #        ret = "nil"
+    #        param = ""
+    #        if m:
+    #            ret = replace_all(m.group(2)).strip() or "nil"
+    #        if m or m2:
+    #            param = (m or m2).group(1)
+    #            param = replace_all(param).strip()
+    #        name = lf["name"]
+    #        fun = f"{ret} {name}({param})".strip()
+    #        search_link = "https://github.com/spelunky-fyi/overlunky/search?l=Lua&q=" + name
+    #        print(f"### [`{name}`]({search_link})")
+    #        print(f"`{fun}`<br/>")
+    #        for com in lf["comment"]:
+    #            print(com)
+
+    out.part("types").write_section("Types")
+    with stats.phase("class_emission"):
+        for type in api.types:
+            base = type.base.split(",")[-1] if type.base else None
+            out.part(type_part(type)).write_class(
+                type.name,
+                base,
+                ((var.comment, member_text(var)) for var in type.fields),
+            )
+
+    write_entity_casts(out.part("types"), api, typed_entities)
+
+    enums = out.part("enums")
+    enums.write_section("Enums")
+    enums.write()
+    for enum in api.enums:
+        enums.write_enum(enum.name, enum.members, const_enums)
+    #for type in enums:
+    #    print("### " + type["name"])
+    #    if "comment" in type:
+    #        for com in type["comment"]:
+    #            print(com)
+    #    for var in type["vars"]:
+    #        if var["name"]:
+    #            print(
+    #                "- [`"
+    #                + var["name"]
+    #                + "`](https://github.com/spelunky-fyi/overlunky/search?l=Lua&q="
+    #                + type["name"]
+    #                + "."
+    #                + var["name"]
+    #                + ") "
+    #                + var["type"]
+    #            )
+    #        else:
+    #            print("- " + var["type"])
+    #        if "docs" in var:
+    #            print(var["docs"])
+
+    #EXTRA THINGS
+    core.write(
+    """//was made for fixing arrays of size MAX_PLAYERS, but since I removed the max size because TS doesn't have those, isn't needed
+declare type MAX_PLAYERS = 4
+
+declare type in_port_t = number
+declare class Logic {}
+
+declare type OnlinePlayerShort = any
+declare type UdpServer = any
+declare type Texture = any
+declare type SpearDanglerAnimFrames = any
+declare type OnlineLobbyScreenPlayer = any"""
+    )
+
+    out.part("aliases").write_section("Aliases")
+    out.part("aliases").write_alias("IMAGE", "number")
+    for alias in api.aliases:
+        name = alias.name
+        type = alias.type
+        #print(f"### {name} == {type}")
+        out.part("aliases").write_alias(name, type)
+
+    #print(classes)
+
+
+def stable_order(api):
+    """The api with the functions, types, enums and aliases sorted by name (overloads keep their order)
+
+    The order the sources declare things in depends on the file lists and on which file binds a name first,
+    sorting keeps the declarations where they are when that changes.
+    """
+    by_name = lambda record: record.name
+    return dataclasses.replace(
+        api,
+        funcs=sorted(api.funcs, key=by_name),
+        types=sorted(api.types, key=by_name),
+        enums=sorted(api.enums, key=by_name),
+        aliases=sorted(api.aliases, key=by_name),
+    )
+
+
+class TypeScriptBackend(Backend):
+    """The declarations, to `path` or split in parts in `split_dir` (see write_declarations)"""
+
+    name = "typescript"
+
+    def __init__(self, path=OUTPUT_FILE, split_dir=None, const_enums=False, canonical=False):
+        self.path = path
+        self.split_dir = split_dir
+        self.const_enums = const_enums
+        self.canonical = canonical
+
+    def write(self, api):
+        if self.split_dir:
+            out = SplitEmitter(self.split_dir, member_overrides, NO_SELF_IN_FILE, canonical=self.canonical)
+        else:
+            out = Emitter(self.path, member_overrides, NO_SELF_IN_FILE, canonical=self.canonical)
+        with out:
+            write_declarations(out, api, self.const_enums)
+        return out.changes()
+
+
+def config_backends(config):
+    """The backends of the outputs `config` asks for, the TypeScript declarations first"""
+    backends = [TypeScriptBackend(config.output_path(), config.split_dir, config.const_enums, config.stable)]
+    # the other backends are only imported when they are asked for
+    if config.luals:
+        from .luals_backend import LuaLSBackend
+
+        backends.append(LuaLSBackend(config.luals))
+    if config.markdown:
+        from .markdown_backend import MarkdownBackend
+
+        backends.append(MarkdownBackend(config.markdown))
+    if config.symbol_index:
+        from .symbol_index import SymbolIndexBackend
+
+        backends.append(SymbolIndexBackend(config.symbol_index))
+    if config.shake:
+        from .tree_shaking import ShakenTypeScriptBackend
+
+        backends.append(ShakenTypeScriptBackend(config.shaken_path(), config.shake, config.const_enums, config.stable))
+    return backends
+
+
+def concurrent_backends(config, backends):
+    """Whether the backends can run at the same time: there are several, more than one cpu and fork"""
+    if not config.concurrent or len(backends) < 2 or (os.cpu_count() or 1) < 2:
+        return False
+    import multiprocessing
+
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def write_output(api, backends, stable=False, concurrent=False):
+    """Writes the output of each backend, files whose content is the same as before aren't touched
+
+    With `stable` the declarations are sorted (and the TypeScriptBackend has its whitespace canonicalized).
+    With `concurrent` the backends run at the same time (see backends.run_backends). Returns {path: changed
+    section titles} of the files that were rewritten.
+    """
+    if stable:
+        api = stable_order(api)
+    return run_backends(backends, api, concurrent)
+
+
+# kept for the next generations of the process, by cache path and by number of jobs
+parse_caches = {}
+executors = {}
+parser_hash = None
+
+
+def parser_version():
+    """Hash of the modules the parsed records depend on, the records cached by other versions are discarded"""
+    global parser_hash
+    if parser_hash is None:
+        digest = hashlib.blake2b()
+        for module in (patterns, cpp_parser, source_parser, type_translation, model):
+            with open(module.__file__, "rb") as module_source:
+                digest.update(module_source.read())
+        parser_hash = digest.digest()
+    return parser_hash
+
+
+def open_parse_cache(path):
+    """The parse cache saved to `path` (None keeps it in memory only), opened once per process"""
+    path = os.path.abspath(path) if path else None
+    parse_cache = parse_caches.get(path)
+    if parse_cache is None:
+        parse_cache = parse_caches[path] = ParseCache(path, parser_version())
+    return parse_cache
+
+
+def open_executor(jobs):
+    """Pool of `jobs` processes that parse the source files (None for a single job), started once per process
+
+    The workers are sent the parsers of source_parser.py, importing them doesn't run anything, so the pool works
+    with any start method (spawn on Windows).
+    """
+    if jobs <= 1:
+        return None
+    executor = executors.get(jobs)
+    if executor is None:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = executors[jobs] = ProcessPoolExecutor(jobs)
+    return executor
+
+
+def shutdown():
+    """Stops the worker processes and drops the parse caches that generate() keeps between calls"""
+    for executor in executors.values():
+        executor.shutdown()
+    executors.clear()
+    parse_caches.clear()
+
+
+def build_api(config, parse_cache, executor, timings):
+    """Parses and links the sources of `config.root`, returns the Api and the merged duplicates
+
+    The time of each phase goes to `timings`.
+    """
+    parse_cache.start_generation()
+    stats.reset()
+    start = time.perf_counter()
+    model = parse_sources(config, parse_cache, executor)
+    timings["parse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    api, merges = link_api(config, model)
+    timings["link"] = time.perf_counter() - start
+    return api, merges
+
+
+def parse(config=None):
+    """The linked Api (model.Api) of the sources of `config`, everything the outputs are written from"""
+    config = config or Config()
+    api, _ = build_api(config, open_parse_cache(config.cache), open_executor(config.jobs), {})
+    return api
+
+
+def generate(config=None, api=None):
+    """Parses, links and writes the outputs `config` asks for, returns a Result
+
+    Given an `api` (e.g. loaded with model_io.load_model) the outputs are written from it, nothing is parsed.
+    The linked Api is also saved to `config.model_path` when given (see model_io.py).
+    """
+    config = config or Config()
+    timings = {}
+    merges = []
+    parsed = reused = 0
+    if api is None:
+        parse_cache = open_parse_cache(config.cache)
+        api, merges = build_api(config, parse_cache, open_executor(config.jobs), timings)
+        parsed, reused = parse_cache.misses, parse_cache.hits
+
+    if config.model_path:
+        from .model_io import dump_model
+
+        start = time.perf_counter()
+        dump_model(api, config.model_path)
+        timings["dump_model"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    backends = config_backends(config)
+    changes = write_output(api, backends, config.stable, concurrent_backends(config, backends))
+    timings["emit"] = time.perf_counter() - start
+    return Result(api, changes, merges, timings, parsed, reused)
+
+
+def api_symbols(api):
+    """{"kind name": what's declared for it} of an api, to compare versions of the API"""
+    rpc = SymbolTable(api.rpc)
+    symbols = {}
+    for func in api.funcs:
+        symbols[f"function {func.name}"] = (func.cpp, tuple((af.returns, af.param) for af in rpc.get_all(func.cpp)))
+    for type in api.types:
+        symbols[f"type {type.name}"] = (type.base, tuple((var.name, var.type, var.signature) for var in type.fields))
+    for cast in api.known_casts:
+        symbols[f"cast {cast.name}"] = cast.type
+    for enum in api.enums:
+        symbols[f"enum {enum.name}"] = enum.members
+    for alias in api.aliases:
+        symbols[f"alias {alias.name}"] = alias.type
+    return symbols
+
+
+def compare_symbols(old, new):
+    """(added, removed, changed) symbol names between two api_symbols()"""
+    added = [name for name in new if name not in old]
+    removed = [name for name in old if name not in new]
+    changed = [name for name in new if name in old and old[name] != new[name]]
+    return added, removed, changed
+
+
+def generate_versions(configs):
+    """Generates several Overlunky checkouts (or git worktrees) in one process, one config per checkout
+
+    Files with the same content in several checkouts are parsed only once (the parse cache is content-addressed),
+    the TypeScript translations are memoized for all of them. Returns a (Result, {"symbols", "added", "removed",
+    "changed"}) pair per config, with what each version added, removed and changed compared to the previous one.
+    """
+    versions = []
+    previous = None
+    with contextlib.ExitStack() as batches:
+        # the cache keeps the files of every checkout, not only the ones of the last
+        for path in {config.cache and os.path.abspath(config.cache) for config in configs}:
+            batches.enter_context(open_parse_cache(path).batch())
+        for config in configs:
+            result = generate(config)
+            symbols = api_symbols(result.api)
+            added, removed, changed = compare_symbols(previous, symbols) if previous is not None else ([], [], [])
+            previous = symbols
+            versions.append((result, {"symbols": len(symbols), "added": added, "removed": removed, "changed": changed}))
+    return versions
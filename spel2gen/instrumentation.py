@@ -0,0 +1,114 @@
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+class CountingPattern:
+    """Compiled pattern that counts every evaluation (search, match, sub...) in `counters["regex_evaluations"]`"""
+
+    def __init__(self, pattern, counters):
+        self.pattern = pattern
+        self.counters = counters
+
+    def __getattr__(self, name):
+        # flags, groups, pattern...
+        return getattr(self.pattern, name)
+
+    def search(self, *args):
+        self.counters["regex_evaluations"] += 1
+        return self.pattern.search(*args)
+
+    def match(self, *args):
+        self.counters["regex_evaluations"] += 1
+        return self.pattern.match(*args)
+
+    def fullmatch(self, *args):
+        self.counters["regex_evaluations"] += 1
+        return self.pattern.fullmatch(*args)
+
+    def findall(self, *args):
+        self.counters["regex_evaluations"] += 1
+        return self.pattern.findall(*args)
+
+    def finditer(self, *args):
+        self.counters["regex_evaluations"] += 1
+        return self.pattern.finditer(*args)
+
+    def sub(self, *args):
+        self.counters["regex_evaluations"] += 1
+        return self.pattern.sub(*args)
+
+    def split(self, *args):
+        self.counters["regex_evaluations"] += 1
+        return self.pattern.split(*args)
+
+
+class Stats:
+    """Time spent in each phase of a run and counters of the work done
+
+    Disabled by default so a normal run only pays for a flag check per phase and per counted file.
+    `enable` also swaps the patterns of the given modules (and objects, e.g. replace_all) for counting ones,
+    this is never undone so it's meant for runs that are profiled from the start (--profile / --stats).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.timings = {}
+        self.counters = Counter()
+
+    def enable(self, *namespaces):
+        self.enabled = True
+        for namespace in namespaces:
+            for name, value in list(vars(namespace).items()):
+                if isinstance(value, re.Pattern):
+                    setattr(namespace, name, CountingPattern(value, self.counters))
+                elif name.startswith("re") and hasattr(value, "cache_info"):
+                    # lru_cached pattern factories, e.g. reProperty(class_name)
+                    setattr(namespace, name, self.counting_factory(value))
+
+    def counting_factory(self, factory):
+        def counting(*args):
+            return CountingPattern(factory(*args), self.counters)
+
+        return counting
+
+    def count_calls(self, cls, counter, *methods):
+        """Counts the calls to some methods of a class in `counters[counter]`"""
+        for method in methods:
+            original = getattr(cls, method)
+
+            def counting(*args, _original=original):
+                self.counters[counter] += 1
+                return _original(*args)
+
+            setattr(cls, method, counting)
+
+    def reset(self):
+        self.timings.clear()
+        self.counters.clear()
+
+    @contextmanager
+    def phase(self, name):
+        """Adds the time spent in the block to the phase, a phase can be entered many times (e.g. once per file)"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0) + time.perf_counter() - start
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] += n
+
+    def report(self):
+        return {
+            "phases": dict(sorted(self.timings.items(), key=lambda item: -item[1])),
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+
+stats = Stats()
@@ -0,0 +1,222 @@
+"""LuaLS (lua-language-server) annotations of the API, for the mods written in plain Lua
+
+A `---@meta` file with the globals, the functions with their `---@param` and `---@return`, a `---@class` per usertype,
+the enums as `---@enum` tables and the aliases. The types are those of the TypeScript declarations (signatures.py)
+in the LuaLS notation: `FixedSizeArray<number, 4>` is `number[]`, `LuaMultiReturn<[number, number]>` two returns.
+"""
+from functools import lru_cache
+
+from .backends import Backend
+from .emitter import Emitter
+from .patterns import reGenericType, reLuaSectionTitle, reMemberVariable, reParamName, reTsMember
+from .signatures import declared_functions, global_variables, member_text, split_params, split_top_level
+
+LUA_KEYWORDS = {
+    "and", "break", "do", "else", "elseif", "end", "false", "for", "function", "goto", "if", "in", "local", "nil",
+    "not", "or", "repeat", "return", "then", "true", "until", "while",
+}
+LUA_TYPES = {
+    "undefined": "nil",
+    "void": "nil",
+    "Callback": "function",
+    "LuaTable": "table",
+    "object": "table",
+}
+
+
+@lru_cache(maxsize=None)
+def lua_type(ts_type):
+    """LuaLS type of a TypeScript type of the declarations, types it doesn't know are kept as they are
+
+    Memoized, the same types come up a lot. The C++ template arguments with a comma aren't translated whole (see cpp_params_to_typescript), what's left of
+    them is `any`.
+    """
+    if ts_type.count("<") != ts_type.count(">"):
+        return "any"
+    options = split_top_level(ts_type, "|")
+    if len(options) > 1:
+        return "|".join(lua_type(option) for option in options)
+    ts_type = ts_type.strip()
+    if ts_type.endswith("[]"):
+        return array_type(lua_type(ts_type[:-2]))
+    m = reGenericType.match(ts_type)
+    if m:
+        name = m[1]
+        args = split_top_level(m[2], ",")
+        if name in ("Array", "FixedSizeArray") and args:
+            return array_type(lua_type(args[0]))
+        if name == "LuaTable" and len(args) == 2:
+            return f"table<{lua_type(args[0])}, {lua_type(args[1])}>"
+        if name == "LuaMultiReturn":
+            return "table"
+        return LUA_TYPES.get(name, name)
+    return LUA_TYPES.get(ts_type, ts_type) or "any"
+
+
+def array_type(element):
+    return f"({element})[]" if "|" in element else element + "[]"
+
+
+def lua_returns(ret):
+    """LuaLS types of what a function returns, none for void and one per value of a LuaMultiReturn"""
+    ret = ret.strip()
+    m = reGenericType.match(ret)
+    if m and m[1] == "LuaMultiReturn":
+        return [lua_type(value) for value in split_top_level(m[2].strip("[]"), ",")]
+    if ret in ("void", ""):
+        return []
+    return [lua_type(ret)]
+
+
+def lua_params(param):
+    """(name, type) of each parameter in Lua: `name?` when it's optional, `...` for the variadic one"""
+    params = []
+    for i, (name, type) in enumerate(split_params(param)):
+        if name.startswith("..."):
+            type = type[:-2] if type.endswith("[]") else type
+            params.append(("...", lua_type(type)))
+            continue
+        optional = name.endswith("?")
+        m = reParamName.search(name)
+        name = m[1] if m else f"arg{i}"
+        if name in LUA_KEYWORDS:
+            name += "_"
+        params.append((name + ("?" if optional else ""), lua_type(type)))
+    return params
+
+
+def function_type(param, ret, self_type=None):
+    """`fun(...)` type of a function, with `self` first for a method"""
+    params = lua_params(param)
+    if self_type:
+        params.insert(0, ("self", self_type))
+    returns = lua_returns(ret)
+    text = "fun(" + ", ".join(f"{name}: {type}" for name, type in params) + ")"
+    return text + (": " + ", ".join(returns) if returns else "")
+
+
+def member_fields(class_name, fields):
+    """(comment, name, LuaLS type) of the members of a usertype, the overloads of a method are a union of their types"""
+    members = {}
+    comments = {}
+    for field in fields:
+        text = member_text(field, count=False)
+        m = reTsMember.match(text)
+        if m:
+            name = m[2]
+            type = function_type(m[3], m[4], None if m[1] else class_name)
+        else:
+            m = reMemberVariable.match(text)
+            if not m:
+                continue
+            name = m[1]
+            type = lua_type(m[2].split("//")[0])
+        if name in members:
+            if type not in members[name].split("|"):
+                members[name] += "|" + type
+        else:
+            members[name] = type
+            comments[name] = field.comment
+    return [(comments[name], name, type) for name, type in members.items()]
+
+
+class LuaEmitter(Emitter):
+    """Emitter of LuaLS annotations, sections are `--## title`"""
+
+    reTitle = reLuaSectionTitle
+    section_title = "--## {}"
+
+    def __init__(self, path):
+        super().__init__(path, header="---@meta")
+
+    def write_comment(self, comment):
+        for line in comment or ():
+            self.write(f"---{line}")
+
+    def write_function(self, name, overloads, comment=()):
+        """`overloads` are the (param, ret) of each overload of the function, the first one is the definition"""
+        param, ret = overloads[0]
+        self.write_comment(comment)
+        params = lua_params(param)
+        for param_name, type in params:
+            self.write(f"---@param {param_name} {type}")
+        for type in lua_returns(ret):
+            self.write(f"---@return {type}")
+        for other_param, other_ret in overloads[1:]:
+            self.write(f"---@overload {function_type(other_param, other_ret)}")
+        self.write(f"function {name}({', '.join(param_name.rstrip('?') for param_name, _ in params)}) end")
+        self.write()
+
+    def write_class(self, name, base, members, comment=()):
+        """`members` are (comment, name, type) triples"""
+        self.write_comment(comment)
+        self.write(f"---@class {name}" + (f" : {base}" if base else ""))
+        for member_comment, member, type in members:
+            self.write_comment(member_comment)
+            self.write(f"---@field {member} {type}")
+        self.write()
+
+    def write_enum(self, name, members, const=False):
+        self.write(f"---@enum {name}")
+        self.write(f"{name} = {{")
+        for member, value in members:
+            self.write(f"    {member} = {value},")
+        self.write("}")
+        self.write()
+
+    def write_alias(self, name, type):
+        self.write(f"---@alias {name} {type}")
+
+    def write_global(self, name, type):
+        self.write(f"---@type {type}")
+        self.write(f"{name} = nil")
+
+
+def write_annotations(out, api):
+    """Writes the globals, functions, types, enums and aliases of the api"""
+    out.write_class(
+        "Meta", None, [((), "name", "string"), ((), "version", "string"), ((), "description", "string"), ((), "author", "string")]
+    )
+    out.write_global("meta", "Meta")
+    for name, type in global_variables:
+        out.write_global(name, lua_type(type))
+
+    out.write_section("Functions")
+    functions = {}
+    for name, param, ret, comment in declared_functions(api):
+        functions.setdefault(name, ([], comment))[0].append((param, ret))
+    for name, (overloads, comment) in functions.items():
+        out.write_function(name, overloads, comment)
+
+    out.write_section("Types")
+    declared = {type.name for type in api.types}
+    for type in api.types:
+        base = type.base.split(",")[-1].strip() if type.base else None
+        members = member_fields(type.name, type.fields)
+        if type.name == "Entity":
+            members += [
+                ((), cast.name, f"fun(self: Entity): {cast.type if cast.type in declared else 'Entity'}")
+                for cast in api.known_casts
+            ]
+        out.write_class(type.name, base, members, type.comment)
+
+    out.write_section("Enums")
+    for enum in api.enums:
+        out.write_enum(enum.name, enum.members)
+
+    out.write_section("Aliases")
+    out.write_alias("IMAGE", "number")
+    for alias in api.aliases:
+        out.write_alias(alias.name, lua_type(alias.type.rstrip(";")))
+
+
+class LuaLSBackend(Backend):
+    name = "luals"
+
+    def __init__(self, path):
+        self.path = path
+
+    def write(self, api):
+        with LuaEmitter(self.path) as out:
+            write_annotations(out, api)
+        return out.changes()
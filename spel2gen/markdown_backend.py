@@ -0,0 +1,114 @@
+"""Markdown reference of the API, one heading per global, function, type, enum and alias
+
+Signatures are those of the TypeScript declarations (signatures.py). Every name links to a search of the
+Overlunky sources, where it's bound.
+"""
+from .backends import Backend
+from .emitter import Emitter
+from .patterns import reMarkdownSectionTitle
+from .signatures import declared_functions, member_text, not_functions
+
+SEARCH_LINK = "https://github.com/spelunky-fyi/overlunky/search?l=Lua&q="
+
+
+def search_link(name):
+    return SEARCH_LINK + name
+
+
+class MarkdownEmitter(Emitter):
+    """Emitter of the Markdown reference, sections are `## title`"""
+
+    reTitle = reMarkdownSectionTitle
+    section_title = "## {}"
+
+    def __init__(self, path, title):
+        super().__init__(path, header=f"# {title}")
+
+    def write_comment(self, comment, indent=""):
+        for line in comment or ():
+            self.write(indent + line)
+
+    def write_heading(self, name, link=True):
+        self.write(f"### [`{name}`]({search_link(name)})" if link else f"### {name}")
+
+    def write_function(self, name, overloads, comment=()):
+        """`overloads` are the (param, ret) of each overload of the function"""
+        self.write_heading(name)
+        for param, ret in overloads:
+            self.write(f"`{ret} {name}({param})`<br/>")
+        self.write_comment(comment)
+        self.write()
+
+    def write_class(self, name, base, members, comment=(), declared=()):
+        """`members` are (comment, name, text) triples, the base links to its heading when it's `declared`"""
+        self.write_heading(name, link=False)
+        if base:
+            self.write(f"Derived from [{base}](#{base.lower()})<br/>" if base in declared else f"Derived from {base}<br/>")
+        self.write_comment(comment)
+        self.write()
+        for member_comment, member, text in members:
+            self.write(f"- [`{member}`]({search_link(f'{name}.{member}')}) `{text}`")
+            self.write_comment(member_comment, "  ")
+        self.write()
+
+    def write_enum(self, name, members, const=False):
+        self.write_heading(name, link=False)
+        for member, value in members:
+            self.write(f"- [`{member}`]({search_link(f'{name}.{member}')}) {value}")
+        self.write()
+
+    def write_alias(self, name, type):
+        self.write(f"### {name} == {type}")
+
+
+def write_reference(out, api):
+    """Writes the global variables, functions, types, enums and aliases of the api"""
+    out.write_section("Global variables")
+    out.write("These variables are always there to use.")
+    out.write()
+    for lf in api.funcs:
+        if lf.name in not_functions:
+            out.write_heading(lf.name)
+            out.write_comment(lf.comment)
+            out.write()
+
+    out.write_section("Functions")
+    functions = {}
+    for name, param, ret, comment in declared_functions(api):
+        functions.setdefault(name, ([], comment))[0].append((param, ret))
+    for name, (overloads, comment) in functions.items():
+        out.write_function(name, overloads, comment)
+
+    out.write_section("Types")
+    declared = {type.name for type in api.types}
+    for type in api.types:
+        base = type.base.split(",")[-1].strip() if type.base else None
+        members = [(var.comment, var.name, member_text(var, count=False)) for var in type.fields]
+        if type.name == "Entity":
+            members += [
+                ((), cast.name, f"{cast.name}(): {cast.type if cast.type in declared else 'Entity'}")
+                for cast in api.known_casts
+            ]
+        out.write_class(type.name, base, members, type.comment, declared)
+
+    out.write_section("Enums")
+    for enum in api.enums:
+        out.write_enum(enum.name, enum.members)
+
+    out.write_section("Aliases")
+    out.write_alias("IMAGE", "number")
+    for alias in api.aliases:
+        out.write_alias(alias.name, alias.type)
+
+
+class MarkdownBackend(Backend):
+    name = "markdown"
+
+    def __init__(self, path, title="Spelunky 2 Lua API"):
+        self.path = path
+        self.title = title
+
+    def write(self, api):
+        with MarkdownEmitter(self.path, self.title) as out:
+            write_reference(out, api)
+        return out.changes()
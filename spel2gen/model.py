@@ -0,0 +1,129 @@
+"""Records extracted from the sources and linked into the declarations
+
+Every record is a slotted dataclass: no per-instance __dict__, attribute access instead of string keys.
+Names are interned and comments are tuples shared between the records that have the same ones (see `shared_comment`),
+so the many records with the same names, types and docs (overloads, imgui, entity members) don't each
+keep their own copy. Records are built by the parsers and pickled in the parse cache, a pickle keeps that
+sharing within each file.
+"""
+import sys
+from dataclasses import dataclass, field
+
+intern = sys.intern
+
+_comments = {(): ()}
+
+
+def shared_comment(lines):
+    """Immutable comment of a record, equal comments are the same tuple"""
+    lines = tuple(lines)
+    return _comments.setdefault(lines, lines)
+
+
+@dataclass(slots=True)
+class Rpc:
+    """Free function declared in a header"""
+
+    name: str
+    returns: str
+    param: str
+    comment: tuple = ()
+
+
+@dataclass(slots=True)
+class Member:
+    """Member of a C++ class, a function when `param` isn't None (then `type` is its return type)"""
+
+    name: str  # variables include the array size, e.g. `slots[4]`
+    type: str
+    comment: tuple = ()
+    param: str = None
+
+
+@dataclass(slots=True)
+class CppClass:
+    name: str
+    member_funs: dict  # name -> [Member], overloads in declaration order
+    member_vars: list  # [Member], a SymbolTable once the class is linked
+    file: str = None
+
+
+@dataclass(slots=True)
+class Binding:
+    """`lua["name"] = cpp` in an api file, or `lua["name"];` for events (no cpp)"""
+
+    name: str
+    cpp: str = ""
+    comment: tuple = ()
+
+
+@dataclass(slots=True)
+class Field:
+    """Member of a usertype as it's declared, `signature` is None when the type couldn't be resolved"""
+
+    name: str
+    type: str
+    signature: str = None
+    comment: tuple = None
+
+
+@dataclass(slots=True)
+class Usertype:
+    """`new_usertype<cpp_type>("name", attrs...)`, its fields are filled in when it's linked with its class"""
+
+    name: str
+    cpp_type: str
+    attrs: str
+    file: str = None
+    base: str = ""
+    fields: list = field(default_factory=list)
+    cpp_file: str = None
+    comment: tuple = None
+
+
+@dataclass(slots=True)
+class Cast:
+    """`lua["Entity"]["as_movable"] = &Entity::as<Movable>`, `type` is None when the binding isn't Entity::as"""
+
+    name: str
+    type: str = None
+
+
+@dataclass(slots=True)
+class EnumDef:
+    name: str
+    members: tuple  # (name, value) pairs
+
+
+@dataclass(slots=True)
+class Alias:
+    name: str
+    type: str
+
+
+@dataclass(slots=True)
+class Model:
+    """Everything parsed from the header and api files, before linking"""
+
+    rpc: object  # SymbolTable of Rpc
+    classes: object  # SymbolTable of CppClass
+    events: list  # [Binding]
+    funcs: object  # SymbolTable of Binding
+    usertypes: list  # [Usertype]
+    known_casts: list  # [Cast]
+    type_comments: list  # [(usertype name, comment)]
+    lualibs: list
+
+
+@dataclass(slots=True)
+class Api:
+    """The linked API, everything the declarations are written from (and what --dump-model saves)"""
+
+    rpc: list  # [Rpc]
+    funcs: list  # [Binding], the ones bound to rpc functions are declared with their signature
+    events: list  # [Binding]
+    types: list  # [Usertype], linked
+    known_casts: list  # [Cast]
+    enums: list  # [EnumDef]
+    aliases: list  # [Alias]
+    lualibs: list
@@ -0,0 +1,327 @@
+"""Saves the linked Api (model.Api) and loads it back, so other tools get the API without parsing the sources
+
+There are two encodings of the same data, and the file extension picks one:
+
+- JSON (`.json`): `{"format": "spel2-api-model", "version": 2, "schema": {...}, "rpc": [...], ...}`. Each record
+  is an array of its field values in the order given by the schema. Nested records, like the fields of a
+  usertype, are arrays too.
+- binary (any other extension): each string is stored once in a string table and referenced by its number.
+  The data is made of tagged values, like msgpack, with numbers and lengths as varints. After it comes an
+  index of the record names with fixed size entries, sorted so that ModelIndex can look a name up by binary
+  search on a memory map without decoding anything else.
+
+The version goes up whenever a record gains, loses or reorders fields.
+"""
+import dataclasses
+import json
+import mmap
+import os
+import struct
+
+from .model import Alias, Api, Binding, Cast, EnumDef, Field, Rpc, Usertype, shared_comment
+
+FORMAT = "spel2-api-model"
+VERSION = 2
+MAGIC = b"SPEL2API"
+
+SECTIONS = [field.name for field in dataclasses.fields(Api)]
+SECTION_RECORDS = {
+    "rpc": Rpc,
+    "funcs": Binding,
+    "events": Binding,
+    "types": Usertype,
+    "known_casts": Cast,
+    "enums": EnumDef,
+    "aliases": Alias,
+}  # the other sections are lists of strings
+RECORDS = [Rpc, Binding, Usertype, Field, EnumDef, Alias, Cast]  # position is the record kind in the binary encoding
+FIELDS = {cls: [field.name for field in dataclasses.fields(cls)] for cls in RECORDS}
+KINDS = {cls: kind for kind, cls in enumerate(RECORDS)}
+
+HEADER = struct.Struct("<8sIIII")  # magic, version, strings offset, body offset, index offset
+U32 = struct.Struct("<I")
+INDEX_ENTRY = struct.Struct("<III")  # name string, section, offset of the record
+
+TAG_NONE = 0
+TAG_STRING = 1  # + string number
+TAG_LIST = 2  # + length, items
+TAG_TUPLE = 3  # + length, items
+TAG_RECORD = 4  # + kind, field values
+
+
+class ModelFormatError(ValueError):
+    pass
+
+
+def dump_model(api, path):
+    """JSON when `path` ends with .json, else the binary encoding"""
+    data = encode_json(api).encode("utf-8") if path.endswith(".json") else encode_binary(api)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as fp:
+        fp.write(data)
+    # same as the declarations, a reader never sees a half-written model
+    os.replace(tmp_path, path)
+
+
+def load_model(path):
+    with open(path, "rb") as fp:
+        data = fp.read()
+    if data.startswith(MAGIC):
+        return decode_binary(data)
+    return decode_json(data)
+
+
+# JSON
+
+
+def to_json(value):
+    if dataclasses.is_dataclass(value):
+        return [to_json(getattr(value, name)) for name in FIELDS[type(value)]]
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    return value
+
+
+def encode_json(api):
+    document = {
+        "format": FORMAT,
+        "version": VERSION,
+        "schema": {cls.__name__: FIELDS[cls] for cls in RECORDS},
+    }
+    for section in SECTIONS:
+        document[section] = to_json(getattr(api, section))
+    return json.dumps(document, separators=(",", ":"))
+
+
+def from_json(cls, values):
+    """Record of `cls` from its array of field values, with tuples and nested records restored"""
+    record = cls(*values)
+    if getattr(record, "comment", None) is not None:
+        record.comment = shared_comment(record.comment)
+    if cls is Usertype:
+        record.fields = [from_json(Field, field) for field in record.fields]
+    elif cls is EnumDef:
+        record.members = tuple(tuple(member) for member in record.members)
+    return record
+
+
+def decode_json(data):
+    document = json.loads(data)
+    if document.get("format") != FORMAT:
+        raise ModelFormatError("not a model file")
+    if document.get("version") != VERSION:
+        raise ModelFormatError(f"model version {document.get('version')}, expected {VERSION}")
+    sections = []
+    for section in SECTIONS:
+        cls = SECTION_RECORDS.get(section)
+        values = document[section]
+        sections.append([from_json(cls, record) for record in values] if cls else values)
+    return Api(*sections)
+
+
+# binary
+
+
+class BinaryWriter:
+    def __init__(self):
+        self.body = bytearray()
+        self.strings = {}
+        self.index = []  # (name, section, offset in the body)
+
+    def string(self, text):
+        number = self.strings.get(text)
+        if number is None:
+            number = self.strings[text] = len(self.strings)
+        return number
+
+    def varint(self, number):
+        while number >= 0x80:
+            self.body.append(number & 0x7F | 0x80)
+            number >>= 7
+        self.body.append(number)
+
+    def value(self, value):
+        body = self.body
+        if value is None:
+            body.append(TAG_NONE)
+        elif isinstance(value, str):
+            body.append(TAG_STRING)
+            self.varint(self.string(value))
+        elif isinstance(value, (list, tuple)):
+            body.append(TAG_LIST if isinstance(value, list) else TAG_TUPLE)
+            self.varint(len(value))
+            for item in value:
+                self.value(item)
+        elif dataclasses.is_dataclass(value):
+            body.append(TAG_RECORD)
+            body.append(KINDS[type(value)])
+            for name in FIELDS[type(value)]:
+                self.value(getattr(value, name))
+        else:
+            raise TypeError(f"can't encode {type(value).__name__}")
+
+    def section(self, number, values):
+        self.body.append(TAG_LIST)
+        self.varint(len(values))
+        for value in values:
+            if dataclasses.is_dataclass(value):
+                self.index.append((value.name, number, len(self.body)))
+            self.value(value)
+
+
+def encode_binary(api):
+    writer = BinaryWriter()
+    for number, section in enumerate(SECTIONS):
+        writer.section(number, getattr(api, section))
+
+    encoded = [text.encode("utf-8") for text in writer.strings]
+    offsets = [0]
+    for text in encoded:
+        offsets.append(offsets[-1] + len(text))
+    # the offsets table holds len(encoded) + 1 entries, the last one is the end of the string data
+    strings = U32.pack(len(encoded)) + struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(encoded)
+
+    index = sorted(writer.index, key=lambda entry: encoded[writer.strings[entry[0]]])
+    index_data = U32.pack(len(index)) + b"".join(
+        INDEX_ENTRY.pack(writer.strings[name], section, offset) for name, section, offset in index
+    )
+
+    strings_offset = HEADER.size
+    body_offset = strings_offset + len(strings)
+    index_offset = body_offset + len(writer.body)
+    header = HEADER.pack(MAGIC, VERSION, strings_offset, body_offset, index_offset)
+    return b"".join((header, strings, bytes(writer.body), index_data))
+
+
+class BinaryReader:
+    """Decodes values of the binary encoding from any buffer (bytes or a memory map), strings are decoded once"""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        magic, version, strings_offset, self.body_offset, self.index_offset = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ModelFormatError("not a model file")
+        if version != VERSION:
+            raise ModelFormatError(f"model version {version}, expected {VERSION}")
+        (self.string_count,) = U32.unpack_from(buffer, strings_offset)
+        self.string_offsets = strings_offset + U32.size
+        self.string_data = self.string_offsets + (self.string_count + 1) * U32.size
+        self.strings = [None] * self.string_count
+
+    def load_strings(self):
+        """Decodes the whole string table at once, for readers that go through all the records"""
+        offsets = struct.unpack_from(f"<{self.string_count + 1}I", self.buffer, self.string_offsets)
+        data = self.buffer[self.string_data : self.string_data + offsets[-1]]
+        self.strings = [data[start:end].decode("utf-8") for start, end in zip(offsets, offsets[1:])]
+
+    def string_bytes(self, number):
+        start, end = struct.unpack_from("<II", self.buffer, self.string_offsets + number * U32.size)
+        return self.buffer[self.string_data + start : self.string_data + end]
+
+    def string(self, number):
+        text = self.strings[number]
+        if text is None:
+            text = self.strings[number] = self.string_bytes(number).decode("utf-8")
+        return text
+
+    def varint(self, offset):
+        """Returns the varint at `offset` and the offset right after it"""
+        byte = self.buffer[offset]
+        if byte < 0x80:
+            return byte, offset + 1
+        number = 0
+        shift = 0
+        while byte >= 0x80:
+            number |= (byte & 0x7F) << shift
+            shift += 7
+            offset += 1
+            byte = self.buffer[offset]
+        return number | byte << shift, offset + 1
+
+    def value(self, offset):
+        """Returns the value at `offset` and the offset right after it"""
+        buffer = self.buffer
+        tag = buffer[offset]
+        offset += 1
+        if tag == TAG_NONE:
+            return None, offset
+        if tag == TAG_STRING:
+            number = buffer[offset]
+            if number >= 0x80:
+                number, offset = self.varint(offset)
+                return self.string(number), offset
+            return self.strings[number] or self.string(number), offset + 1
+        if tag == TAG_LIST or tag == TAG_TUPLE:
+            length, offset = self.varint(offset)
+            items = []
+            for _ in range(length):
+                item, offset = self.value(offset)
+                items.append(item)
+            return (items if tag == TAG_LIST else tuple(items)), offset
+        if tag == TAG_RECORD:
+            cls = RECORDS[buffer[offset]]
+            offset += 1
+            values = []
+            for _ in FIELDS[cls]:
+                value, offset = self.value(offset)
+                values.append(value)
+            record = cls(*values)
+            if getattr(record, "comment", None) is not None:
+                record.comment = shared_comment(record.comment)
+            return record, offset
+        raise ModelFormatError(f"unknown tag {tag} at {offset - 1}")
+
+
+def decode_binary(data):
+    reader = BinaryReader(data)
+    reader.load_strings()
+    offset = reader.body_offset
+    sections = []
+    for _ in SECTIONS:
+        section, offset = reader.value(offset)
+        sections.append(section)
+    return Api(*sections)
+
+
+class ModelIndex:
+    """Looks records up by name in a binary model file through a memory map, only the records found are decoded"""
+
+    def __init__(self, path):
+        with open(path, "rb") as fp:
+            self.map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        self.reader = BinaryReader(self.map)
+        (self.count,) = U32.unpack_from(self.map, self.reader.index_offset)
+        self.entries = self.reader.index_offset + U32.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def close(self):
+        self.reader = None
+        self.map.close()
+
+    def entry(self, i):
+        return INDEX_ENTRY.unpack_from(self.map, self.entries + i * INDEX_ENTRY.size)
+
+    def name_bytes(self, i):
+        return self.reader.string_bytes(self.entry(i)[0])
+
+    def find(self, name):
+        """(section, record) of every record called `name`, e.g. [("types", Usertype(...))]"""
+        key = name.encode("utf-8")
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.name_bytes(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        found = []
+        while low < self.count and self.name_bytes(low) == key:
+            _, section, offset = self.entry(low)
+            found.append((SECTIONS[section], self.reader.value(self.reader.body_offset + offset)[0]))
+            low += 1
+        return found
@@ -0,0 +1,110 @@
+import os
+import pickle
+from contextlib import contextmanager
+
+from .source_file import SourceFile
+
+CACHE_VERSION = 4
+
+
+def parse_serialized(parser, file, source=None, root=""):
+    """Runs a parser and returns its pickled records, also used as the worker function of a process pool
+
+    A worker gets no `source` and maps the file (in `root`) itself, the parent only sends it the path. Returns the
+    content hash of what was parsed along with the records, the file could have changed since the parent hashed it.
+    """
+    if source is None:
+        with SourceFile(os.path.join(root, file)) as source:
+            return source.content_hash(), pickle.dumps(parser(file, source), pickle.HIGHEST_PROTOCOL)
+    return source.content_hash(), pickle.dumps(parser(file, source), pickle.HIGHEST_PROTOCOL)
+
+
+class ParseCache:
+    """On-disk, content-addressed store of the records extracted from each source file
+
+    Entries are keyed by parser, file path in its checkout and content hash, so a file is parsed once per distinct
+    content: the same file in several checkouts (see generate_ts.py --versions), or a file changed and changed
+    back, reuses its entry. `salt` should change whenever the parsers do (e.g. a hash of the generator source),
+    a cache saved with a different salt is discarded. Entries that the current generation didn't use are evicted
+    on `save`, the older contents of an edited file included, except in a `batch` of generations.
+    """
+
+    def __init__(self, path, salt=b""):
+        self.path = path
+        self.salt = salt
+        self.entries = {}
+        self.used = set()
+        self.batched = False
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            try:
+                with open(path, "rb") as fp:
+                    version, salt, entries = pickle.load(fp)
+                if version == CACHE_VERSION and salt == self.salt:
+                    self.entries = entries
+            except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+                pass  # corrupted or from an old version, start from scratch
+
+    def start_generation(self):
+        """Forgets the entries the previous generations used, unless they are part of the same batch"""
+        self.hits = self.misses = 0
+        if not self.batched:
+            self.used = set()
+
+    @contextmanager
+    def batch(self):
+        """The generations in the block (the checkouts of --versions) keep the entries any of them used"""
+        self.used = set()
+        self.batched = True
+        try:
+            yield self
+        finally:
+            self.batched = False
+
+    def parse(self, parser, file, root=""):
+        """Returns `parser(file, source)`, parsing the file again only if it changed"""
+        return self.parse_many([(parser, file)], root=root)[0]
+
+    def parse_many(self, jobs, executor=None, root=""):
+        """Parses every `(parser, file)` pair that isn't cached, in parallel if an executor is given
+
+        The files are relative to `root`, the parsers get them as they are in `jobs`. The results are returned
+        in the same order as `jobs`, no matter the order the parsers finish in. Files are memory-mapped (see
+        source_file.py), a cached file is only hashed.
+        """
+        blobs = []
+        parsed = []
+        for parser, file in jobs:
+            with SourceFile(os.path.join(root, file)) as source:
+                key = (parser.__name__, file, source.content_hash())
+                self.used.add(key)
+                blob = self.entries.get(key)
+                if blob is not None:
+                    self.hits += 1
+                    blobs.append(blob)
+                    continue
+                self.misses += 1
+                if executor:
+                    blobs.append(executor.submit(parse_serialized, parser, file, None, root))
+                else:
+                    blobs.append(parse_serialized(parser, file, source))
+            parsed.append((len(blobs) - 1, key))
+
+        for i, (name, file, _) in parsed:
+            if not isinstance(blobs[i], tuple):
+                blobs[i] = blobs[i].result()
+            key = (name, file, blobs[i][0])
+            self.used.add(key)
+            blobs[i] = self.entries[key] = blobs[i][1]
+        # records are always rebuilt from the serialized copy so later changes to them can't leak into the cache
+        return [pickle.loads(blob) for blob in blobs]
+
+    def save(self):
+        self.entries = {key: entry for key, entry in self.entries.items() if key in self.used}
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as fp:
+            pickle.dump((CACHE_VERSION, self.salt, self.entries), fp, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,102 @@
+import re
+from functools import lru_cache
+
+# All the regexes of the generator, compiled once at import.
+# The per-line loops check for a cheap substring first (noted next to each pattern) and only run the regex if it's there.
+
+# Comments and declarations, header files
+reDocComment = re.compile(r"/// ?(.*)$")  # "///"
+reFunction = re.compile(r"\s*(.*)\s+([^\(]*)\(([^\)]*)")  # "("
+
+# Line based class scan, classes are parsed by cpp_parser now but the benchmarks still compare against it
+reClass = re.compile(r"(struct|class)\s+(\S+)")
+reSkipMemberLine = re.compile(r"^\s*(?::|\/\/)")  # constructor parameter initialization or comment
+reMemberFunction = re.compile(r"\s*(virtual\s)?(.*)\s+([^\(]*)\(([^\)]*)")  # "("
+reMemberVar = re.compile(r"\s*([^\;\{]*)\s+([^\;^\{}]*)\s*(\{[^\}]*\})?\;")  # ";"
+reMultiVarNames = re.compile(r"(?: *\w*,)*$")
+reMultiVarName = re.compile(r"(\w*),")
+
+# Bindings, api files
+reCast = re.compile(r'lua\["Entity"\]\["(as_.*)"\](?:\s*=\s*&Entity::as<([\w:]+)>)?')  # 'lua["Entity"]["as_'
+reEntTypeCategory = re.compile(r"^[A-Z]+_")  # ENT_TYPE member prefix, e.g. MONS_ of MONS_SNAKE
+reEvent = re.compile(r'lua\[[\'"]([^\'"]*)[\'"]\];')  # "lua["
+reLuaFunction = re.compile(r'lua\[[\'"]([^\'"]*)[\'"]\]\s+=\s+(.*?)(?:;|$)')  # "lua["
+reUsertypeName = re.compile(r"new_usertype\<(.*?)\>")  # "new_usertype<"
+reUsertype = re.compile(r'new_usertype\<([^\>]*?)\>\s*\(\s*"([^"]*)",(.*?)\);')  # on the statement without spaces
+
+# Byte patterns, run over the mapped source files (see source_file.py)
+reBlankLine = re.compile(rb"\n\**\r?\n")  # an empty line (or only `*`) after a line end
+reUsertypeStart = re.compile(rb"new_usertype[ \r\n]*<")
+reStatementEnd = re.compile(rb"\)[ \r\n]*;")
+reOpenLibraries = re.compile(rb"open_libraries\s*\(([^\)]*)\)")
+reBases = re.compile(r"sol::bases<([^\]]*)>")
+reLambdaReturnType = re.compile(r"->(\w+){")
+reAlias = re.compile(r"using\s*(\S*)\s*=\s*(\S*)")
+reEntityFamily = re.compile(r"(entities_\w+?)_lua\.cpp$")  # api file of a group of entity usertypes
+
+# Enum tables, spel2.lua
+reLuaTable = re.compile(r"([A-Z_]+)\s*=\s*{$")  # top level table of an upper case name, "{"
+reLuaField = re.compile(r"(\w+)\s*=\s*(.*?),?$")  # "="
+
+# Declarations output
+reInnerSpaces = re.compile(r"(?<=\S)(?: {2,}|\t+)(?=\S)")  # runs of spaces between words, canonical output only
+reSectionTitle = re.compile(r"^//## (.*)$", re.M)
+reLuaSectionTitle = re.compile(r"^--## (.*)$", re.M)  # LuaLS annotations
+reMarkdownSectionTitle = re.compile(r"^## (.*)$", re.M)
+reGenericType = re.compile(r"^(\w+)<(.*)>$")  # TypeScript type with type arguments, e.g. LuaTable<number, string>
+reParamName = re.compile(r"(\w+)\??$")  # name of a TypeScript parameter, without what a mistranslated type left before it
+reTsMember = re.compile(r"^(static )?(\w+)\((.*)\): (.*)$")  # method of a class as declared, see signatures.member_text
+reTsMemberName = re.compile(r"^(?:static )?(\w+)")  # name of any member as declared
+reIdentifier = re.compile(r"\b[A-Za-z_]\w*")  # of a script or of a declared type, keywords included
+
+# Type translation
+#old reArr: r"(Array<(?:(?:\w*<\w*, \d>)|(?:\w+))), [^>]*?(>+)"
+reArr = re.compile(r"\bArray(<(?:(?:\w+<.+>)|(?:\w+)), .+)")
+reTuple = re.compile(r"tuple<(.*?)>")
+reOptional = re.compile(r"optional<(.+?)>")
+reBool = re.compile(r"bool\b")
+reMap = re.compile(r"\bmap<")
+reNumber = re.compile(r"\b(?:float|int)\b")
+
+# Signatures
+reGetParam = re.compile(r"(?!const)(\b[^ ]+) *([^,]+),?")#r"([^ ]+) *([^,]+),?")
+reRemoveDefault = re.compile(r" = .*")
+reHandleConst = re.compile(r"const (\w+) (\w+)")
+reConstructorFix = re.compile(r"const (\w+)(?: \w+)?")
+reLambdaSignature = re.compile(r"\(([^\{]*)\)\s*->\s*([^\{]*)")
+reLambdaParams = re.compile(r"\(([^\{]*)\)")
+reStatic = re.compile(r"static +(\w+)")
+reMemberVariable = re.compile(r"^(\w+): (.*)$")  # signature of a usertype variable, "name: type"
+
+
+# Patterns built from a class or variable name, cached since the same names come up again and again
+@lru_cache(maxsize=None)
+def reMoveCtor(name):
+    return re.compile(fr"\s*{name}\s*&&[^,]*")
+
+
+@lru_cache(maxsize=None)
+def reProperty(class_name):
+    return re.compile(fr"sol::property\(\[\]\({class_name}&(\w+)\)")
+
+
+@lru_cache(maxsize=None)
+def rePropertyReturn(var_name):
+    return re.compile(fr"return[^;]*{var_name}\.([\w.]+)")
+
+
+# C++ tokenizer, whitespace, comments and preprocessor lines before a token are skipped as part of its match.
+# The token is the group that matched, `kind` is the name of that group.
+reCppToken = re.compile(
+    r"""
+    (?:\s+|//(?!/)[^\n]*|/\*[\s\S]*?(?:\*/|\Z)|\#(?:\\\n|[^\n])*)*
+    (?:
+        (?P<doc>///[^\n]*)
+        | (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+        | (?P<name>[A-Za-z_]\w*)
+        | (?P<number>\.?\d[\w.']*)
+        | (?P<punct>::|->|&&|\.\.\.|\S)
+    )
+    """,
+    re.VERBOSE,
+)
@@ -0,0 +1,145 @@
+"""Signatures of the linked API in the TypeScript notation of the declarations, shared by the output backends
+
+The C++ parameters and types of the sources are translated once here (see type_translation.py), the other
+backends (backends.py) derive their own notation from these texts.
+"""
+from .patterns import (
+    reConstructorFix,
+    reFunction,
+    reGetParam,
+    reHandleConst,
+    reLambdaParams,
+    reLambdaSignature,
+    reRemoveDefault,
+    reStatic,
+)
+from .instrumentation import stats
+from .symbol_table import SymbolTable
+from .type_translation import replace_all
+
+# globals bound like functions, they are declared as variables
+not_functions = [
+    "players",
+    "state",
+    "game_manager",
+    "online",
+    "savegame",
+    "options",
+    "meta",
+    "prng",
+]
+
+# the ones declared as constants, with their type, `meta` is declared with the Meta interface by each backend
+global_variables = [
+    ("state", "StateMemory"),
+    ("game_manager", "GameManager"),
+    ("online", "Online"),
+    ("players", "Array<Player>"),
+    ("savegame", "SaveData"),
+    ("options", "any"),
+    ("prng", "PRNG"),
+]
+
+
+def cpp_params_to_typescript(params_text):
+    return_text = ""
+    params_iterator = reGetParam.finditer(params_text)
+    for param_match in params_iterator:
+        p_type = param_match.group(1)
+        p_name = param_match.group(2)
+        p_name = reRemoveDefault.sub("", p_name)
+        if p_type == "sol::variadic_args":
+            return_text += f"...{p_name}: any[], "
+        else:
+            if m := reHandleConst.match(p_name):
+                p_type = m.group(1)
+                p_name = m.group(2)
+            return_text += f"{p_name}: {p_type}, "
+    return return_text[0:-2]
+
+def fix_constructor_param(params_text):
+    return reConstructorFix.sub(r"\1: \1", params_text)
+
+
+def declared_functions(api):
+    """(name, param, ret, comment) of each declared function overload, in the order of the bindings
+
+    The deprecated functions, the ones marked NoDoc, the events and the globals of `not_functions` are left out.
+    A function bound to rpc functions gets one overload per rpc, a lambda gets the signature of the lambda.
+    """
+    rpc = SymbolTable(api.rpc)
+    for lf in api.funcs:
+        if lf.comment and lf.comment[0] == "Deprecated":
+            continue
+        if len(rpc.get_all(lf.cpp)):
+            if lf.comment and lf.comment[0] == "NoDoc":
+                continue
+            for af in rpc.get_all(lf.cpp):
+                ret = replace_all(af.returns) or "void"
+                param = cpp_params_to_typescript(af.param)
+                param = replace_all(param)
+                yield lf.name, param, ret, lf.comment
+        elif not (lf.name.startswith("on_") or lf.name in not_functions):
+            if lf.comment and lf.comment[0] == "NoDoc":
+                continue
+            m = reLambdaSignature.search(lf.cpp)
+            m2 = reLambdaParams.search(lf.cpp)
+            ret = "void"
+            param = ""
+            if m:
+                ret = replace_all(m.group(2)).strip() or "void"
+            if m or m2:
+                param = (m or m2).group(1)
+                param = cpp_params_to_typescript(param)
+                param = replace_all(param).strip()
+            yield lf.name, param, ret, lf.comment
+
+
+def member_text(var, count=True):
+    """Declaration of a usertype member, `count` adds the members declared as any to the counters of `stats`"""
+    if var.signature is not None:
+        signature = var.signature
+        # the variables ("name: type") would only make the pattern backtrack
+        m = "(" in signature and reFunction.search(signature)
+        if m:
+            ret = replace_all(m.group(1)) or "void"
+            name = m.group(2)
+            param = replace_all(m.group(3))
+            if ret.startswith("static"):
+                ret = reStatic.sub(r"\1", ret)
+                name = "static " + name
+            signature = name + "(" + param + "): " + ret
+        return signature.strip()
+    name = var.name
+    type = var.type
+    if "->float" in type:
+        return f"{name}: number"
+    if count:
+        stats.count("any_fallbacks")
+    return f"{name}: any // {type}"
+
+
+def split_top_level(text, separator):
+    """Parts of `text` between the `separator`s that aren't inside <>, (), [] or {}, e.g. of a parameter list"""
+    parts = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(text):
+        if char in "<([{":
+            depth += 1
+        elif char in ">)]}" and not (char == ">" and text[i - 1] == "="):
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i].strip())
+            start = i + 1
+    parts.append(text[start:].strip())
+    return [part for part in parts if part]
+
+
+def split_params(param):
+    """(name, type) of each parameter of a TypeScript parameter list, `...name` for the variadic one"""
+    params = []
+    for part in split_top_level(param, ","):
+        name, _, type = part.partition(":")
+        params.append((name.strip(), type.strip() or "any"))
+    return params
@@ -0,0 +1,82 @@
+"""Read-only, memory-mapped view of a source file for the parse cache and the parsers
+
+The parse cache hashes the mapped bytes as they are, so a file that didn't change is never decoded nor split
+into lines. The parsers run byte patterns over `buffer` and only decode the lines and statements they keep,
+the C++ parser, which needs the whole text, asks for it with `text()`. Line ends are read like a file opened
+in text mode, a `\\r\\n` counts as a `\\n`.
+"""
+import hashlib
+import mmap
+
+from .patterns import reBlankLine
+
+
+class SourceFile:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as fp:
+            try:
+                self.buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                self.buffer = b""  # an empty file can't be mapped
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+    def content_hash(self):
+        return hashlib.blake2b(self.buffer, digest_size=16).digest()
+
+    @property
+    def line_count(self):
+        # in chunks, an mmap has no count()
+        chunk = 1 << 20
+        return 1 + sum(self.buffer[start : start + chunk].count(b"\n") for start in range(0, len(self.buffer), chunk))
+
+    def lines_with(self, *needles):
+        """(start, end) of each line that contains one of the byte strings `needles`, in order and once per line
+
+        Each needle is found with the fast substring search of the buffer, ahead of the lines in between.
+        """
+        buffer = self.buffer
+        size = len(buffer)
+        found = [buffer.find(needle) % (size + 1) for needle in needles]  # not found (-1) is the end
+        while True:
+            first = min(found)
+            if first >= size:
+                return
+            start = buffer.rfind(b"\n", 0, first) + 1
+            end = buffer.find(b"\n", first)
+            if end < 0:
+                end = size
+            yield start, end
+            for i, position in enumerate(found):
+                if position < end:
+                    found[i] = buffer.find(needles[i], end) % (size + 1)
+
+    def has_blank_line(self, start, end):
+        """Whether a line between the offsets `start` and `end` is empty (or only `*`), without copying them"""
+        buffer = self.buffer
+        start = max(start - 1, 0)  # the line end before `start` too
+        if buffer.find(b"\n\n", start, end) >= 0 or buffer.find(b"\n\r\n", start, end) >= 0:
+            return True
+        return buffer.find(b"\n*", start, end) >= 0 and reBlankLine.search(buffer, start, end) is not None
+
+    def text(self):
+        """The whole file decoded"""
+        with memoryview(self.buffer) as view:
+            text = str(view, "utf-8")
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
+
+def decode_line(line):
+    """Text of a line matched in a buffer, without the `\\r` of a `\\r\\n` line end"""
+    return line.decode("utf-8").removesuffix("\r")
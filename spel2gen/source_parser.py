@@ -0,0 +1,235 @@
+from .patterns import (
+    reCast,
+    reDocComment,
+    reEvent,
+    reFunction,
+    reLuaField,
+    reLuaFunction,
+    reLuaTable,
+    reOpenLibraries,
+    reStatementEnd,
+    reUsertype,
+    reUsertypeName,
+    reUsertypeStart,
+)
+from . import cpp_parser
+from .instrumentation import stats
+from .model import Binding, Cast, CppClass, EnumDef, Member, Rpc, Usertype, intern, shared_comment
+from .source_file import decode_line
+from .type_translation import replace_all
+
+
+def translate_cpp(text):
+    return replace_all(text).replace("*", "")
+
+
+def doc_comments(lines):
+    """Text of the `///` comments on each of the source lines"""
+    comment = []
+    for line in lines:
+        m = reDocComment.search(line)
+        if m:
+            comment.append(translate_cpp(m[1]))
+    return shared_comment(comment)
+
+
+def scan_header_file(file, source):
+    """Extracts the free functions (rpc) and the classes declared in a header file (a SourceFile)
+
+    Free functions are still matched line by line, classes come from the declarations parsed by cpp_parser.
+    Both go through the decoded text, cpp_parser needs it and most header lines have something to look at.
+    """
+    data = source.text()
+    lines = data.split("\n")
+    stats.count("lines_scanned", len(lines))
+    file_rpc = []
+    comment = []
+    skip = 0
+    with stats.phase("header_rpc_scan"):
+        for line in lines:
+            line = line.replace("*", "")
+            skip += line.count("{") - line.count("}")
+            c = "///" in line and reDocComment.search(line)
+            if c:
+                comment.append(c.group(1))
+            m = "(" in line and reFunction.search(line)
+            if m:
+                if skip == 0 or file.endswith("script.hpp"):
+                    file_rpc.append(Rpc(intern(m.group(2)), m.group(1), m.group(3), comment))
+            else:
+                comment = []
+    # consecutive functions share the comment list, it only becomes immutable once it can't grow anymore
+    for rpc in file_rpc:
+        rpc.comment = shared_comment(rpc.comment)
+
+    if file.endswith("script.hpp"):
+        return {"rpc": file_rpc, "classes": []}
+    with stats.phase("header_class_extraction"):
+        classes = header_classes(data)
+    return {"rpc": file_rpc, "classes": classes}
+
+
+def header_classes(data):
+    """Classes declared in a header, with their member functions by name and their member variables"""
+    file_classes = []
+    for cpp_class in cpp_parser.parse(data).classes:
+        member_funs = {}
+        member_vars = []
+        for member in cpp_class.members:
+            if isinstance(member, cpp_parser.FunctionDecl):
+                if member.is_move_ctor:
+                    continue  # move ctor is useless for Lua
+                name = intern(member.name)
+                member_funs.setdefault(name, []).append(
+                    Member(
+                        name,
+                        translate_cpp(member.return_type),
+                        doc_comments(member.comment),
+                        translate_cpp(member.params),
+                    )
+                )
+            else:
+                member_vars.append(
+                    Member(intern(member.name), translate_cpp(member.type), doc_comments(member.comment))
+                )
+        file_classes.append(CppClass(intern(cpp_class.name), member_funs, member_vars))
+    return file_classes
+
+
+# what the lines of an api file scanned have: bindings, usertypes and comments
+API_LINE_MARKS = (b"lua[", b"new_usertype<", b"//", b"/*")
+
+
+def compact(statement):
+    """A multi-line statement of the buffer as a single line without spaces"""
+    return decode_line(statement.translate(None, b" \r\n"))
+
+
+def scan_api_file(file, source):
+    """Runs every line based extractor over an api file (a SourceFile) in a single pass
+
+    Only the lines an extractor can use are decoded, the lines in between can only end the comment of an event,
+    or the comment of a usertype when one of them is empty.
+    """
+    file_events = []
+    file_funcs = []
+    file_casts = []
+    file_type_comments = []
+    events_comment = []
+    funcs_comment = []
+    types_comment = []
+    # events, functions, casts and type comments
+    buffer = source.buffer
+    next_line = 0  # where the line after the previous one scanned starts
+    with stats.phase("api_line_scan"):
+        stats.count("lines_scanned", source.line_count)
+        for start, end in source.lines_with(*API_LINE_MARKS):
+            if start != next_line:
+                events_comment = []
+                if source.has_blank_line(next_line, start):
+                    types_comment = []
+            next_line = end + 1
+            raw_line = decode_line(buffer[start:end])
+            if 'lua["Entity"]["as_' in raw_line:
+                m = reCast.search(raw_line)
+                if m != None:
+                    file_casts.append(Cast(intern(m.group(1)), m.group(2)))
+
+            line = raw_line.replace("*", "")
+            c = "///" in line and reDocComment.search(line)
+            has_lua = "lua[" in line
+
+            m = has_lua and reEvent.search(line)
+            if m:
+                file_events.append(Binding(intern(m.group(1)), "", events_comment))
+            else:
+                events_comment = []
+            if c:
+                events_comment.append(c.group(1))
+            else:
+                events_comment = []
+
+            m = has_lua and reLuaFunction.search(line)
+            if m and not m.group(1).startswith("__"):
+                file_funcs.append(Binding(intern(m.group(1)), m.group(2), shared_comment(funcs_comment)))
+                funcs_comment = []
+            if c:
+                funcs_comment.append(c.group(1))
+
+            m = "new_usertype<" in line and reUsertypeName.findall(line)
+            if m:
+                file_type_comments.append((intern(m[0]), shared_comment(types_comment)))
+                types_comment = []
+            if line == "":
+                types_comment = []
+            if c:
+                types_comment.append(c.group(1))
+    for event in file_events:
+        event.comment = shared_comment(event.comment)
+
+    # the multi-line constructs are matched on their statement joined into a single line without spaces
+    with stats.phase("api_usertype_scan"):
+        file_usertypes = []
+        end = 0
+        for start_match in reUsertypeStart.finditer(buffer):
+            if start_match.start() < end:
+                continue  # in the previous usertype
+            end_match = reStatementEnd.search(buffer, start_match.end())
+            statement_end = end_match.end() if end_match else len(buffer)
+            m = reUsertype.match(compact(buffer[start_match.start() : statement_end]))
+            if m:
+                cpp_type, name, attrs = m.groups()
+                file_usertypes.append(Usertype(intern(name), intern(cpp_type), attrs, file))
+                end = statement_end
+        file_lualibs = []
+        m = reOpenLibraries.search(buffer)
+        if m:
+            libs = compact(m.group(1)).split(",")
+            for lib in libs:
+                file_lualibs.append(lib.replace("sol::lib::", ""))
+
+    return {
+        "events": file_events,
+        "funcs": file_funcs,
+        "usertypes": file_usertypes,
+        "casts": file_casts,
+        "type_comments": file_type_comments,
+        "lualibs": file_lualibs,
+    }
+
+
+def scan_enum_tables(lines):
+    """Yields the enum tables of spel2.lua as EnumDefs, reading it line by line
+
+    An enum is a top level table with an upper case name, like `ENT_TYPE = {`. Tables whose first field is a
+    metamethod (`__index`...) aren't enums, `__` fields and fields holding a nested table are left out of the
+    members. Lua comments are dropped and values are kept as written (numbers, negative or hex).
+    """
+    table = None
+    depth = 0
+    for line in lines:
+        if "--" in line:
+            line = line[: line.find("--")]
+        line = line.strip()
+        if table is None:
+            m = reLuaTable.match(line)
+            if m:
+                table = {"name": m[1], "members": []}
+                fields = 0
+                depth = 1
+            continue
+
+        if depth == 1 and "=" in line:
+            m = reLuaField.match(line)
+            if m:
+                fields += 1
+                if m[1].startswith("__"):
+                    if fields == 1:
+                        table["name"] = None  # metatable
+                elif not m[2].startswith("{"):
+                    table["members"].append((m[1], m[2]))
+        depth += line.count("{") - line.count("}")
+        if depth <= 0:
+            if table["name"] and table["members"]:
+                yield EnumDef(table["name"], tuple(table["members"]))
+            table = None
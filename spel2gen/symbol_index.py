@@ -0,0 +1,341 @@
+"""Index of the declared symbols for editor tooling, looked up by name prefix through a memory map
+
+Every function, global variable, class, class member, enum, enum member and alias gets one entry per overload.
+Each entry has its kind, the class or enum it belongs to, its signature as declared and the first line of its doc.
+Members are keyed `Class.member` and enum members `ENT_TYPE.MONS_SNAKE`. A member is stored once, under the class
+that declares it, and the entry of each class lists its bases resolved through sol::bases, nearest first. The
+prefix `Mount.` finds the members of the bases too, keyed `Mount.member`, minus the ones Mount hides.
+
+The file holds the keys sorted as UTF-8 bytes, one per line, after a table of their offsets. Next comes an array
+of fixed size entries in the same order, then the string table the entries refer to, laid out like the keys.
+The strings are numbered in the order of the keys that first use them. A prefix is two binary searches over the
+keys, then the keys of the range and most of its strings are each decoded in one block. Nothing else is read:
+opening the index maps the file and reads its header. The entries found are kept, finding them again is a copy.
+
+The generator modules are only imported to write an index, a tool that looks symbols up loads nothing else.
+"""
+import mmap
+import os
+import struct
+from functools import partial
+from operator import itemgetter
+from typing import NamedTuple
+
+from .backends import Backend
+
+MAGIC = b"SPEL2SYM"
+VERSION = 1
+
+HEADER = struct.Struct("<8sIIIII")  # magic, version, entry count, keys offset, entries offset, strings offset
+U32 = struct.Struct("<I")
+ENTRY = struct.Struct("<IIIII")  # kind, container string, signature string, doc string, bases string of a class
+
+KINDS = ["function", "variable", "class", "field", "method", "enum", "enum member", "alias"]
+CLASS = KINDS.index("class")
+
+
+class SymbolIndexError(ValueError):
+    pass
+
+
+class Symbol(NamedTuple):
+    """Entry of the index, a tuple rather than a record: a completion list builds thousands of them"""
+
+    name: str  # the key, e.g. "spawn", "Mount.tame" or "ENT_TYPE.MONS_SNAKE"
+    kind: str  # one of KINDS
+    container: str  # class or enum that declares it, "" for the globals
+    signature: str
+    doc: str  # first line of the doc comment, "" without one
+
+
+# Symbol._make checks the length in Python, the tuples built here always have the 5 fields
+new_symbol = partial(tuple.__new__, Symbol)
+
+
+def first_line(comment):
+    for line in comment or ():
+        line = line.strip()
+        if line:
+            return line
+    return ""
+
+
+def class_bases(api):
+    """{class: [base]} of the usertypes, the nearest base first, the bases of the bases of sol::bases included"""
+    types = {type.name: type for type in api.types}
+    resolved = {}
+
+    def resolve(name, visiting=()):
+        bases = resolved.get(name)
+        if bases is not None:
+            return bases
+        bases = []
+        type = types[name]
+        # sol::bases lists the farthest base first
+        for base in reversed([base.strip() for base in type.base.split(",")] if type.base else []):
+            if base in types and base != name and base not in visiting:
+                for ancestor in [base] + resolve(base, visiting + (name,)):
+                    if ancestor != name and ancestor not in bases:
+                        bases.append(ancestor)
+        resolved[name] = bases
+        return bases
+
+    return {type.name: resolve(type.name) for type in api.types}
+
+
+def index_symbols(api):
+    """(key, kind, container, signature, doc, bases) of every symbol of the declarations of `api`, in declaration
+    order, the members only under the class that declares them"""
+    from .patterns import reTsMember, reTsMemberName
+    from .signatures import declared_functions, global_variables, member_text
+
+    entries = []
+    for name, param, ret, comment in declared_functions(api):
+        entries.append((name, "function", "", f"{name}({param}): {ret}", first_line(comment), ""))
+    for name, type in global_variables:
+        entries.append((name, "variable", "", f"{name}: {type}", "", ""))
+    bases = class_bases(api)
+    for type in api.types:
+        base = type.base.split(",")[-1].strip() if type.base else ""
+        signature = f"class {type.name}" + (f" extends {base}" if base else "")
+        entries.append((type.name, "class", "", signature, first_line(type.comment), ",".join(bases[type.name])))
+        for var in type.fields:
+            text = member_text(var, count=False)
+            m = reTsMemberName.match(text)
+            if m:
+                kind = "method" if reTsMember.match(text) else "field"
+                entries.append((f"{type.name}.{m[1]}", kind, type.name, text, first_line(var.comment), ""))
+    if "Entity" in bases:
+        for cast in api.known_casts:
+            returns = cast.type if cast.type in bases else "Entity"
+            entries.append((f"Entity.{cast.name}", "method", "Entity", f"{cast.name}(): {returns}", "", ""))
+    for enum in api.enums:
+        entries.append((enum.name, "enum", "", f"enum {enum.name}", "", ""))
+        for member, value in enum.members:
+            entries.append((f"{enum.name}.{member}", "enum member", enum.name, f"{member} = {value}", "", ""))
+    for alias in api.aliases:
+        entries.append((alias.name, "alias", "", f"type {alias.name} = {alias.type.rstrip(';')}", "", ""))
+    return entries
+
+
+def encode_lines(texts):
+    """Offsets of the texts (one more for the end), then the texts, each followed by a newline"""
+    encoded = [text.replace("\n", " ").encode("utf-8") + b"\n" for text in texts]
+    offsets = [0]
+    for text in encoded:
+        offsets.append(offsets[-1] + len(text))
+    return struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(encoded)
+
+
+def encode_index(entries):
+    # stable, the overloads of a key keep the order they are declared in
+    entries = sorted(entries, key=lambda entry: entry[0].encode("utf-8"))
+    strings = {"": 0}
+
+    def string(text):
+        number = strings.get(text)
+        if number is None:
+            number = strings[text] = len(strings)
+        return number
+
+    keys_data = encode_lines(entry[0] for entry in entries)
+    entries_data = b"".join(
+        ENTRY.pack(KINDS.index(kind), string(container), string(signature), string(doc), string(bases))
+        for _, kind, container, signature, doc, bases in entries
+    )
+    strings_data = U32.pack(len(strings)) + encode_lines(strings)
+
+    keys_offset = HEADER.size
+    entries_offset = keys_offset + len(keys_data)
+    strings_offset = entries_offset + len(entries_data)
+    header = HEADER.pack(MAGIC, VERSION, len(entries), keys_offset, entries_offset, strings_offset)
+    return b"".join((header, keys_data, entries_data, strings_data))
+
+
+def write_index(api, path):
+    """Writes the index of `api` to `path`, returns whether the file changed (it isn't touched otherwise)"""
+    data = encode_index(index_symbols(api))
+    try:
+        with open(path, "rb") as fp:
+            if fp.read() == data:
+                return False
+    except OSError:
+        pass
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as fp:
+        fp.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+class SymbolIndex:
+    """Prefix lookups in an index file through a memory map, only the entries found are decoded"""
+
+    def __init__(self, path):
+        with open(path, "rb") as fp:
+            self.map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, keys_offset, self.entries_offset, strings_offset = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise SymbolIndexError("not a symbol index")
+        if version != VERSION:
+            raise SymbolIndexError(f"symbol index version {version}, expected {VERSION}")
+        self.key_offsets = keys_offset
+        self.keys_data = keys_offset + (self.count + 1) * U32.size
+        (string_count,) = U32.unpack_from(self.map, strings_offset)
+        self.string_offsets = strings_offset + U32.size
+        self.string_data = self.string_offsets + (string_count + 1) * U32.size
+        self.strings = [None] * string_count
+        self.strings[0] = ""
+        self.symbols = [None] * self.count
+        self.decoded = bytearray(self.count)  # 1 for the entries in `symbols`
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.map.close()
+
+    def key_bytes(self, i):
+        start, end = struct.unpack_from("<II", self.map, self.key_offsets + i * U32.size)
+        return self.map[self.keys_data + start : self.keys_data + end - 1]
+
+    def lines(self, offsets, data, start, end):
+        """The texts from `start` to `end` of a table of encode_lines, decoded at once"""
+        if start >= end:
+            return []
+        (first,) = U32.unpack_from(self.map, offsets + start * U32.size)
+        (last,) = U32.unpack_from(self.map, offsets + end * U32.size)
+        return self.map[data + first : data + last - 1].decode("utf-8").split("\n")
+
+    def load_strings(self, numbers):
+        """Decodes the strings of `numbers` that weren't yet"""
+        strings = self.strings
+        missing = sorted(number for number in numbers if strings[number] is None)
+        if not missing:
+            return
+        # the strings of neighbouring keys are numbered together, usually they are one block of the table
+        low, high = missing[0], missing[-1] + 1
+        if high - low <= 2 * len(missing) + 64:
+            strings[low:high] = self.lines(self.string_offsets, self.string_data, low, high)
+            return
+        # else each run of close numbers is decoded at once
+        start = 0
+        for i in range(1, len(missing) + 1):
+            if i == len(missing) or missing[i] - missing[i - 1] > 32:
+                low, high = missing[start], missing[i - 1] + 1
+                strings[low:high] = self.lines(self.string_offsets, self.string_data, low, high)
+                start = i
+
+    def entries(self, start, end):
+        """The Symbols from `start` to `end`, decoded the first time they are asked for"""
+        if self.decoded.find(0, start, end) != -1:
+            data = self.map[self.entries_offset + start * ENTRY.size : self.entries_offset + end * ENTRY.size]
+            kinds, containers, signatures, docs, _ = zip(*ENTRY.iter_unpack(data))
+            self.load_strings({*containers, *signatures, *docs})
+            # thousands of entries for ENT_TYPE, built without a Python loop
+            string = self.strings.__getitem__
+            keys = self.lines(self.key_offsets, self.keys_data, start, end)
+            columns = zip(keys, map(KINDS.__getitem__, kinds), map(string, containers), map(string, signatures), map(string, docs))
+            self.symbols[start:end] = map(new_symbol, columns)
+            self.decoded[start:end] = b"\x01" * (end - start)
+        return self.symbols[start:end]
+
+    def bound(self, prefix, upper):
+        """First entry whose key, cut to the length of `prefix`, is >= `prefix` (> with `upper`)"""
+        size = len(prefix)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            key = self.key_bytes(middle)[:size]
+            if key < prefix or upper and key == prefix:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def range(self, prefix):
+        """(start, end) of the entries whose key starts with `prefix`, the inherited members aren't in it"""
+        prefix = prefix.encode("utf-8")
+        start = self.bound(prefix, False)
+        return start, self.bound(prefix, True) if prefix else self.count
+
+    def bases(self, name):
+        """The bases of the class `name`, nearest first, [] for anything else"""
+        key = name.encode("utf-8")
+        i = self.bound(key, False)
+        while i < self.count and self.key_bytes(i) == key:
+            kind, _, _, _, bases = ENTRY.unpack_from(self.map, self.entries_offset + i * ENTRY.size)
+            if kind == CLASS:
+                self.load_strings((bases,))
+                return self.strings[bases].split(",") if bases else []
+            i += 1
+        return []
+
+    def levels(self, prefix):
+        """(start, end, base) of the ranges of `prefix`, its own with base None then for a `Class.` prefix the
+        one of each base of the class"""
+        own = (*self.range(prefix), None)
+        name, dot, member = prefix.partition(".")
+        if not dot:
+            return [own]
+        return [own] + [(*self.range(f"{base}.{member}"), base) for base in self.bases(name)]
+
+    def names(self, prefix):
+        """The keys that start with `prefix`, once per overload, e.g. for a completion list"""
+        levels = self.levels(prefix)
+        if len(levels) == 1:
+            return self.lines(self.key_offsets, self.keys_data, *levels[0][:2])
+        name = prefix.partition(".")[0]
+        names = []
+        seen = set()
+        for start, end, base in levels:
+            keys = self.lines(self.key_offsets, self.keys_data, start, end)
+            if base:
+                keys = [name + key[len(base) :] for key in keys]
+            # a member hides the ones of the same name of the farther bases, the overloads of one class all stay
+            keys = [key for key in keys if key not in seen]
+            seen.update(keys)
+            names += keys
+        names.sort()
+        return names
+
+    def find(self, prefix, limit=None):
+        """The Symbols whose key starts with `prefix`, at most `limit` of them, in the order of the keys
+
+        A `Class.` prefix also finds the members the class inherits, keyed after the class, their container is
+        the base that declares them.
+        """
+        levels = self.levels(prefix)
+        if len(levels) == 1:
+            start, end, _ = levels[0]
+            return self.entries(start, end if limit is None else min(end, start + limit))
+        name = prefix.partition(".")[0]
+        found = []
+        seen = set()
+        for start, end, base in levels:
+            symbols = self.entries(start, end)
+            if base:
+                symbols = [new_symbol((name + symbol[0][len(base) :], *symbol[1:])) for symbol in symbols]
+            symbols = [symbol for symbol in symbols if symbol[0] not in seen]
+            seen.update(symbol[0] for symbol in symbols)
+            found += symbols
+        found.sort(key=itemgetter(0))
+        return found if limit is None else found[:limit]
+
+
+class SymbolIndexBackend(Backend):
+    """The symbol index of the declarations, to `path` (see write_index)"""
+
+    name = "symbol_index"
+
+    def __init__(self, path):
+        self.path = path
+
+    def write(self, api):
+        return {self.path: ["Symbols"]} if write_index(api, self.path) else {}
@@ -0,0 +1,57 @@
+class SymbolTable:
+    """List of records (see model.py) indexed by name, a name can map to many records (e.g. overloads)
+
+    Records keep their insertion order, both when iterating the table and when looking up a name,
+    so `get` returns the same record a linear search over the list would find first.
+    """
+
+    def __init__(self, records=(), key="name"):
+        self.key = key
+        self.records = []
+        self.index = {}
+        for record in records:
+            self.add(record)
+
+    def add(self, record, *extra_names):
+        """Adds a record under its own name and under any extra name it should also be found by"""
+        key = getattr(record, self.key)
+        self.records.append(record)
+        self.index.setdefault(key, []).append(record)
+        for name in extra_names:
+            if name != key:
+                self.index.setdefault(name, []).append(record)
+
+    def get(self, name, default=None):
+        records = self.index.get(name)
+        return records[0] if records else default
+
+    def get_all(self, name):
+        return self.index.get(name, [])
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+
+def array_base_name(name):
+    """`name[SIZE]` -> `name`, None for names that aren't arrays"""
+    if name.endswith("]") and "[" in name:
+        return name[: name.find("[")]
+    return None
+
+
+def member_var_table(member_vars):
+    """Member variables of a class, arrays can also be found by the name without the size"""
+    table = SymbolTable()
+    for var in member_vars:
+        base_name = array_base_name(var.name)
+        if base_name is not None:
+            table.add(var, base_name)
+        else:
+            table.add(var)
+    return table
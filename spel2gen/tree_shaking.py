@@ -0,0 +1,148 @@
+"""Declarations of only what some scripts use, so a mod is type-checked against a small part of the API
+
+The scripts are scanned for identifiers, the names the API declares among them are the roots: functions, global
+variables, classes, enums and aliases. Their closure follows the bases of the classes and the types of the
+function parameters and returns, of the class members and of the aliases. A class only keeps the members whose
+name the scripts mention, `players[0].inventory.bombs` keeps `inventory` on the classes that have one and `bombs`
+on Inventory, the types of the other members aren't pulled in.
+
+Names mentioned in comments or strings only keep more than needed, never less: a script that type-checks against
+the whole declarations still does against the shaken ones.
+"""
+import dataclasses
+
+from .backends import Backend
+from .emitter import NO_SELF_IN_FILE, Emitter
+from .generator import entity_class_by_type, member_overrides, write_declarations
+from .instrumentation import stats
+from .patterns import reIdentifier, reTsMemberName
+from .signatures import declared_functions, global_variables, member_text
+from .typecheck import find_scripts
+
+
+def script_identifiers(scripts):
+    """Every identifier of the scripts (paths), keywords and the names in comments and strings included"""
+    identifiers = set()
+    for script in scripts:
+        with open(script, "r", encoding="utf-8") as fp:
+            identifiers.update(reIdentifier.findall(fp.read()))
+    return identifiers
+
+
+class DeclarationGraph:
+    """What each declaration of an Api references, built once per Api, the closure of some scripts is then cheap
+
+    `refs` maps the name of a function, global variable, class (its bases) or alias to the declared names its
+    text references, `members` a class to the (member, name, references) of its members, the `Entity.as_*`
+    casts are members of Entity. The references of a member only count when the scripts mention the member.
+    """
+
+    def __init__(self, api):
+        self.api = api
+        self.variables = global_variables
+        declared = {type.name for type in api.types}
+        declared.update(enum.name for enum in api.enums)
+        declared.update(alias.name for alias in api.aliases)
+        declared.update(name for name, _ in self.variables)
+        functions = list(declared_functions(api))
+        declared.update(name for name, _, _, _ in functions)
+        self.declared = declared
+
+        def references(text):
+            return declared.intersection(reIdentifier.findall(text))
+
+        self.refs = {}
+        for name, param, ret, _ in functions:
+            self.refs.setdefault(name, set()).update(references(param), references(ret))
+        for name, type in self.variables:
+            self.refs.setdefault(name, set()).update(references(type))
+        for alias in api.aliases:
+            self.refs.setdefault(alias.name, set()).update(references(alias.type))
+        self.members = {}
+        for type in api.types:
+            self.refs.setdefault(type.name, set()).update(references(type.base))
+            members = self.members.setdefault(type.name, [])
+            for var in type.fields:
+                text = member_text(var, count=False)
+                m = reTsMemberName.match(text)
+                if m:
+                    # what follows the name, without the C++ type of the members declared as any
+                    members.append((var, m[1], references(text[m.end() :].partition(" //")[0])))
+        self.casts = [(cast, references(cast.type or "")) for cast in api.known_casts]
+        # get_entity<ENT_TYPE.MONS_SNAKE>(uid) returns a Snake, the ENT_TYPE members reference their class
+        self.entity_classes = entity_class_by_type(api)
+
+    def references(self, name, identifiers):
+        """The declared names `name` references, with only the members of a class that are in `identifiers`"""
+        refs = set(self.refs.get(name, ()))
+        for _, member, member_refs in self.members.get(name, ()):
+            if member in identifiers:
+                refs |= member_refs
+        if name == "Entity":
+            for cast, cast_refs in self.casts:
+                if cast.name in identifiers:
+                    refs |= cast_refs
+        elif name == "ENT_TYPE":
+            refs.update(self.entity_classes[member] for member in identifiers.intersection(self.entity_classes))
+        return refs
+
+    def closure(self, identifiers):
+        """The declared names the scripts of `identifiers` need"""
+        names = set()
+        pending = list(self.declared.intersection(identifiers))
+        while pending:
+            name = pending.pop()
+            if name not in names:
+                names.add(name)
+                pending.extend(self.references(name, identifiers) - names)
+        return names
+
+    def shake(self, identifiers):
+        """(Api, global variables) with only the declarations and the class members the scripts need"""
+        names = self.closure(identifiers)
+        api = self.api
+        types = []
+        for type in api.types:
+            if type.name in names:
+                fields = [var for var, member, _ in self.members[type.name] if member in identifiers]
+                types.append(dataclasses.replace(type, fields=fields))
+        entity = "Entity" in names
+        shaken = dataclasses.replace(
+            api,
+            funcs=[func for func in api.funcs if func.name in names],
+            events=[],
+            types=types,
+            known_casts=[cast for cast in api.known_casts if entity and cast.name in identifiers],
+            enums=[enum for enum in api.enums if enum.name in names],
+            aliases=[alias for alias in api.aliases if alias.name in names],
+        )
+        stats.count("shaken_declarations", len(names))
+        return shaken, [(name, type) for name, type in self.variables if name in names]
+
+
+def write_shaken(api, scripts, path, const_enums=False, canonical=False, graph=None):
+    """Writes to `path` the declarations the scripts (paths) need, returns {path: changed sections}
+
+    A `graph` of the same api (DeclarationGraph) is reused, e.g. to shake several projects.
+    """
+    with stats.phase("tree_shaking"):
+        graph = graph or DeclarationGraph(api)
+        shaken, variables = graph.shake(script_identifiers(scripts))
+    with Emitter(path, member_overrides, NO_SELF_IN_FILE, canonical=canonical) as out:
+        write_declarations(out, shaken, const_enums, variables)
+    return out.changes()
+
+
+class ShakenTypeScriptBackend(Backend):
+    """The declarations the .ts scripts of `scripts_dir` need, to `path` (see write_shaken)"""
+
+    name = "shaken"
+
+    def __init__(self, path, scripts_dir, const_enums=False, canonical=False):
+        self.path = path
+        self.scripts_dir = scripts_dir
+        self.const_enums = const_enums
+        self.canonical = canonical
+
+    def write(self, api):
+        return write_shaken(api, find_scripts(self.scripts_dir), self.path, self.const_enums, self.canonical)
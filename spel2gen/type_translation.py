@@ -0,0 +1,97 @@
+import re
+from functools import lru_cache
+
+from .patterns import reArr, reBool, reMap, reNumber, reOptional, reTuple
+
+replace = {
+    #"nil": "void",
+    #"bool": "boolean",
+    "uint8_t": "number",
+    "uint16_t": "number",
+    "uint32_t": "number",
+    "uint64_t": "number",
+    "int8_t": "number",
+    "int16_t": "number",
+    "int32_t": "number",
+    "int64_t": "number",
+    "ImU32": "number",
+    "vector": "Array",
+    "array": "Array",
+    "unordered_map": "LuaTable",
+    "const char*": "string",
+    "wstring": "string",
+    "u16string": "string",
+    "char16_t": "string",
+    "string_view": "string",
+    "pair": "tuple",
+    "std::": "",
+    "sol::": "",
+    #"AABB&: const": "AABB",
+    "function": "Callback",
+    " = nullopt": "",
+    #"const Color&": "color: Color",
+    #"void": "",
+    "constexpr": "",
+    #"static": "",
+    #"variadic_args va": "...ent_type: number[]",
+    "...va:": "...ent_type:",
+    "// Access via": "ImGuiIO",
+    "set<": "Array<",
+    "&": "",
+    "const string": "string",
+    "ShopType": "SHOP_TYPE",
+
+}
+
+
+class TypeTranslator:
+    """Translates C++ types (or whole lines) to TypeScript with a replacement table
+
+    Replacements are applied in table order, each one to the result of the previous ones, and a key is
+    skipped when its first occurrence is inside backticks (so docs can show the C++ types). The table is
+    copied when the translator is created, and results are memoized since the same types come up a lot. The
+    memo keeps the `maxsize` texts used last, a generation of the whole API needs about 8000, and --watch
+    translates the edited lines again and again.
+    """
+
+    def __init__(self, table, maxsize=1 << 14):
+        self.table = tuple(table.items())
+        self.reKeys = re.compile("|".join(re.escape(key) for key in table))
+        self.cached = lru_cache(maxsize)(self.translate)
+
+    def __call__(self, text):
+        return self.cached(text)
+
+    def clear(self):
+        """Forgets the memoized translations, e.g. to time them"""
+        self.cached.cache_clear()
+
+    def translate(self, text):
+        if self.reKeys.search(text):
+            for i, j in self.table:
+                pos = text.find(i)
+                if pos < 0:
+                    continue
+                if pos > 0 and text.rfind("`", 0, pos) >= 0 and text.find("`", pos + len(i)) > 0:
+                    continue
+                text = text.replace(i, j)
+        if "float" in text or "int" in text:
+            text = reNumber.sub("number", text)
+        if "map<" in text:
+            text = reMap.sub("LuaTable<", text)
+        if "Array<" in text: #Array<Array<float, 2>, MAX_PLAYERS>
+            while True:
+                newText = reArr.sub(r"FixedSizeArray\1", text)#TODO Possible solution: use tuples to use the max size. bad thing: some arrays show max size as MAX_PLAYERS.
+                if newText == text:
+                    break
+                text = newText
+        if "tuple<" in text:
+            text = reTuple.sub(r"LuaMultiReturn<[\1]>", text)
+        if "bool" in text:
+            text = reBool.sub("boolean", text)
+        if "optional<" in text:
+            text = reOptional.sub(r"\1 | undefined", text)
+        return text
+
+
+replace_all = TypeTranslator(replace)
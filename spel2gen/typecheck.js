@@ -0,0 +1,195 @@
+// Type-checks scripts against the declarations, for typecheck.py
+//
+// Reads a JSON request per line on stdin and answers each with a JSON line on stdout:
+//   {"declarations": [paths], "scripts": [paths]}
+//   -> {"results": {script: [{line, column, code, category, message}]}, "checked": n, "reused": n, "elapsed": ms}
+//   or {"error": message}
+// The process stays alive between requests. Mod scripts are global scripts that would redeclare each other's
+// variables in a single program, so each script gets its own LanguageService, but they all share one document
+// registry: the declarations and the libs are parsed once, not once per script. Files are versioned by their
+// mtime and size, so after a regeneration only the files that changed are parsed again, and a script whose
+// program has the same files as in the previous request (the script, the declarations and what they reference)
+// keeps its diagnostics without being checked again.
+"use strict";
+const fs = require("fs");
+const path = require("path");
+const readline = require("readline");
+
+// the project, with package.json, tsconfig.json and the node_modules of npm install
+const root = path.resolve(__dirname, "..");
+let ts;
+try {
+    ts = require("typescript");
+} catch (error) {
+    ts = null;
+}
+
+function fileVersion(file) {
+    try {
+        const stat = fs.statSync(file);
+        return `${stat.mtimeMs}:${stat.size}`;
+    } catch (error) {
+        return "missing";
+    }
+}
+
+function isLib(file) {
+    return file.split(/[\\/]/).includes("node_modules");
+}
+
+function readCompilerOptions(configPath) {
+    const config = ts.readConfigFile(configPath, ts.sys.readFile);
+    if (config.error) {
+        throw new Error(ts.flattenDiagnosticMessageText(config.error.messageText, "\n"));
+    }
+    const converted = ts.convertCompilerOptionsFromJson(config.config.compilerOptions || {}, path.dirname(configPath));
+    return { ...converted.options, noEmit: true };
+}
+
+class Checker {
+    constructor(configPath) {
+        this.options = readCompilerOptions(configPath);
+        this.registry = ts.createDocumentRegistry();
+        this.versions = new Map(); // file -> version, once per request except for the libs in node_modules
+        this.services = new Map(); // script -> {service, files}
+        this.results = new Map(); // script -> {roots, files: [[file, version]], diagnostics}
+    }
+
+    version(file) {
+        let version = this.versions.get(file);
+        if (version === undefined) {
+            version = fileVersion(file);
+            this.versions.set(file, version);
+        }
+        return version;
+    }
+
+    service(script) {
+        let entry = this.services.get(script);
+        if (entry) {
+            return entry;
+        }
+        entry = { files: [] };
+        const host = {
+            getScriptFileNames: () => entry.files,
+            getScriptVersion: (file) => this.version(file),
+            getScriptSnapshot: (file) => {
+                if (!fs.existsSync(file)) {
+                    return undefined;
+                }
+                return ts.ScriptSnapshot.fromString(fs.readFileSync(file, "utf8"));
+            },
+            // "types" of the compiler options resolve from the node_modules next to tsconfig.json
+            getCurrentDirectory: () => root,
+            getCompilationSettings: () => this.options,
+            getDefaultLibFileName: (options) => ts.getDefaultLibFilePath(options),
+            fileExists: ts.sys.fileExists,
+            readFile: ts.sys.readFile,
+            readDirectory: ts.sys.readDirectory,
+            directoryExists: ts.sys.directoryExists,
+            getDirectories: ts.sys.getDirectories,
+        };
+        entry.service = ts.createLanguageService(host, this.registry);
+        this.services.set(script, entry);
+        return entry;
+    }
+
+    diagnostics(service, script) {
+        const diagnostics = [
+            ...service.getCompilerOptionsDiagnostics(),
+            ...service.getSyntacticDiagnostics(script),
+            ...service.getSemanticDiagnostics(script),
+        ];
+        return diagnostics.map((diagnostic) => {
+            const result = {
+                line: 0,
+                column: 0,
+                code: diagnostic.code,
+                category: ts.DiagnosticCategory[diagnostic.category].toLowerCase(),
+                message: ts.flattenDiagnosticMessageText(diagnostic.messageText, "\n"),
+            };
+            if (diagnostic.file && diagnostic.start !== undefined) {
+                const position = diagnostic.file.getLineAndCharacterOfPosition(diagnostic.start);
+                result.line = position.line + 1;
+                result.column = position.character + 1;
+            }
+            return result;
+        });
+    }
+
+    check(declarations, scripts) {
+        const start = process.hrtime.bigint();
+        declarations = declarations.map((file) => path.resolve(file));
+        scripts = scripts.map((file) => path.resolve(file));
+        for (const file of this.versions.keys()) {
+            if (!isLib(file)) {
+                this.versions.delete(file);
+            }
+        }
+
+        const results = {};
+        let checked = 0;
+        let reused = 0;
+        for (const script of scripts) {
+            const roots = [...declarations, script];
+            const previous = this.results.get(script);
+            if (
+                previous &&
+                previous.roots === roots.join("|") &&
+                previous.files.every(([file, version]) => this.version(file) === version)
+            ) {
+                results[script] = previous.diagnostics;
+                reused++;
+                continue;
+            }
+            const entry = this.service(script);
+            entry.files = roots;
+            const diagnostics = this.diagnostics(entry.service, script);
+            const files = entry.service
+                .getProgram()
+                .getSourceFiles()
+                .map((sourceFile) => sourceFile.fileName)
+                .filter((file) => !isLib(file))
+                .map((file) => [file, this.version(file)]);
+            this.results.set(script, { roots: roots.join("|"), files, diagnostics });
+            results[script] = diagnostics;
+            checked++;
+        }
+
+        // scripts that are gone don't keep their programs alive
+        const requested = new Set(scripts);
+        for (const [script, entry] of this.services) {
+            if (!requested.has(script)) {
+                entry.service.dispose();
+                this.services.delete(script);
+                this.results.delete(script);
+            }
+        }
+        const elapsed = Number(process.hrtime.bigint() - start) / 1e6;
+        return { results, checked, reused, elapsed };
+    }
+}
+
+let checker = null;
+
+function handle(line) {
+    if (!ts) {
+        return { error: `typescript not found from ${root}, run npm install` };
+    }
+    try {
+        const request = JSON.parse(line);
+        if (!checker) {
+            checker = new Checker(process.argv[2] || path.join(root, "tsconfig.json"));
+        }
+        return checker.check(request.declarations || [], request.scripts || []);
+    } catch (error) {
+        return { error: String(error && error.stack ? error.stack : error) };
+    }
+}
+
+const input = readline.createInterface({ input: process.stdin, terminal: false });
+input.on("line", (line) => {
+    if (line.trim()) {
+        process.stdout.write(JSON.stringify(handle(line)) + "\n");
+    }
+});
@@ -0,0 +1,92 @@
+"""Type-checks TypeScript mod scripts against the generated declarations, with one Node process kept alive
+
+The checking is done by typecheck.js with the typescript package that typescript-to-lua installs (npm install).
+It keeps the parsed declarations and scripts between checks, so checking again after a regeneration only parses
+what changed, and the scripts whose program didn't change at all keep their previous results.
+"""
+import json
+import os
+import subprocess
+
+HELPER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "typecheck.js")
+
+
+class TypeCheckError(RuntimeError):
+    pass
+
+
+class TypeChecker:
+    def __init__(self, node="node", config=None):
+        """`config` is the tsconfig.json whose compiler options are used, the one of the project by default"""
+        command = [node, HELPER] + ([os.path.abspath(config)] if config else [])
+        try:
+            self.process = subprocess.Popen(
+                command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, encoding="utf-8", bufsize=1
+            )
+        except FileNotFoundError:
+            raise TypeCheckError(f"{node} not found, type-checking needs Node.js")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def check(self, declarations, scripts):
+        """{"results": {script: [diagnostic]}, "checked", "reused", "elapsed"} for the scripts (absolute paths)
+
+        A diagnostic is {"line", "column", "code", "category", "message"}, line 0 when it isn't about a position
+        of the script (e.g. an error of the compiler options).
+        """
+        request = {
+            "declarations": [os.path.abspath(file) for file in declarations],
+            "scripts": [os.path.abspath(file) for file in scripts],
+        }
+        self.process.stdin.write(json.dumps(request) + "\n")
+        self.process.stdin.flush()
+        line = self.process.stdout.readline()
+        if not line:
+            raise TypeCheckError(f"{HELPER} exited with {self.process.wait()}")
+        response = json.loads(line)
+        if "error" in response:
+            raise TypeCheckError(response["error"])
+        return response
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            self.process.wait()
+
+
+def find_scripts(directory):
+    """The .ts scripts (not declarations) in `directory` and its subdirectories, outside node_modules"""
+    scripts = []
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames[:] = sorted(name for name in dirnames if name != "node_modules")
+        scripts.extend(
+            os.path.join(dirpath, name) for name in sorted(filenames) if name.endswith(".ts") and not name.endswith(".d.ts")
+        )
+    return scripts
+
+
+def print_results(response, file, relative_to=None):
+    """A line per script, then its errors as `path:line:column - error TS2304: message`, returns the failed scripts"""
+    failed = 0
+    for script, diagnostics in response["results"].items():
+        name = os.path.relpath(script, relative_to) if relative_to else script
+        errors = [diagnostic for diagnostic in diagnostics if diagnostic["category"] == "error"]
+        failed += bool(errors)
+        count = f" ({len(errors)} error{'s' if len(errors) > 1 else ''})" if errors else ""
+        print(f"{'FAIL' if errors else 'ok':<4} {name}{count}", file=file)
+        for diagnostic in diagnostics:
+            print(
+                f"  {name}:{diagnostic['line']}:{diagnostic['column']} - {diagnostic['category']} "
+                f"TS{diagnostic['code']}: {diagnostic['message']}",
+                file=file,
+            )
+    print(
+        f"Type-checked {len(response['results'])} scripts, {response['checked']} checked, {response['reused']} unchanged, "
+        f"{failed} failed, in {response['elapsed'] / 1000:.3f}s",
+        file=file,
+    )
+    return failed
@@ -0,0 +1,129 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class PollingWatcher:
+    """Finds changed files by comparing their modification time and size every `interval` seconds"""
+
+    kind = "polling"
+
+    def __init__(self, paths, interval=0.5):
+        self.paths = list(paths)
+        self.interval = interval
+        self.stats = {path: self.stat(path) for path in self.paths}
+
+    @staticmethod
+    def stat(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def poll(self, timeout=None):
+        """Returns the paths changed since the last call, waits up to `timeout` seconds (forever if None) for one"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            for path in self.paths:
+                stat = self.stat(path)
+                if stat != self.stats[path]:
+                    self.stats[path] = stat
+                    changed.add(path)
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return changed
+            wait = self.interval if deadline is None else min(self.interval, max(deadline - time.monotonic(), 0))
+            time.sleep(wait)
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux only, watches the directories of the files so saves that replace a file (rename over it) are seen too"""
+
+    kind = "inotify"
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.files = {}  # (watch descriptor, file name) -> path
+        watches = {}
+        for path in self.paths:
+            directory, name = os.path.split(os.path.abspath(path))
+            if directory not in watches:
+                wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+                if wd < 0:
+                    errno = ctypes.get_errno()
+                    os.close(self.fd)
+                    raise OSError(errno, f"inotify_add_watch failed for {directory}")
+                watches[directory] = wd
+            self.files[(watches[directory], os.fsencode(name))] = path
+
+    def poll(self, timeout=None):
+        """Returns the paths changed since the last call, waits up to `timeout` seconds (forever if None) for one"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed = set()
+        while not changed:
+            wait = None if deadline is None else max(deadline - time.monotonic(), 0)
+            readable, _, _ = select.select([self.fd], [], [], wait)
+            if not readable:
+                break
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            # events of other files in the same directories are ignored
+            offset = 0
+            while offset < len(data):
+                wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                path = self.files.get((wd, name))
+                if path is not None:
+                    changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def open_watcher(paths, interval=0.5):
+    """inotify when the platform has it, else polling"""
+    try:
+        return InotifyWatcher(paths)
+    except (OSError, AttributeError, TypeError):
+        return PollingWatcher(paths, interval)
+
+
+def wait_for_changes(watcher, debounce=0.2):
+    """Blocks until files change, a burst of saves is returned as one set once nothing changed for `debounce` seconds"""
+    changed = set()
+    while not changed:
+        changed = watcher.poll(None)
+    while True:
+        more = watcher.poll(debounce)
+        if not more:
+            return changed
+        changed |= more
@@ -0,0 +1,63 @@
+import pytest
+
+from spel2gen.model import Alias, Api, Binding, Cast, EnumDef, Field, Rpc, Usertype
+
+
+def usertype(name, base, fields, file="entity_lua.cpp", comment=("",)):
+    type = Usertype(name, name, "", file, base, comment=comment)
+    type.fields = fields
+    return type
+
+
+@pytest.fixture
+def api():
+    """A small linked Api: a few functions, an Entity hierarchy, enums and aliases"""
+    return Api(
+        rpc=[
+            Rpc("spawn_entity", "int32_t", "ENT_TYPE entity_type, float x, float y", ("Spawns an entity",)),
+            Rpc("get_entity", "Entity*", "int32_t uid", ("Get the entity of an uid",)),
+            Rpc("get_bounds", "AABB", "int32_t uid"),
+        ],
+        funcs=[
+            Binding("spawn", "spawn_entity", ("Spawns an entity",)),
+            Binding("get_entity", "get_entity"),
+            Binding("get_bounds", "get_bounds"),
+            Binding("players", ""),
+        ],
+        events=[Binding("on_frame")],
+        types=[
+            usertype("AABB", "", [Field("left", "", "left: number"), Field("right", "", "right: number")], "level_lua.cpp"),
+            usertype(
+                "Entity",
+                "",
+                [
+                    Field("uid", "", "uid: number", ("Unique id",)),
+                    Field("x", "", "x: number"),
+                    Field("destroy", "", "void destroy()", ("Removes it",)),
+                    Field("overlay", "", "overlay: Entity"),
+                ],
+            ),
+            usertype("Movable", "Entity", [Field("velocityx", "", "velocityx: number"), Field("x", "", "x: number")]),
+            usertype(
+                "Monster",
+                "Entity, Movable",
+                [Field("chased_target_uid", "", "chased_target_uid: number")],
+                "entities_monsters_lua.cpp",
+            ),
+            usertype(
+                "Snake",
+                "Entity, Movable, Monster",
+                [Field("walk_pause_timer", "", "walk_pause_timer: number")],
+                "entities_monsters_lua.cpp",
+            ),
+            usertype("Player", "Entity, Movable", [Field("inventory", "", "inventory: Inventory")], "entities_chars_lua.cpp"),
+            usertype("Inventory", "", [Field("bombs", "", "bombs: number"), Field("ropes", "", "ropes: number")]),
+        ],
+        known_casts=[Cast("as_movable", "Movable"), Cast("as_snake", "Snake"), Cast("as_unknown")],
+        enums=[
+            EnumDef("ENT_TYPE", (("FLOOR_GENERIC", "1"), ("MONS_SNAKE", "220"), ("MONS_SPIDER", "221"))),
+            EnumDef("LAYER", (("FRONT", "0"), ("BACK", "1"))),
+        ],
+        aliases=[Alias("CallbackId", "number"), Alias("Flags", "number")],
+        lualibs=["math", "string"],
+    )
@@ -0,0 +1,26 @@
+"""Smoke tests of the benchmarks, so a change of the modules they use doesn't go unnoticed until they are run"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+import bench_cpp_parser  # noqa: E402
+from spel2gen.source_parser import header_classes  # noqa: E402
+
+HEADER = """
+struct Movable : public Entity
+{
+    /// Horizontal speed
+    float velocityx;
+    uint8_t slots[4];
+    virtual bool move(float x, float y);
+};
+"""
+
+
+def test_bench_cpp_parser():
+    # the old line loop takes `y)` of the parameters for a member, what the benchmark counts
+    _, classes, members, invalid = bench_cpp_parser.run(bench_cpp_parser.line_scan_classes, [HEADER], repeat=1)
+    assert (classes, members, invalid) == (1, 4, ["y)"])
+    _, classes, members, invalid = bench_cpp_parser.run(header_classes, [HEADER], repeat=1)
+    assert (classes, members, invalid) == (1, 3, [])
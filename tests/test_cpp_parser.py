@@ -0,0 +1,91 @@
+from spel2gen import cpp_parser
+from spel2gen.cpp_parser import FunctionDecl, VarDecl
+
+HEADER = """
+#pragma once
+#include <functional>
+
+namespace ns {
+/// Something that moves
+class Movable : public Entity
+{
+  public:
+    /// Horizontal speed
+    float velocityx;
+    uint8_t slots[4];
+    union {
+        uint32_t flags;
+        struct { uint16_t a, b; };
+    };
+    std::function<bool(int, float)> callback = nullptr;
+    virtual ~Movable();
+    Movable(Movable&& other);
+    /// Moves it
+    virtual bool move(float x, float y = 0.0f) const override { return x > y; }
+    template <typename T>
+    T* as() { return static_cast<T*>(this); }
+    enum class State { A, B };
+    struct Inner { int depth; };
+};
+}
+
+/// Spawns an entity
+int32_t spawn(ENT_TYPE type, float x, float y);
+"""
+
+
+def members(decl):
+    return {member.name: member for member in decl.members}
+
+
+def test_class():
+    unit = cpp_parser.parse(HEADER)
+    [movable] = unit.classes
+    assert (movable.name, movable.kind, movable.bases) == ("Movable", "class", ["Entity"])
+    assert movable.comment == ["/// Something that moves"]
+    assert [inner.name for inner in movable.nested] == ["Inner"]
+
+
+def test_variables():
+    found = members(cpp_parser.parse(HEADER).classes[0])
+    assert isinstance(found["velocityx"], VarDecl)
+    assert found["velocityx"].type == "float"
+    assert found["velocityx"].comment == ["    /// Horizontal speed"]
+    # the array size stays in the name, the members of anonymous unions and structs are the class'
+    assert found["slots[4]"].type == "uint8_t"
+    assert [found[name].type for name in ("flags", "a", "b")] == ["uint32_t", "uint16_t", "uint16_t"]
+    assert found["callback"].type == "std::function<bool(int, float)>"
+    assert "State" not in found
+
+
+def test_functions():
+    found = members(cpp_parser.parse(HEADER).classes[0])
+    move = found["move"]
+    assert isinstance(move, FunctionDecl)
+    assert (move.return_type, move.params, move.is_virtual) == ("bool", "float x, float y = 0.0f", True)
+    assert move.comment == ["    /// Moves it"]
+    assert found["Movable"].is_move_ctor
+    assert found["~Movable"].is_virtual
+    assert found["as"].return_type == "T*"
+
+
+def test_free_functions():
+    unit = cpp_parser.parse(HEADER)
+    [spawn] = unit.functions
+    assert (spawn.name, spawn.return_type, spawn.params) == ("spawn", "int32_t", "ENT_TYPE type, float x, float y")
+    assert spawn.comment == ["/// Spawns an entity"]
+    assert unit.line_of(spawn.span[0]) == HEADER[: spawn.span[0]].count("\n") + 1
+
+
+def test_skips_bodies_and_unknown_declarations():
+    unit = cpp_parser.parse(
+        """
+        using Callback = std::function<void()>;
+        static_assert(sizeof(int) == 4);
+        void helper() { struct Local { int x; }; if (true) { return; } }
+        struct Color { float r, g, b, a; };
+        """
+    )
+    assert [decl.name for decl in unit.classes] == ["Color"]
+    assert [member.name for member in unit.classes[0].members] == ["r", "g", "b", "a"]
+    assert [function.name for function in unit.functions] == ["helper"]
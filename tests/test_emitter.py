@@ -0,0 +1,40 @@
+import os
+
+from spel2gen.emitter import Emitter, hashes_path, section_hashes
+
+
+def emit(path, functions):
+    with Emitter(str(path), header="/** @noSelfInFile */") as out:
+        out.write_section("Functions")
+        for name in functions:
+            out.write_function(name, "", "void")
+        out.write_section("Functions")
+        out.write_alias("Uid", "number")
+    return out
+
+
+def test_hashes_written_match_the_file(tmp_path):
+    path = tmp_path / "out.d.ts"
+    out = emit(path, ["spawn"])
+    assert out.changed_sections == ["", "Functions", "Functions'"]
+    assert out.hashes == section_hashes(path.read_text())
+    assert os.path.exists(hashes_path(str(path)))
+
+
+def test_unchanged_output_isnt_touched(tmp_path):
+    path = tmp_path / "out.d.ts"
+    emit(path, ["spawn"])
+    mtime = os.stat(path).st_mtime_ns
+    assert emit(path, ["spawn"]).changed_sections == []
+    assert os.stat(path).st_mtime_ns == mtime
+    assert emit(path, ["spawn", "kill"]).changed_sections == ["Functions"]
+
+
+def test_edited_output_is_hashed_again(tmp_path):
+    path = tmp_path / "out.d.ts"
+    emit(path, ["spawn"])
+    with open(path, "a") as fp:
+        fp.write("declare type Edited = number\n")
+    assert emit(path, ["spawn"]).changed_sections == ["Functions'"]
+    os.remove(hashes_path(str(path)))
+    assert emit(path, ["spawn"]).changed_sections == []
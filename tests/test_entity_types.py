@@ -0,0 +1,87 @@
+from spel2gen.generator import entity_class_by_type
+from spel2gen.model import Api, EnumDef, Usertype
+
+ENT_TYPE = [
+    "MONS_SNAKE",
+    "MONS_VAMPIRE",
+    "MONS_VLAD",
+    "DECORATION_VLAD",
+    "FLOORSTYLED_VLAD",
+    "FLOOR_DOOR",
+    "BG_DOOR",
+    "LOGICAL_DOOR",
+    "FX_PORTAL",
+    "LOGICAL_PORTAL",
+    "FX_SPARK",
+    "ITEM_SPARK",
+    "DECORATION_PIPE",
+    "FLOOR_PIPE",
+    "ITEM_EMPRESS_GRAVE",
+    "BG_MOTHER_STATUE",
+    "ITEM_WHIP",
+    "CHAR_ANA_SPELUNKY",
+]
+
+# (name, bases, api file)
+USERTYPES = [
+    ("Entity", "", "entity_lua.cpp"),
+    ("Movable", "Entity", "entity_lua.cpp"),
+    ("Floor", "Entity", "entities_floors_lua.cpp"),
+    ("Monster", "Entity, Movable", "entities_monsters_lua.cpp"),
+    ("Snake", "Entity, Movable, Monster", "entities_monsters_lua.cpp"),
+    ("Vampire", "Entity, Movable, Monster", "entities_monsters_lua.cpp"),
+    ("Vlad", "Entity, Movable, Monster, Vampire", "entities_monsters_lua.cpp"),
+    ("Door", "Entity, Floor", "entities_floors_lua.cpp"),
+    ("Portal", "Entity, Movable", "entities_items_lua.cpp"),
+    ("Spark", "Entity, Floor", "entities_items_lua.cpp"),
+    ("Pipe", "Entity, Floor", "entities_floors_lua.cpp"),
+    ("EmpressGrave", "Entity, Floor", "entities_floors_lua.cpp"),
+    ("MotherStatue", "Entity, Floor", "entities_floors_lua.cpp"),
+    # registered outside of its family file, the family is the one of its base
+    ("Whip", "Entity, Movable, Monster", "other_lua.cpp"),
+    ("AnaSpelunky", "Entity, Movable", "entities_chars_lua.cpp"),
+]
+
+
+def make_api():
+    types = [Usertype(name, name, "", file, base) for name, base, file in USERTYPES]
+    enums = [EnumDef("ENT_TYPE", tuple((member, str(i)) for i, member in enumerate(ENT_TYPE)))]
+    return Api([], [], [], types, [], enums, [], [])
+
+
+def test_members_of_the_family_of_their_class():
+    classes = entity_class_by_type(make_api())
+    assert classes["MONS_SNAKE"] == "Snake"
+    assert classes["MONS_VAMPIRE"] == "Vampire"
+    assert classes["CHAR_ANA_SPELUNKY"] == "AnaSpelunky"
+
+
+def test_members_of_another_family_stay_entities():
+    classes = entity_class_by_type(make_api())
+    for member in ("ITEM_EMPRESS_GRAVE", "BG_MOTHER_STATUE", "ITEM_WHIP"):
+        assert member not in classes
+
+
+def test_names_claimed_by_several_categories_stay_entities():
+    classes = entity_class_by_type(make_api())
+    for member in (
+        "MONS_VLAD",
+        "DECORATION_VLAD",
+        "FLOORSTYLED_VLAD",
+        "FLOOR_DOOR",
+        "BG_DOOR",
+        "LOGICAL_DOOR",
+        "FX_PORTAL",
+        "LOGICAL_PORTAL",
+        "FX_SPARK",
+        "ITEM_SPARK",
+        "DECORATION_PIPE",
+        "FLOOR_PIPE",
+    ):
+        assert member not in classes
+
+
+def test_family_of_the_base():
+    api = make_api()
+    api.enums = [EnumDef("ENT_TYPE", (("MONS_WHIP", "1"),))]
+    assert entity_class_by_type(api) == {"MONS_WHIP": "Whip"}
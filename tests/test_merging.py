@@ -0,0 +1,71 @@
+from spel2gen.generator import merge_members, merge_rpc_overloads, union_type
+from spel2gen.model import Field, Rpc, Usertype
+
+
+def test_union_type():
+    assert union_type("number", "boolean") == "number | boolean"
+    assert union_type("number | boolean", "number") == "number | boolean"
+    assert union_type("number", "number | undefined") == "number | undefined"
+    assert union_type("Entity", "number") is None
+    assert union_type("Array<number>", "Array<Entity>") is None
+
+
+def test_overloads_merged_once_translated():
+    rpc = [
+        Rpc("get_flags", "int", "int uid", ("Flags of the entity",)),
+        Rpc("get_flags", "bool", "int uid"),
+        Rpc("get_flags", "uint8_t", "int uid"),
+        Rpc("get_flags", "int32_t", "int uid"),
+    ]
+    kept, merges = merge_rpc_overloads(rpc)
+    assert len(kept) == 1
+    assert kept[0].returns == "number | boolean"
+    assert kept[0].comment == ("Flags of the entity",)
+    assert len(merges) == 3
+    # the parsed records are left as they are
+    assert rpc[0] == Rpc("get_flags", "int", "int uid", ("Flags of the entity",))
+    assert kept[0] is not rpc[0]
+
+
+def test_incompatible_overloads_are_all_declared():
+    rpc = [
+        Rpc("get_entity", "Entity*", "int uid"),
+        Rpc("get_entity", "int", "int uid"),
+        Rpc("get_entity", "bool", "int uid"),
+    ]
+    kept, merges = merge_rpc_overloads(rpc)
+    assert [func.returns for func in kept] == ["Entity*", "number | boolean"]
+    assert len(merges) == 1
+
+
+def test_overloads_with_other_parameters_stay():
+    kept, merges = merge_rpc_overloads([Rpc("spawn", "int", "int x"), Rpc("spawn", "int", "float x, float y")])
+    assert len(kept) == 2
+    assert merges == []
+
+
+def test_members():
+    type = Usertype("Movable", "Movable", "")
+    type.fields = [
+        Field("velocity", "", "velocity: number"),
+        Field("velocity", "", "velocity: boolean", ("Speed",)),
+        Field("owner", "", "owner: Entity"),
+        Field("owner", "", "owner: number"),
+        Field("hp", "", "hp: number"),
+        Field("hp", "", "hp: number"),
+        Field("get", "", "Entity get(number uid)"),
+        Field("get", "", "number get(number uid)"),
+    ]
+    fields = list(type.fields)
+    merges = merge_members(type)
+    assert [field.signature for field in type.fields] == [
+        "velocity: number | boolean",
+        "owner: Entity",
+        "hp: number",
+        "Entity get(number uid)",
+        "number get(number uid)",
+    ]
+    assert type.fields[0].comment == ("Speed",)
+    assert fields[0].signature == "velocity: number"
+    assert len(merges) == 3
+    assert "owner: number isn't compatible with Entity, kept the first declaration" in merges[1]
@@ -0,0 +1,39 @@
+import dataclasses
+
+import pytest
+
+from spel2gen.model_io import ModelFormatError, ModelIndex, dump_model, load_model
+
+
+@pytest.mark.parametrize("name", ["model.json", "model.bin"])
+def test_round_trip(api, tmp_path, name):
+    path = str(tmp_path / name)
+    dump_model(api, path)
+    loaded = load_model(path)
+    assert loaded == api
+    # comments and enum members come back as tuples, like the parsers make them
+    assert loaded.types[1].fields[0].comment == ("Unique id",)
+    assert loaded.enums[0].members[1] == ("MONS_SNAKE", "220")
+
+
+def test_index_finds_records_by_name(api, tmp_path):
+    path = str(tmp_path / "model.bin")
+    dump_model(api, path)
+    with ModelIndex(path) as index:
+        assert index.find("Snake") == [("types", api.types[4])]
+        # a function is found as its binding and its rpc
+        assert sorted(section for section, _ in index.find("get_entity")) == ["funcs", "rpc"]
+        assert index.find("ENT_TYPE") == [("enums", api.enums[0])]
+        assert index.find("Snak") == []
+        assert index.find("zzz") == []
+
+
+def test_rejects_other_files(api, tmp_path):
+    path = tmp_path / "model.json"
+    path.write_text('{"format": "something else"}')
+    with pytest.raises(ModelFormatError):
+        load_model(str(path))
+    dump_model(dataclasses.replace(api, lualibs=[]), str(path))
+    path.write_text(path.read_text().replace('"version":2', '"version":1'))
+    with pytest.raises(ModelFormatError):
+        load_model(str(path))
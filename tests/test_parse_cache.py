@@ -0,0 +1,47 @@
+from spel2gen.parse_cache import ParseCache
+
+
+def line_count(file, source):
+    return source.text().count("line")
+
+
+def edit(path, text):
+    path.write_text(text)
+    return path.name
+
+
+def test_edited_file_keeps_one_entry(tmp_path):
+    cache = ParseCache(str(tmp_path / "cache"))
+    for n in range(5):
+        cache.start_generation()
+        file = edit(tmp_path / "entity.hpp", "line\n" * (n + 1))
+        assert cache.parse(line_count, file, str(tmp_path)) == n + 1
+        cache.save()
+        assert len(cache.entries) == 1
+    assert len(ParseCache(str(tmp_path / "cache")).entries) == 1
+
+
+def test_in_memory_cache_evicts_too(tmp_path):
+    cache = ParseCache(None)
+    for n in range(3):
+        cache.start_generation()
+        cache.parse(line_count, edit(tmp_path / "entity.hpp", "line\n" * (n + 1)), str(tmp_path))
+        cache.save()
+    assert len(cache.entries) == 1
+
+
+def test_batch_keeps_every_checkout(tmp_path):
+    cache = ParseCache(str(tmp_path / "cache"))
+    with cache.batch():
+        for n in range(3):
+            checkout = tmp_path / str(n)
+            checkout.mkdir()
+            cache.start_generation()
+            cache.parse(line_count, edit(checkout / "entity.hpp", "line\n" * (n + 1)), str(checkout))
+            cache.save()
+    assert len(cache.entries) == 3
+    cache.start_generation()
+    assert cache.parse(line_count, "entity.hpp", str(tmp_path / "1")) == 2
+    assert cache.hits == 1
+    cache.save()
+    assert len(cache.entries) == 1
@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from spel2gen.symbol_index import SymbolIndex, SymbolIndexError, class_bases, write_index
+
+
+@pytest.fixture
+def index(api, tmp_path):
+    path = str(tmp_path / "symbols.idx")
+    write_index(api, path)
+    with SymbolIndex(path) as index:
+        yield index
+
+
+def test_class_bases(api):
+    bases = class_bases(api)
+    # nearest first, sol::bases lists the farthest first
+    assert bases["Snake"] == ["Monster", "Movable", "Entity"]
+    assert bases["Entity"] == []
+
+
+def test_symbols(index):
+    [spawn] = index.find("spawn")
+    assert spawn == ("spawn", "function", "", "spawn(entity_type: ENT_TYPE, x: number, y: number): number", "Spawns an entity")
+    [players] = index.find("players")
+    assert players.kind == "variable"
+    assert index.find("Entity.destroy")[0][1:] == ("method", "Entity", "destroy(): void", "Removes it")
+    assert index.find("Entity.as_snake")[0].signature == "as_snake(): Snake"
+    assert index.find("Entity.as_unknown")[0].signature == "as_unknown(): Entity"
+    assert index.find("ENT_TYPE.MONS_SNAKE")[0][1:4] == ("enum member", "ENT_TYPE", "MONS_SNAKE = 220")
+    assert index.find("CallbackId")[0].signature == "type CallbackId = number"
+    assert index.find("Snake")[0].signature == "class Snake extends Monster"
+
+
+def test_prefixes(index):
+    assert index.names("ENT_TYPE.MONS_") == ["ENT_TYPE.MONS_SNAKE", "ENT_TYPE.MONS_SPIDER"]
+    assert [symbol.name for symbol in index.find("ENT_TYPE.", limit=2)] == ["ENT_TYPE.FLOOR_GENERIC", "ENT_TYPE.MONS_SNAKE"]
+    assert index.names("get_") == ["get_bounds", "get_entity"]
+    assert index.names("nothing") == index.find("nothing") == []
+    assert len(index.names("")) == len(index)
+
+
+def test_inherited_members(index):
+    names = index.names("Snake.")
+    assert names == sorted(names)
+    assert "Snake.walk_pause_timer" in names
+    assert {"Snake.chased_target_uid", "Snake.velocityx", "Snake.uid", "Snake.as_movable"} <= set(names)
+    # Movable.x hides Entity.x
+    assert names.count("Snake.x") == 1
+    [x] = index.find("Snake.x")
+    assert x.container == "Movable"
+    assert [symbol.name for symbol in index.find("Snake.")] == names
+    assert index.names("Entity.x") == ["Entity.x"]
+
+
+def test_repeated_lookups(index):
+    first = index.find("Snake.")
+    assert index.find("Snake.") == first
+    assert index.find("Snake.", limit=3) == first[:3]
+
+
+def test_unchanged_index_isnt_rewritten(api, tmp_path):
+    path = str(tmp_path / "symbols.idx")
+    assert write_index(api, path)
+    mtime = os.stat(path).st_mtime_ns
+    assert not write_index(api, path)
+    assert os.stat(path).st_mtime_ns == mtime
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.idx"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(SymbolIndexError):
+        SymbolIndex(str(path))
@@ -0,0 +1,63 @@
+from spel2gen.tree_shaking import DeclarationGraph, script_identifiers, write_shaken
+
+
+def names(api):
+    return {type.name: [field.name for field in type.fields] for type in api.types}
+
+
+def test_script_identifiers(tmp_path):
+    script = tmp_path / "mod.ts"
+    script.write_text('const p = players[0]; // spawn\nprint("get_entity")\n')
+    assert {"const", "p", "players", "spawn", "print", "get_entity"} <= script_identifiers([str(script)])
+
+
+def test_closure(api):
+    graph = DeclarationGraph(api)
+    # the bases of the classes and the types of the members the script mentions
+    assert graph.closure({"players", "inventory"}) == {"players", "Player", "Entity", "Movable", "Inventory"}
+    assert graph.closure({"players"}) == {"players", "Player", "Entity", "Movable"}
+    # the parameters and return types of the functions, ENT_TYPE members their class
+    assert graph.closure({"spawn"}) == {"spawn", "ENT_TYPE"}
+    assert graph.closure({"get_entity"}) == {"get_entity", "Entity"}
+    assert {"Snake", "Monster"} <= graph.closure({"spawn", "MONS_SNAKE"})
+    assert graph.closure({"nothing"}) == set()
+
+
+def test_shake(api):
+    shaken, variables = DeclarationGraph(api).shake({"players", "inventory", "bombs", "get_bounds"})
+    assert names(shaken) == {"AABB": [], "Entity": [], "Movable": [], "Player": ["inventory"], "Inventory": ["bombs"]}
+    assert [func.name for func in shaken.funcs] == ["get_bounds", "players"]
+    assert variables == [("players", "Array<Player>")]
+    assert shaken.enums == shaken.aliases == shaken.known_casts == []
+    # the api shaken isn't modified
+    assert len(api.types[5].fields) == 1 and len(api.types[6].fields) == 2
+
+
+def test_casts_only_when_mentioned(api):
+    shaken, _ = DeclarationGraph(api).shake({"get_entity", "as_movable"})
+    assert [cast.name for cast in shaken.known_casts] == ["as_movable"]
+    assert "Movable" in names(shaken)
+
+
+def test_write_shaken(api, tmp_path):
+    script = tmp_path / "mod.ts"
+    script.write_text("const count = players[0].inventory.bombs\n")
+    path = str(tmp_path / "shaken.d.ts")
+    assert path in write_shaken(api, [str(script)], path)
+    text = open(path).read()
+    assert "declare class Inventory {" in text
+    assert "    bombs: number" in text
+    assert "ropes" not in text
+    assert "declare const players: Array<Player>;" in text
+    assert "declare const state" not in text
+    assert write_shaken(api, [str(script)], path) == {}
+
+
+def test_no_entity_casts_without_entity(api, tmp_path):
+    script = tmp_path / "mod.ts"
+    script.write_text("spawn(ENT_TYPE.ITEM_WHIP, 0, 0)\n")
+    path = str(tmp_path / "shaken.d.ts")
+    write_shaken(api, [str(script)], path)
+    text = open(path).read()
+    assert "declare function spawn(" in text
+    assert "Entity" not in text.replace("ENT_TYPE", "")
@@ -0,0 +1,14 @@
+from spel2gen.type_translation import TypeTranslator, replace, replace_all
+
+
+def test_translates_cpp_types():
+    assert replace_all("std::vector<uint32_t>") == "Array<number>"
+    assert replace_all("std::optional<bool>") == "boolean | undefined"
+    assert replace_all("/// returns `uint8_t`") == "/// returns `uint8_t`"
+
+
+def test_memo_is_bounded():
+    translator = TypeTranslator(replace, maxsize=4)
+    for i in range(100):
+        assert translator(f"uint8_t value{i}") == f"number value{i}"
+    assert translator.cached.cache_info().currsize == 4